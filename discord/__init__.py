@@ -50,6 +50,7 @@ from . import (
     abc as abc,
     ui as ui,
     app_commands as app_commands,
+    bulk as bulk,
 )
 from .enums import *
 from .embeds import *
@@ -68,6 +69,10 @@ from .interactions import *
 from .components import *
 from .threads import *
 from .automod import *
+from .cache import *
+from .ratelimits import *
+from .cluster import *
+from .sessions import *
 
 
 class VersionInfo(NamedTuple):
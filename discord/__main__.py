@@ -27,6 +27,8 @@ from __future__ import annotations
 from typing import Optional, Tuple, Dict
 
 import argparse
+import asyncio
+import os
 import sys
 from pathlib import Path
 
@@ -308,6 +310,41 @@ def newcog(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
         print('successfully made cog at', directory)
 
 
+def ratelimiter(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    discord.utils.setup_logging()
+    coordinator = discord.RateLimitCoordinator(args.path, global_limit=args.global_limit)
+
+    async def runner():
+        async with coordinator:
+            await coordinator.serve_forever()
+
+    try:
+        asyncio.run(runner())
+    except KeyboardInterrupt:
+        pass
+
+
+def proxy(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    from aiohttp import web
+    from discord import rest_proxy
+
+    token = args.token or os.environ.get('DISCORD_TOKEN')
+    if not token:
+        parser.error('a token must be given through --token or the DISCORD_TOKEN environment variable')
+
+    backend = None
+    if args.ratelimiter is not None:
+        backend = discord.UnixSocketRateLimitBackend(args.ratelimiter)
+
+    discord.utils.setup_logging()
+    app = rest_proxy.create_app(
+        token,
+        authorization=args.authorization or os.environ.get('DISCORD_PROXY_AUTHORIZATION'),
+        ratelimit_backend=backend,
+    )
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
 def add_newbot_args(subparser: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
     parser = subparser.add_parser('newbot', help='creates a command bot project quickly')
     parser.set_defaults(func=newbot)
@@ -331,6 +368,40 @@ def add_newcog_args(subparser: argparse._SubParsersAction[argparse.ArgumentParse
     parser.add_argument('--full', help='add all special methods as well', action='store_true')
 
 
+def add_ratelimiter_args(subparser: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
+    parser = subparser.add_parser('ratelimiter', help='runs a rate limit coordinator shared by several clients')
+    parser.set_defaults(func=ratelimiter)
+
+    parser.add_argument('path', help='the path of the Unix socket to listen on')
+    parser.add_argument(
+        '--global-limit',
+        help='the number of requests per second all clients can make together (default: 50)',
+        type=int,
+        default=50,
+        dest='global_limit',
+        metavar='<limit>',
+    )
+
+
+def add_proxy_args(subparser: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
+    parser = subparser.add_parser('proxy', help='runs a local proxy that forwards REST requests to Discord')
+    parser.set_defaults(func=proxy)
+
+    parser.add_argument('--host', help='the host to listen on (default: 127.0.0.1)', default='127.0.0.1')
+    parser.add_argument('--port', help='the port to listen on (default: 8080)', type=int, default=8080)
+    parser.add_argument('--token', help='the bot token (default: $DISCORD_TOKEN)', metavar='<token>')
+    parser.add_argument(
+        '--authorization',
+        help='the Authorization header workers must send (default: $DISCORD_PROXY_AUTHORIZATION)',
+        metavar='<value>',
+    )
+    parser.add_argument(
+        '--ratelimiter',
+        help='the Unix socket of a rate limit coordinator to share rate limits with',
+        metavar='<path>',
+    )
+
+
 def parse_args() -> Tuple[argparse.ArgumentParser, argparse.Namespace]:
     parser = argparse.ArgumentParser(prog='discord', description='Tools for helping with discord.py')
     parser.add_argument('-v', '--version', action='store_true', help='shows the library version')
@@ -339,6 +410,8 @@ def parse_args() -> Tuple[argparse.ArgumentParser, argparse.Namespace]:
     subparser = parser.add_subparsers(dest='subcommand', title='subcommands')
     add_newbot_args(subparser)
     add_newcog_args(subparser)
+    add_ratelimiter_args(subparser)
+    add_proxy_args(subparser)
     return parser, parser.parse_args()
 
 
@@ -32,6 +32,7 @@ from typing import (
     Any,
     AsyncIterator,
     Callable,
+    ClassVar,
     Dict,
     Iterable,
     List,
@@ -101,6 +102,7 @@ if TYPE_CHECKING:
         GuildChannel as GuildChannelPayload,
         OverwriteType,
     )
+    from .types.message import Message as MessagePayload
     from .types.snowflake import (
         SnowflakeList,
     )
@@ -329,6 +331,22 @@ class _Overwrites:
         return self.type == 1
 
 
+class _PermissionCache:
+    # The resolved permissions of a channel for every role combination seen so far.
+    # It is bound to the overwrites list it was computed from, channels replace
+    # that list whenever their overwrites change.
+    __slots__ = ('overwrites', 'member_overwrites', 'resolved')
+
+    # The number of role combinations kept, the oldest one is dropped after that
+    MAX_RESOLVED: ClassVar[int] = 256
+
+    def __init__(self, overwrites: List[_Overwrites]) -> None:
+        self.overwrites: List[_Overwrites] = overwrites
+        self.member_overwrites: Dict[int, _Overwrites] = {o.id: o for o in overwrites if o.is_member()}
+        # role IDs -> permission value, None meaning administrator
+        self.resolved: Dict[Tuple[int, ...], Optional[int]] = {}
+
+
 class GuildChannel:
     """An ABC that details the common operations on a Discord guild channel.
 
@@ -748,7 +766,50 @@ class GuildChannel:
 
             return base
 
+        guild = self.guild
+        overwrites = self._overwrites
+        try:
+            cache = guild._permission_cache[self.id]
+        except KeyError:
+            cache = None
+
+        if cache is None or cache.overwrites is not overwrites:
+            guild._permission_cache[self.id] = cache = _PermissionCache(overwrites)
+
         roles = obj._roles
+        key = tuple(roles)
+        resolved = cache.resolved
+        try:
+            value = resolved[key]
+        except KeyError:
+            if len(resolved) >= cache.MAX_RESOLVED:
+                del resolved[next(iter(resolved))]
+            value = resolved[key] = self._resolve_role_permissions(base.value, roles)
+
+        # Guild-wide Administrator -> True for everything
+        # Bypass all channel-specific overrides
+        if value is None:
+            return Permissions.all()
+
+        base.value = value
+
+        # Apply member specific permission overwrites
+        overwrite = cache.member_overwrites.get(obj.id)
+        if overwrite is not None:
+            base.handle_overwrite(allow=overwrite.allow, deny=overwrite.deny)
+
+        if obj.is_timed_out():
+            # Timeout leads to every permission except VIEW_CHANNEL and READ_MESSAGE_HISTORY
+            # being explicitly denied
+            # N.B.: This *must* come last, because it's a conclusive mask
+            base.value &= Permissions._timeout_mask()
+
+        return base
+
+    def _resolve_role_permissions(self, value: int, roles: utils.SnowflakeList) -> Optional[int]:
+        # Resolves everything in permissions_for that only depends on the member's roles.
+        # Returns None if the roles grant administrator.
+        base = Permissions(value)
         get_role = self.guild.get_role
 
         # Apply guild roles that the member has.
@@ -757,10 +818,8 @@ class GuildChannel:
             if role is not None:
                 base.value |= role._permissions
 
-        # Guild-wide Administrator -> True for everything
-        # Bypass all channel-specific overrides
         if base.administrator:
-            return Permissions.all()
+            return None
 
         # Apply @everyone allow/deny first since it's special
         try:
@@ -783,20 +842,38 @@ class GuildChannel:
                 allows |= overwrite.allow
 
         base.handle_overwrite(allow=allows, deny=denies)
+        return base.value
 
-        # Apply member specific permission overwrites
-        for overwrite in remaining_overwrites:
-            if overwrite.is_member() and overwrite.id == obj.id:
-                base.handle_overwrite(allow=overwrite.allow, deny=overwrite.deny)
-                break
+    def permissions_for_many(self, members: Iterable[Member], /) -> Dict[Member, Permissions]:
+        """Resolves the permissions of many members in this channel at once.
 
-        if obj.is_timed_out():
-            # Timeout leads to every permission except VIEW_CHANNEL and READ_MESSAGE_HISTORY
-            # being explicitly denied
-            # N.B.: This *must* come last, because it's a conclusive mask
-            base.value &= Permissions._timeout_mask()
+        This is equivalent to calling :meth:`permissions_for` for every member,
+        except that the permissions granted by the roles and role overwrites are
+        only resolved once for all members sharing the same roles. Member
+        overwrites and timeouts are still applied to every member.
 
-        return base
+        .. versionadded:: 2.3
+
+        Parameters
+        ----------
+        members: Iterable[:class:`~discord.Member`]
+            The members to resolve permissions for.
+
+        Returns
+        -------
+        Dict[:class:`~discord.Member`, :class:`~discord.Permissions`]
+            A mapping of member to their resolved permissions.
+        """
+        members = list(members)
+        by_roles: Dict[Tuple[int, ...], List[Member]] = {}
+        for member in members:
+            by_roles.setdefault(tuple(member._roles), []).append(member)
+
+        # Members with the same roles are resolved back to back, so the role set
+        # resolved for the first one is still cached for the others
+        permissions_for = self.permissions_for
+        resolved = {member: permissions_for(member) for group in by_roles.values() for member in group}
+        return {member: resolved[member] for member in members}
 
     async def delete(self, *, reason: Optional[str] = None) -> None:
         """|coro|
@@ -1664,6 +1741,7 @@ class Messageable:
         after: Optional[SnowflakeTime] = None,
         around: Optional[SnowflakeTime] = None,
         oldest_first: Optional[bool] = None,
+        prefetch: int = 0,
     ) -> AsyncIterator[Message]:
         """Returns an :term:`asynchronous iterator` that enables receiving the destination's message history.
 
@@ -1709,6 +1787,14 @@ class Messageable:
         oldest_first: Optional[:class:`bool`]
             If set to ``True``, return messages in oldest->newest order. Defaults to ``True`` if
             ``after`` is specified, otherwise ``False``.
+        prefetch: :class:`int`
+            The maximum number of pages of messages to fetch in the background ahead
+            of the iteration, so that fetching the next page overlaps with processing the
+            current one. Pages are still fetched one after another, as every page starts
+            where the previous one ended. Defaults to ``0``, which fetches a page only once
+            the previous one has been consumed.
+
+            .. versionadded:: 2.3
 
         Raises
         ------
@@ -1797,28 +1883,158 @@ class Messageable:
             if after and after != OLDEST_OBJECT:
                 predicate = lambda m: int(m['id']) > after.id
 
-        channel = await self._get_channel()
+        async def _pages(state: Optional[Snowflake], limit: Optional[int]) -> AsyncIterator[List[MessagePayload]]:
+            while True:
+                retrieve = 100 if limit is None else min(limit, 100)
+                if retrieve < 1:
+                    return
 
-        while True:
-            retrieve = 100 if limit is None else min(limit, 100)
-            if retrieve < 1:
-                return
+                data, state, limit = await strategy(retrieve, state, limit)
 
-            data, state, limit = await strategy(retrieve, state, limit)
+                if reverse:
+                    data = reversed(data)
+                if predicate:
+                    data = filter(predicate, data)
 
-            if reverse:
-                data = reversed(data)
-            if predicate:
-                data = filter(predicate, data)
+                page = list(data)
+                yield page
 
-            count = 0
+                if len(page) < 100:
+                    # There's no data left after this
+                    break
+
+        channel = await self._get_channel()
 
-            for count, raw_message in enumerate(data, 1):
+        async for page in utils._prefetch(_pages(state, limit), prefetch):
+            for raw_message in page:
                 yield self._state.create_message(channel=channel, data=raw_message)
 
-            if count < 100:
-                # There's no data left after this
-                break
+    async def history_parallel(
+        self,
+        *,
+        after: Optional[SnowflakeTime] = None,
+        before: Optional[SnowflakeTime] = None,
+        workers: int = 4,
+        ordered: bool = True,
+        buffer: int = 2,
+    ) -> AsyncIterator[Message]:
+        """Returns an :term:`asynchronous iterator` that receives the destination's message history
+        by fetching several time ranges of it concurrently.
+
+        Unlike :meth:`history`, where every page depends on the previous one, the range
+        between ``after`` and ``before`` is split into ``workers`` windows of equal duration
+        which are paged through at the same time. This is meant to export large channels.
+        The requests still respect the rate limit of the channel.
+
+        You must have :attr:`~discord.Permissions.read_message_history` to do this.
+
+        .. versionadded:: 2.3
+
+        Examples
+        ---------
+
+        Usage ::
+
+            async for message in channel.history_parallel(workers=8):
+                export(message)
+
+        Parameters
+        -----------
+        after: Optional[Union[:class:`~discord.abc.Snowflake`, :class:`datetime.datetime`]]
+            Retrieve messages after this date or message. Defaults to the creation of the channel.
+            If a datetime is provided, it is recommended to use a UTC aware datetime.
+            If the datetime is naive, it is assumed to be local time.
+        before: Optional[Union[:class:`~discord.abc.Snowflake`, :class:`datetime.datetime`]]
+            Retrieve messages before this date or message. Defaults to now.
+            If a datetime is provided, it is recommended to use a UTC aware datetime.
+            If the datetime is naive, it is assumed to be local time.
+        workers: :class:`int`
+            The number of windows fetched concurrently.
+        ordered: :class:`bool`
+            Whether to return the messages in oldest->newest order. If ``False``, the
+            messages of every window are returned as soon as they are fetched,
+            which means only the messages within a page are ordered.
+        buffer: :class:`int`
+            The maximum number of pages every window fetches ahead of the iteration.
+
+        Raises
+        ------
+        ValueError
+            ``workers`` or ``buffer`` is less than 1.
+        ~discord.Forbidden
+            You do not have permissions to get channel message history.
+        ~discord.HTTPException
+            The request to get message history failed.
+
+        Yields
+        -------
+        :class:`~discord.Message`
+            The message with the message data parsed.
+        """
+
+        if workers < 1:
+            raise ValueError('workers must be at least 1')
+        if buffer < 1:
+            raise ValueError('buffer must be at least 1')
+
+        channel = await self._get_channel()
+        state = self._state
+
+        if isinstance(after, datetime):
+            after_id = utils.time_snowflake(after, high=True)
+        else:
+            # No message can be older than its channel, but the starter message of a
+            # forum post shares the ID of its thread so the channel ID itself is included
+            after_id = after.id if after else channel.id - 1
+        if isinstance(before, datetime):
+            before_id = utils.time_snowflake(before, high=False)
+        else:
+            before_id = before.id if before else utils.time_snowflake(utils.utcnow(), high=True)
+
+        # Every window contains the IDs in [bounds[i], bounds[i + 1])
+        lowest = after_id + 1
+        span = max(before_id - lowest, 0)
+        bounds = [lowest + span * i // workers for i in range(workers)] + [before_id]
+
+        if ordered:
+            queues = [asyncio.Queue(maxsize=buffer) for _ in range(workers)]
+        else:
+            shared: asyncio.Queue[Any] = asyncio.Queue(maxsize=buffer * workers)
+            queues = [shared] * workers
+
+        async def fetch(queue: asyncio.Queue[Any], low: int, high: int) -> None:
+            cursor = low - 1
+            try:
+                while cursor < high - 1:
+                    data = await state.http.logs_from(channel.id, 100, after=cursor)
+                    # The messages are returned newest first
+                    page = [raw for raw in reversed(data) if int(raw['id']) < high]
+                    if page:
+                        await queue.put(page)
+                    if len(data) < 100 or len(page) < len(data):
+                        break
+                    cursor = int(data[0]['id'])
+            except Exception as e:
+                await queue.put(e)
+            else:
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(fetch(queues[i], bounds[i], bounds[i + 1])) for i in range(workers)]
+        try:
+            # When ordered, the windows are read one after another while the others fill their buffer
+            for queue in queues if ordered else [queues[0]] * workers:
+                while True:
+                    page = await queue.get()
+                    if page is None:
+                        break
+                    if isinstance(page, Exception):
+                        raise page
+
+                    for raw_message in page:
+                        yield state.create_message(channel=channel, data=raw_message)
+        finally:
+            for task in tasks:
+                task.cancel()
 
 
 class Connectable(Protocol):
@@ -0,0 +1,392 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Coroutine, Dict, Generic, Iterable, List, Optional, TypeVar, Union
+
+from .errors import HTTPException
+from .utils import _chunk, time_snowflake, utcnow
+
+if TYPE_CHECKING:
+    from .abc import Snowflake
+    from .guild import Guild
+    from .member import Member
+    from .message import Message, PartialMessage
+
+    MessageLike = Union[Message, PartialMessage]
+
+__all__ = (
+    'BulkResult',
+    'ban',
+    'delete_messages',
+    'add_roles',
+    'remove_roles',
+)
+
+_log = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_Job = Callable[[], Coroutine[Any, Any, List['BulkResult[T]']]]
+
+
+class BulkResult(Generic[T]):
+    """Represents the outcome of a single item of a bulk operation.
+
+    .. versionadded:: 2.3
+
+    Attributes
+    -----------
+    item
+        The item the operation was done on, e.g. a :class:`Message` or :class:`Member`.
+    succeeded: :class:`bool`
+        Whether the operation succeeded for this item.
+    error: Optional[:exc:`HTTPException`]
+        The error that made the operation fail for this item, if any. This can be ``None``
+        even when the operation failed, e.g. when Discord reports that a user couldn't be
+        banned without saying why.
+    applied: Optional[List[:class:`abc.Snowflake`]]
+        The roles that were given to or removed from the member by :func:`add_roles`
+        and :func:`remove_roles`. When one of the roles failed, the others may still
+        have been applied. ``None`` for the other operations.
+    """
+
+    __slots__ = ('item', 'succeeded', 'error', 'applied')
+
+    def __init__(
+        self,
+        item: T,
+        *,
+        succeeded: bool = True,
+        error: Optional[HTTPException] = None,
+        applied: Optional[List[Snowflake]] = None,
+    ) -> None:
+        self.item: T = item
+        self.succeeded: bool = succeeded and error is None
+        self.error: Optional[HTTPException] = error
+        self.applied: Optional[List[Snowflake]] = applied
+
+    def __repr__(self) -> str:
+        return f'<BulkResult item={self.item!r} succeeded={self.succeeded} error={self.error!r}>'
+
+
+def _failed(items: Iterable[T], error: HTTPException) -> List[BulkResult[T]]:
+    return [BulkResult(item, succeeded=False, error=error) for item in items]
+
+
+async def _run(buckets: Iterable[List[_Job[T]]], concurrency: int) -> AsyncIterator[BulkResult[T]]:
+    # Jobs in different rate limit buckets run independently of each other, while
+    # at most `concurrency` jobs of a bucket are in flight to not just queue them up
+    # in the rate limiter. Results are yielded as soon as their job is done.
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1')
+
+    queue: asyncio.Queue[Optional[List[BulkResult[T]]]] = asyncio.Queue()
+
+    async def worker(jobs: Iterable[_Job[T]]) -> None:
+        try:
+            for job in jobs:
+                queue.put_nowait(await job())
+        finally:
+            queue.put_nowait(None)
+
+    tasks: List[asyncio.Task[None]] = []
+    for jobs in buckets:
+        # Workers of the same bucket share the iterator, so every job runs once
+        shared = iter(jobs)
+        for _ in range(min(concurrency, len(jobs))):
+            tasks.append(asyncio.create_task(worker(shared)))
+
+    try:
+        running = len(tasks)
+        while running:
+            results = await queue.get()
+            if results is None:
+                running -= 1
+                continue
+
+            for result in results:
+                yield result
+
+        for task in tasks:
+            # Propagate unexpected errors of the workers
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def ban(
+    guild: Guild,
+    users: Iterable[Snowflake],
+    *,
+    reason: Optional[str] = None,
+    delete_message_seconds: int = 86400,
+) -> AsyncIterator[BulkResult[Snowflake]]:
+    """Bans many users from a guild.
+
+    The users are banned in chunks of 200 through the bulk ban endpoint.
+    This yields a :class:`BulkResult` for each user as soon as the chunk
+    it is in has been processed.
+
+    You must have :attr:`~Permissions.ban_members` and :attr:`~Permissions.manage_guild`
+    to do this.
+
+    .. versionadded:: 2.3
+
+    Examples
+    ---------
+
+    Usage ::
+
+        async for result in discord.bulk.ban(guild, raiders, reason='Raid'):
+            if not result.succeeded:
+                print(f'Could not ban {result.item.id}')
+
+    Parameters
+    -----------
+    guild: :class:`Guild`
+        The guild to ban the users from.
+    users: Iterable[:class:`abc.Snowflake`]
+        The users to ban.
+    reason: Optional[:class:`str`]
+        The reason for banning the users. Shows up on the audit log.
+    delete_message_seconds: :class:`int`
+        The number of seconds worth of messages to delete from the users
+        in the guild. The minimum is 0 and the maximum is 604800 (7 days).
+        Defaults to 1 day.
+
+    Yields
+    -------
+    :class:`BulkResult`
+        The outcome for every user.
+    """
+
+    http = guild._state.http
+
+    def job(chunk: List[Snowflake]) -> _Job[Snowflake]:
+        async def run() -> List[BulkResult[Snowflake]]:
+            try:
+                data = await http.bulk_ban(
+                    guild.id, [user.id for user in chunk], delete_message_seconds=delete_message_seconds, reason=reason
+                )
+            except HTTPException as e:
+                return _failed(chunk, e)
+
+            failed = set(map(int, data['failed_users'] or ()))
+            return [BulkResult(user, succeeded=user.id not in failed) for user in chunk]
+
+        return run
+
+    # Every chunk uses the same rate limit bucket
+    jobs = [job(chunk) for chunk in _chunk(users, 200)]
+    async for result in _run([jobs], 1):
+        yield result
+
+
+async def delete_messages(
+    messages: Iterable[MessageLike],
+    *,
+    reason: Optional[str] = None,
+    concurrency: int = 4,
+) -> AsyncIterator[BulkResult[MessageLike]]:
+    """Deletes many messages, possibly from many channels.
+
+    Messages younger than 14 days are deleted in chunks of 100 through the bulk
+    delete endpoint, older ones are deleted one by one. Every channel has its own
+    rate limit, so the channels are processed concurrently. This yields a
+    :class:`BulkResult` for each message as soon as it has been processed.
+
+    You must have :attr:`~Permissions.manage_messages` to delete
+    messages that aren't your own.
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    messages: Iterable[Union[:class:`Message`, :class:`PartialMessage`]]
+        The messages to delete.
+    reason: Optional[:class:`str`]
+        The reason for deleting the messages. Shows up on the audit log.
+    concurrency: :class:`int`
+        The maximum number of requests in flight per channel.
+
+    Yields
+    -------
+    :class:`BulkResult`
+        The outcome for every message.
+    """
+
+    by_channel: Dict[int, List[MessageLike]] = {}
+    for message in messages:
+        by_channel.setdefault(message.channel.id, []).append(message)
+
+    minimum_time = time_snowflake(utcnow() - datetime.timedelta(days=14), high=False)
+
+    def bulk_job(channel_id: int, chunk: List[MessageLike]) -> _Job[MessageLike]:
+        async def run() -> List[BulkResult[MessageLike]]:
+            http = chunk[0]._state.http
+            try:
+                if len(chunk) == 1:
+                    await http.delete_message(channel_id, chunk[0].id, reason=reason)
+                else:
+                    await http.delete_messages(channel_id, [m.id for m in chunk], reason=reason)
+            except HTTPException as e:
+                return _failed(chunk, e)
+            return [BulkResult(message) for message in chunk]
+
+        return run
+
+    buckets: List[List[_Job[MessageLike]]] = []
+    for channel_id, channel_messages in by_channel.items():
+        recent = [m for m in channel_messages if m.id >= minimum_time]
+        old = [m for m in channel_messages if m.id < minimum_time]
+        jobs = [bulk_job(channel_id, chunk) for chunk in _chunk(recent, 100)]
+        jobs.extend(bulk_job(channel_id, [message]) for message in old)
+        buckets.append(jobs)
+
+    async for result in _run(buckets, concurrency):
+        yield result
+
+
+async def _edit_roles(
+    members: Iterable[Member],
+    roles: Iterable[Snowflake],
+    *,
+    add: bool,
+    reason: Optional[str],
+    concurrency: int,
+) -> AsyncIterator[BulkResult[Member]]:
+    roles = list(roles)
+
+    def job(member: Member) -> _Job[Member]:
+        async def run() -> List[BulkResult[Member]]:
+            # Every role is given or removed through its own route, which doesn't
+            # depend on the cached roles of the member and can't overwrite changes
+            # made by someone else in the meantime
+            http = member._state.http
+            request = http.add_role if add else http.remove_role
+            applied: List[Snowflake] = []
+            error: Optional[HTTPException] = None
+            for role in roles:
+                try:
+                    await request(member.guild.id, member.id, role.id, reason=reason)
+                except HTTPException as e:
+                    error = e
+                else:
+                    applied.append(role)
+            return [BulkResult(member, error=error, applied=applied)]
+
+        return run
+
+    # The member role routes are rate limited per guild
+    by_guild: Dict[int, List[_Job[Member]]] = {}
+    for member in members:
+        by_guild.setdefault(member.guild.id, []).append(job(member))
+
+    async for result in _run(by_guild.values(), concurrency):
+        yield result
+
+
+def add_roles(
+    members: Iterable[Member],
+    *roles: Snowflake,
+    reason: Optional[str] = None,
+    concurrency: int = 4,
+) -> AsyncIterator[BulkResult[Member]]:
+    """Gives roles to many members, possibly from many guilds.
+
+    Every role is given through its own request, so the cached roles of the
+    members don't matter and changes made to them by others aren't overwritten.
+    Every guild has its own rate limit, so the guilds are processed concurrently.
+    This yields a :class:`BulkResult` for each member once every role has been
+    tried, with :attr:`BulkResult.applied` holding the roles that were given.
+
+    You must have :attr:`~Permissions.manage_roles` to do this.
+
+    .. versionadded:: 2.3
+
+    Examples
+    ---------
+
+    Usage ::
+
+        async for result in discord.bulk.add_roles(guild.members, verified_role):
+            if result.error is not None:
+                print(f'Could not verify {result.item}: {result.error}')
+
+    Parameters
+    -----------
+    members: Iterable[:class:`Member`]
+        The members to give the roles to.
+    \\*roles: :class:`abc.Snowflake`
+        The roles to give to every member.
+    reason: Optional[:class:`str`]
+        The reason for giving the roles. Shows up on the audit log.
+    concurrency: :class:`int`
+        The maximum number of requests in flight per guild.
+
+    Yields
+    -------
+    :class:`BulkResult`
+        The outcome for every member.
+    """
+    return _edit_roles(members, roles, add=True, reason=reason, concurrency=concurrency)
+
+
+def remove_roles(
+    members: Iterable[Member],
+    *roles: Snowflake,
+    reason: Optional[str] = None,
+    concurrency: int = 4,
+) -> AsyncIterator[BulkResult[Member]]:
+    """Removes roles from many members, possibly from many guilds.
+
+    This works like :func:`add_roles`.
+
+    You must have :attr:`~Permissions.manage_roles` to do this.
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    members: Iterable[:class:`Member`]
+        The members to remove the roles from.
+    \\*roles: :class:`abc.Snowflake`
+        The roles to remove from every member.
+    reason: Optional[:class:`str`]
+        The reason for removing the roles. Shows up on the audit log.
+    concurrency: :class:`int`
+        The maximum number of requests in flight per guild.
+
+    Yields
+    -------
+    :class:`BulkResult`
+        The outcome for every member.
+    """
+    return _edit_roles(members, roles, add=False, reason=reason, concurrency=concurrency)
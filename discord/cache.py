@@ -0,0 +1,648 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+import datetime
+import time
+from typing import TYPE_CHECKING, Any, Callable, Collection, Dict, Iterator, List, MutableMapping, Optional, Tuple, TypeVar
+
+from .member import Member, _ClientStatus
+from .utils import SnowflakeList, MISSING
+
+if TYPE_CHECKING:
+    from .activity import ActivityTypes
+    from .guild import Guild
+    from .state import ConnectionState
+
+__all__ = (
+    'CacheStore',
+    'LRUCacheStore',
+    'TTLCacheStore',
+    'NoCacheStore',
+    'CompactMemberStore',
+)
+
+K = TypeVar('K')
+V = TypeVar('V')
+
+#: The names of the entity stores that can be configured through ``cache_stores``.
+#: The first group lives on the :class:`~discord.Client`, the second on every :class:`~discord.Guild`.
+STORE_NAMES: Tuple[str, ...] = (
+    'guilds',
+    'users',
+    'emojis',
+    'stickers',
+    'private_channels',
+    'members',
+    'roles',
+    'channels',
+    'threads',
+)
+
+CacheStoreFactory = Callable[[], MutableMapping[int, Any]]
+
+
+class CacheStore(MutableMapping[K, V]):
+    """The base class for a store that the library keeps cached entities in.
+
+    A store is a :class:`collections.abc.MutableMapping` of IDs to entities.
+    Any mapping can be used as a store, including a plain :class:`dict` which
+    is what the library uses by default. This class only exists to make
+    implementing a store with a custom eviction policy easier.
+
+    Stores are passed to :class:`Client` through the ``cache_stores`` parameter
+    as a mapping of store name to a zero argument callable returning a new store.
+    The callable is invoked once per client for client-wide stores and once per
+    guild for guild stores. The following store names are supported:
+
+    - ``guilds``, ``users``, ``emojis``, ``stickers`` and ``private_channels``.
+    - ``members``, ``roles``, ``channels`` and ``threads``, which are per guild.
+
+    .. versionadded:: 2.3
+
+    .. warning::
+
+        A store that drops entries means the library will not find them either.
+        For example evicting roles or the bot's own member breaks permission
+        resolution, and evicting channels turns their events into partial objects.
+    """
+
+    __slots__ = ()
+
+    def values(self) -> Collection[V]:  # type: ignore # Collection is good enough for the library
+        return [self[key] for key in self]
+
+    def items(self) -> Collection[Tuple[K, V]]:  # type: ignore
+        return [(key, self[key]) for key in self]
+
+    def copy(self) -> Dict[K, V]:
+        """Returns a shallow :class:`dict` copy of the store."""
+        return dict(self.items())
+
+
+class LRUCacheStore(CacheStore[K, V]):
+    """A store that keeps at most ``max_size`` entities, evicting the least recently used.
+
+    Looking an entity up by its ID counts as a use, iterating over the store does not.
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    max_size: :class:`int`
+        The maximum number of entities to keep.
+    """
+
+    __slots__ = ('max_size', '_data')
+
+    def __init__(self, max_size: int) -> None:
+        if max_size <= 0:
+            raise ValueError('max_size must be greater than 0')
+
+        self.max_size: int = max_size
+        self._data: OrderedDict[K, V] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} max_size={self.max_size} len={len(self._data)}>'
+
+    def __getitem__(self, key: K) -> V:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        data = self._data
+        data[key] = value
+        data.move_to_end(key)
+        if len(data) > self.max_size:
+            data.popitem(last=False)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def values(self) -> Collection[V]:  # type: ignore
+        return self._data.values()
+
+    def items(self) -> Collection[Tuple[K, V]]:  # type: ignore
+        return self._data.items()
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class TTLCacheStore(CacheStore[K, V]):
+    """A store that forgets entities ``ttl`` seconds after they were last stored.
+
+    Expired entities are removed lazily whenever the store is accessed.
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    ttl: :class:`float`
+        The number of seconds an entity is kept for.
+    max_size: Optional[:class:`int`]
+        The maximum number of entities to keep, evicting the oldest first.
+        Defaults to ``None`` meaning there is no limit.
+    """
+
+    __slots__ = ('ttl', 'max_size', '_data')
+
+    def __init__(self, ttl: float, *, max_size: Optional[int] = None) -> None:
+        if ttl <= 0:
+            raise ValueError('ttl must be greater than 0')
+        if max_size is not None and max_size <= 0:
+            raise ValueError('max_size must be greater than 0')
+
+        self.ttl: float = ttl
+        self.max_size: Optional[int] = max_size
+        # key -> (expires_at, value), ordered by expiry since the ttl is constant
+        self._data: OrderedDict[K, Tuple[float, V]] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} ttl={self.ttl} max_size={self.max_size} len={len(self._data)}>'
+
+    def _expire(self) -> None:
+        data = self._data
+        now = time.monotonic()
+        while data:
+            key = next(iter(data))
+            if data[key][0] > now:
+                break
+            del data[key]
+
+    def __getitem__(self, key: K) -> V:
+        expires_at, value = self._data[key]
+        if expires_at <= time.monotonic():
+            self._expire()
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._expire()
+        data = self._data
+        data[key] = (time.monotonic() + self.ttl, value)
+        data.move_to_end(key)
+        if self.max_size is not None and len(data) > self.max_size:
+            data.popitem(last=False)
+
+    def __delitem__(self, key: K) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]  # type: ignore
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[K]:
+        self._expire()
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._data)
+
+    def values(self) -> Collection[V]:  # type: ignore
+        self._expire()
+        return [value for _, value in self._data.values()]
+
+    def items(self) -> Collection[Tuple[K, V]]:  # type: ignore
+        self._expire()
+        return [(key, value) for key, (_, value) in self._data.items()]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+class NoCacheStore(CacheStore[K, V]):
+    """A store that never keeps anything.
+
+    .. versionadded:: 2.3
+    """
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__}>'
+
+    def __getitem__(self, key: K) -> V:
+        raise KeyError(key)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        pass
+
+    def __delitem__(self, key: K) -> None:
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_NO_TIME = -(2**63)
+
+# Bits of CompactMemberStore._bits
+_PENDING = 1 << 0
+_BOT = 1 << 1
+_SYSTEM = 1 << 2
+_AVATAR = 1 << 3
+_AVATAR_ANIMATED = 1 << 4
+_GUILD_AVATAR = 1 << 5
+_GUILD_AVATAR_ANIMATED = 1 << 6
+
+
+def _pack_time(dt: Optional[datetime.datetime]) -> int:
+    return _NO_TIME if dt is None else (dt - _EPOCH) // _MICROSECOND
+
+
+def _unpack_time(value: int) -> Optional[datetime.datetime]:
+    return None if value == _NO_TIME else _EPOCH + datetime.timedelta(microseconds=value)
+
+
+class _CompactMemberValues(Collection[Member]):
+    __slots__ = ('_store',)
+
+    def __init__(self, store: CompactMemberStore) -> None:
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __iter__(self) -> Iterator[Member]:
+        store = self._store
+        hot = store._hot
+        pinned = store._pinned
+        for member_id, slot in list(store._slots.items()):
+            member = hot.get(member_id) or pinned.get(member_id)
+            yield member if member is not None else store._materialize(slot)
+
+    def __contains__(self, item: object) -> bool:
+        return isinstance(item, Member) and item.id in self._store
+
+
+class CompactMemberStore(CacheStore[int, Member]):
+    """A ``members`` store that packs members into arrays instead of keeping :class:`Member` objects.
+
+    Members are turned back into :class:`Member` objects when they are looked up
+    or iterated over. The most recently looked up members are kept as objects so
+    that repeated lookups return the same instance, and are packed again once they
+    fall out of that working set. This trades some CPU on access for a large
+    reduction in memory in guilds with many members.
+
+    This store only makes sense per guild, e.g.
+    ``cache_stores={'members': discord.CompactMemberStore}``.
+
+    .. versionadded:: 2.3
+
+    .. note::
+
+        Iterating over the store doesn't add the members to the working set, so
+        that a full iteration doesn't push out the members that are actually being
+        looked up. Members that aren't in the working set are materialized again
+        on every iteration, so ``guild.members[0] is guild.get_member(id)`` may be
+        ``False``; compare members with ``==`` or by their ID instead.
+
+        Attributes only present on interaction payloads, such as the resolved
+        permissions, are not packed.
+
+    Parameters
+    -----------
+    hot_size: :class:`int`
+        The number of looked up members to keep as :class:`Member` objects.
+        Defaults to ``1024``.
+    """
+
+    __slots__ = (
+        'hot_size',
+        '_guild',
+        '_state',
+        '_slots',
+        '_free',
+        '_hot',
+        '_pinned',
+        '_ids',
+        '_joined_at',
+        '_premium_since',
+        '_timed_out_until',
+        '_flags',
+        '_public_flags',
+        '_discriminators',
+        '_bits',
+        '_role_sets',
+        '_avatars',
+        '_guild_avatars',
+        '_names',
+        '_global_names',
+        '_nicks',
+        '_role_set_index',
+        '_role_set_values',
+        '_presences',
+    )
+
+    def __init__(self, hot_size: int = 1024) -> None:
+        if hot_size <= 0:
+            raise ValueError('hot_size must be greater than 0')
+
+        self.hot_size: int = hot_size
+        self._guild: Guild = MISSING
+        self._state: ConnectionState = MISSING
+        # member_id -> slot in the arrays below
+        self._slots: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._hot: OrderedDict[int, Member] = OrderedDict()
+        # Members that could not be packed are kept as they are
+        self._pinned: Dict[int, Member] = {}
+
+        self._ids: array[int] = array('Q')
+        self._joined_at: array[int] = array('q')
+        self._premium_since: array[int] = array('q')
+        self._timed_out_until: array[int] = array('q')
+        self._flags: array[int] = array('Q')
+        self._public_flags: array[int] = array('Q')
+        self._discriminators: array[int] = array('H')
+        self._bits: array[int] = array('B')
+        self._role_sets: array[int] = array('I')
+        # 16 bytes per slot, the raw bytes of the hex encoded avatar hash
+        self._avatars: bytearray = bytearray()
+        self._guild_avatars: bytearray = bytearray()
+        self._names: List[Optional[str]] = []
+        self._global_names: List[Optional[str]] = []
+        self._nicks: List[Optional[str]] = []
+
+        # Most members share one of a handful of role combinations, so they are interned
+        self._role_set_index: Dict[Tuple[int, ...], int] = {}
+        self._role_set_values: List[SnowflakeList] = []
+
+        # Only members with a non-default presence have an entry
+        self._presences: Dict[int, Tuple[_ClientStatus, Tuple[ActivityTypes, ...]]] = {}
+
+    def __repr__(self) -> str:
+        return f'<{self.__class__.__name__} len={len(self._slots)} hot={len(self._hot)}>'
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+
+        slot = len(self._ids)
+        for arr in (
+            self._ids,
+            self._joined_at,
+            self._premium_since,
+            self._timed_out_until,
+            self._flags,
+            self._public_flags,
+            self._discriminators,
+            self._bits,
+            self._role_sets,
+        ):
+            arr.append(0)
+        self._avatars.extend(bytes(16))
+        self._guild_avatars.extend(bytes(16))
+        self._names.append(None)
+        self._global_names.append(None)
+        self._nicks.append(None)
+        return slot
+
+    def _intern_roles(self, roles: SnowflakeList) -> int:
+        key = tuple(roles)
+        try:
+            return self._role_set_index[key]
+        except KeyError:
+            index = len(self._role_set_values)
+            self._role_set_index[key] = index
+            self._role_set_values.append(SnowflakeList(key, is_sorted=True))
+            return index
+
+    @staticmethod
+    def _pack_hash(buffer: bytearray, slot: int, value: Optional[str]) -> Tuple[bool, bool]:
+        # Returns whether the hash was packed and whether it is animated
+        if value is None:
+            return False, False
+
+        animated = value.startswith('a_')
+        try:
+            raw = bytes.fromhex(value[2:] if animated else value)
+        except ValueError:
+            raw = b''
+
+        if len(raw) != 16:
+            raise ValueError(value)
+
+        start = slot * 16
+        buffer[start : start + 16] = raw
+        return True, animated
+
+    @staticmethod
+    def _unpack_hash(buffer: bytearray, slot: int, animated: bool) -> str:
+        start = slot * 16
+        value = buffer[start : start + 16].hex()
+        return f'a_{value}' if animated else value
+
+    def _pack(self, slot: int, member: Member) -> None:
+        user = member._user
+        self._ids[slot] = member.id
+        self._joined_at[slot] = _pack_time(member.joined_at)
+        self._premium_since[slot] = _pack_time(member.premium_since)
+        self._timed_out_until[slot] = _pack_time(member.timed_out_until)
+        self._flags[slot] = member._flags
+        self._public_flags[slot] = user._public_flags
+        self._discriminators[slot] = int(user.discriminator or 0)
+        self._role_sets[slot] = self._intern_roles(member._roles)
+        self._names[slot] = user.name
+        self._global_names[slot] = user.global_name
+        self._nicks[slot] = member.nick
+
+        bits = 0
+        if member.pending:
+            bits |= _PENDING
+        if user.bot:
+            bits |= _BOT
+        if user.system:
+            bits |= _SYSTEM
+
+        # Hashes that do not follow the usual format are not expected in practice,
+        # the member is kept as an object if it happens anyway
+        packed, animated = self._pack_hash(self._avatars, slot, user._avatar)
+        if packed:
+            bits |= _AVATAR | (_AVATAR_ANIMATED if animated else 0)
+        packed, animated = self._pack_hash(self._guild_avatars, slot, member._avatar)
+        if packed:
+            bits |= _GUILD_AVATAR | (_GUILD_AVATAR_ANIMATED if animated else 0)
+        self._bits[slot] = bits
+
+        client_status = member._client_status
+        if client_status._status != 'offline' or member.activities:
+            self._presences[slot] = (client_status, member.activities)
+        else:
+            self._presences.pop(slot, None)
+
+    def _materialize(self, slot: int) -> Member:
+        state = self._state
+        member_id = self._ids[slot]
+        bits = self._bits[slot]
+
+        user = state._users.get(member_id)
+        if user is None:
+            discriminator = self._discriminators[slot]
+            avatar = self._unpack_hash(self._avatars, slot, bool(bits & _AVATAR_ANIMATED)) if bits & _AVATAR else None
+            user = state.store_user(
+                {
+                    'id': member_id,
+                    'username': self._names[slot],
+                    'discriminator': f'{discriminator:04}' if discriminator else '0',
+                    'global_name': self._global_names[slot],
+                    'avatar': avatar,
+                    'public_flags': self._public_flags[slot],
+                    'bot': bool(bits & _BOT),
+                    'system': bool(bits & _SYSTEM),
+                }  # type: ignore # Not all keys are needed
+            )
+
+        member = Member.__new__(Member)  # bypass __init__
+        member._state = state
+        member._user = user
+        member.guild = self._guild
+        member.joined_at = _unpack_time(self._joined_at[slot])
+        member.premium_since = _unpack_time(self._premium_since[slot])
+        member.timed_out_until = _unpack_time(self._timed_out_until[slot])
+        member._roles = SnowflakeList(self._role_set_values[self._role_sets[slot]], is_sorted=True)
+        member.nick = self._nicks[slot]
+        member.pending = bool(bits & _PENDING)
+        if bits & _GUILD_AVATAR:
+            member._avatar = self._unpack_hash(self._guild_avatars, slot, bool(bits & _GUILD_AVATAR_ANIMATED))
+        else:
+            member._avatar = None
+        member._flags = self._flags[slot]
+        member._permissions = None
+
+        try:
+            client_status, activities = self._presences[slot]
+        except KeyError:
+            member._client_status = _ClientStatus()
+            member.activities = ()
+        else:
+            member._client_status = _ClientStatus._copy(client_status)
+            member.activities = activities
+        return member
+
+    def _store(self, member_id: int, member: Member) -> None:
+        try:
+            slot = self._slots[member_id]
+        except KeyError:
+            slot = self._allocate()
+            self._slots[member_id] = slot
+
+        try:
+            self._pack(slot, member)
+        except ValueError:
+            self._pinned[member_id] = member
+        else:
+            self._pinned.pop(member_id, None)
+
+    def _touch(self, member_id: int, member: Member) -> None:
+        hot = self._hot
+        hot[member_id] = member
+        while len(hot) > self.hot_size:
+            # Pack it again, it might have been updated since it was materialized
+            evicted_id, evicted = hot.popitem(last=False)
+            self._store(evicted_id, evicted)
+
+    def __getitem__(self, member_id: int) -> Member:
+        hot = self._hot
+        try:
+            member = hot[member_id]
+        except KeyError:
+            slot = self._slots[member_id]
+            member = self._pinned.get(member_id) or self._materialize(slot)
+            self._touch(member_id, member)
+        else:
+            hot.move_to_end(member_id)
+        return member
+
+    def __setitem__(self, member_id: int, member: Member) -> None:
+        if self._guild is MISSING:
+            self._guild = member.guild
+            self._state = member._state
+
+        self._store(member_id, member)
+        if member_id in self._hot:
+            # Replace the stale object, the new one is what the caller is holding on to
+            self._hot[member_id] = member
+
+    def __delitem__(self, member_id: int) -> None:
+        slot = self._slots.pop(member_id)
+        self._hot.pop(member_id, None)
+        self._pinned.pop(member_id, None)
+        self._presences.pop(slot, None)
+        self._names[slot] = self._global_names[slot] = self._nicks[slot] = None
+        self._free.append(slot)
+
+    def __contains__(self, member_id: object) -> bool:
+        return member_id in self._slots
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def pop(self, member_id: int, *args: Any) -> Any:
+        try:
+            slot = self._slots[member_id]
+        except KeyError:
+            if args:
+                return args[0]
+            raise
+
+        # The removed member has to be returned, but it shouldn't push another one out of the working set
+        member = self._hot.get(member_id) or self._pinned.get(member_id) or self._materialize(slot)
+        del self[member_id]
+        return member
+
+    def values(self) -> Collection[Member]:  # type: ignore
+        return _CompactMemberValues(self)
+
+    def items(self) -> Collection[Tuple[int, Member]]:  # type: ignore
+        return [(member.id, member) for member in self.values()]
+
+    def clear(self) -> None:
+        self.__init__(self.hot_size)
@@ -286,6 +286,27 @@ class TextChannel(discord.abc.Messageable, discord.abc.GuildChannel, Hashable):
         """
         return self._state._get_message(self.last_message_id) if self.last_message_id else None
 
+    def get_cached_messages(self, limit: Optional[int] = None) -> List[Message]:
+        """Returns the messages of this channel that are in the message cache.
+
+        This does not scan the whole cache, so it is cheap enough to call
+        from event handlers.
+
+        .. versionadded:: 2.3
+
+        Parameters
+        -----------
+        limit: Optional[:class:`int`]
+            The maximum number of messages to return, starting from the most recent one.
+            If ``None`` then every cached message of this channel is returned.
+
+        Returns
+        --------
+        List[:class:`Message`]
+            The cached messages, ordered from oldest to newest.
+        """
+        return self._state._get_channel_messages(self.id, limit)
+
     @overload
     async def edit(self) -> Optional[TextChannel]:
         ...
@@ -1024,6 +1045,27 @@ class VocalGuildChannel(discord.abc.Messageable, discord.abc.Connectable, discor
         """
         return self._state._get_message(self.last_message_id) if self.last_message_id else None
 
+    def get_cached_messages(self, limit: Optional[int] = None) -> List[Message]:
+        """Returns the messages of this channel that are in the message cache.
+
+        This does not scan the whole cache, so it is cheap enough to call
+        from event handlers.
+
+        .. versionadded:: 2.3
+
+        Parameters
+        -----------
+        limit: Optional[:class:`int`]
+            The maximum number of messages to return, starting from the most recent one.
+            If ``None`` then every cached message of this channel is returned.
+
+        Returns
+        --------
+        List[:class:`Message`]
+            The cached messages, ordered from oldest to newest.
+        """
+        return self._state._get_channel_messages(self.id, limit)
+
     def get_partial_message(self, message_id: int, /) -> PartialMessage:
         """Creates a :class:`PartialMessage` from the message ID.
 
@@ -47,6 +47,7 @@ from typing import (
 )
 
 import aiohttp
+import yarl
 
 from .user import User, ClientUser
 from .invite import Invite
@@ -61,6 +62,7 @@ from .errors import *
 from .enums import Status
 from .flags import ApplicationFlags, Intents
 from .gateway import *
+from .gateway import HAS_ZSTD
 from .activity import ActivityTypes, BaseActivity, create_activity
 from .voice_client import VoiceClient
 from .http import HTTPClient
@@ -75,6 +77,7 @@ from .ui.view import View
 from .stage_instance import StageInstance
 from .threads import Thread
 from .sticker import GuildSticker, StandardSticker, StickerPack, _sticker_factory
+from .sessions import GatewaySession
 
 if TYPE_CHECKING:
     from types import TracebackType
@@ -87,10 +90,13 @@ if TYPE_CHECKING:
     from .channel import DMChannel, GroupChannel
     from .ext.commands import AutoShardedBot, Bot, Context, CommandError
     from .guild import GuildChannel
+    from .http import JSONCodec
     from .integrations import Integration
     from .interactions import Interaction
     from .member import Member, VoiceState
     from .message import Message
+    from .ratelimits import RateLimitBackend, RateLimitObserver
+    from .sessions import SessionStore
     from .raw_models import (
         RawAppCommandPermissionsUpdateEvent,
         RawBulkMessageDeleteEvent,
@@ -165,6 +171,45 @@ class Client:
 
         .. versionchanged:: 1.3
             Allow disabling the message cache and change the default size to ``1000``.
+    max_messages_per_guild: Optional[:class:`int`]
+        The maximum number of messages a single guild may hold in the message cache.
+        When a guild goes over this amount its own oldest messages are evicted first,
+        which keeps a busy guild from pushing every other guild out of the cache.
+        This defaults to ``None``, i.e. only :attr:`max_messages` applies.
+
+        .. versionadded:: 2.3
+    max_messages_per_channel: Optional[:class:`int`]
+        The same as ``max_messages_per_guild`` but for a single channel or thread.
+        This defaults to ``None``.
+
+        .. versionadded:: 2.3
+    cache_stores: Optional[Dict[:class:`str`, Callable[[], MutableMapping[:class:`int`, Any]]]]
+        A mapping of entity store name to a callable that creates the store the library
+        caches those entities in, e.g. ``{'members': lambda: discord.LRUCacheStore(10_000)}``.
+        Stores that are not given keep the default in-memory behaviour.
+        See :class:`CacheStore` for the supported names.
+
+        .. versionadded:: 2.3
+    lazy_parsing: :class:`bool`
+        Whether to defer building the embeds, attachments, stickers, components and
+        reactions of received messages until they are first accessed. The caches are
+        still kept up to date, but bots that only look at a few message attributes skip
+        constructing models they never use. Only these message sub-models are deferred;
+        the message itself, its author and its mentions are still built eagerly.
+        Defaults to ``False``.
+
+        .. versionadded:: 2.3
+    socket_event_filter: Optional[Dict[:class:`str`, Callable[[:class:`bytes`], Any]]]
+        A mapping of gateway event names, e.g. ``MESSAGE_CREATE``, to a callable that
+        receives the full undecoded payload of that event as UTF-8 JSON :class:`bytes`.
+        These events bypass JSON decoding and the library's own parsing, which means
+        that they neither update the cache nor dispatch any of the regular events.
+
+        The callable is called synchronously from the gateway's read loop and
+        must not block, e.g. it could put the payload into a queue for another process.
+        ``READY`` and ``RESUMED`` cannot be filtered.
+
+        .. versionadded:: 2.3
     proxy: Optional[:class:`str`]
         Proxy URL.
     proxy_auth: Optional[:class:`aiohttp.BasicAuth`]
@@ -196,6 +241,15 @@ class Client:
         is ``True``.
 
         .. versionadded:: 1.5
+    chunk_priority: Union[:class:`str`, Callable[[:class:`Guild`], Any]]
+        The order guilds are chunked in at start-up. This can be ``'smallest'`` to chunk
+        the guilds with the fewest members first, ``'largest'`` for the ones with the
+        most members, ``'active'`` for the guilds with the most recent messages, or a
+        callable returning a sort key for a guild, lowest first. Chunk requests are sent
+        as fast as the gateway rate limit allows and :func:`on_chunk_progress` is called
+        as guilds finish chunking. Defaults to ``'smallest'``.
+
+        .. versionadded:: 2.3
     status: Optional[:class:`.Status`]
         A status to start your presence with upon logging on to Discord.
     activity: Optional[:class:`.BaseActivity`]
@@ -244,6 +298,70 @@ class Client:
         set to is ``30.0`` seconds.
 
         .. versionadded:: 2.0
+    ratelimit_backend: Optional[:class:`RateLimitBackend`]
+        The backend used to share the REST rate limit state with other clients using
+        the same token, such as a :class:`UnixSocketRateLimitBackend` connected to a
+        :class:`RateLimitCoordinator`. By default the rate limits are only tracked
+        within this client.
+
+        .. versionadded:: 2.3
+    ratelimit_observer: Optional[:class:`RateLimitObserver`]
+        An observer notified of the requests made by the client and how their rate
+        limits are handled, e.g. to export metrics. The current state of the rate limits
+        can be retrieved with ``client.http.get_ratelimit_snapshot()``.
+
+        .. versionadded:: 2.3
+    json_codec: Optional[Any]
+        The JSON codec used for the bodies of HTTP requests and responses. This is any
+        object with an ``encode`` method turning an object into :class:`bytes` (or :class:`str`)
+        and a ``decode`` method turning :class:`bytes` into an object, such as the
+        ``msgspec.json`` module. By default, ``orjson`` is used if it is installed
+        and :mod:`json` otherwise.
+
+        .. versionadded:: 2.3
+    response_cache_ttls: Optional[Dict[:class:`str`, :class:`float`]]
+        A mapping of routes to the number of seconds the responses of their ``GET``
+        requests are cached for, e.g. ``{'GET /users/{user_id}': 5.0}``. Cached responses
+        are dropped early when a gateway event or a request modifies the resource.
+        Identical ``GET`` requests issued concurrently always share a single request.
+        By default, no responses are cached.
+
+        .. versionadded:: 2.3
+    response_cache_max_size: :class:`int`
+        The maximum number of responses cached through ``response_cache_ttls``.
+        When it is reached, the responses closest to expiring are dropped first.
+        Defaults to ``1000``.
+
+        .. versionadded:: 2.3
+    compress: Optional[:class:`str`]
+        The transport compression to use for the gateway connection. This can be
+        ``'zlib-stream'``, ``'zstd-stream'`` or ``None`` to disable compression.
+        ``'zstd-stream'`` requires the `zstandard <https://pypi.org/project/zstandard/>`_
+        library. Defaults to ``'zlib-stream'``.
+
+        .. versionadded:: 2.3
+    session_store: Optional[:class:`SessionStore`]
+        The store the gateway session is saved to when the client is closed, such
+        as a :class:`FileSessionStore`. When the client starts again it tries to
+        RESUME the saved session instead of IDENTIFYing, in which case :func:`on_ready`
+        is dispatched once the session has been resumed. A saved session is deleted from
+        the store once it is loaded, so it is never resumed twice. Since no guilds are
+        received when resuming, this is best paired with a restored cache. By default
+        sessions are not saved.
+
+        .. versionadded:: 2.3
+    cache_snapshot: Optional[:class:`str`]
+        The path of a file the cached guilds, along with their channels, threads, roles,
+        emojis, stickers and members, are written to when the client is closed. They are
+        loaded back when the client logs in again, so they are available right away.
+        The guilds received from the gateway afterwards are applied on top of the loaded
+        ones. The restored members may be out of date until the guild is chunked again,
+        which replaces them and removes the ones that left the guild in the meantime,
+        so :attr:`Guild.chunked` stays ``False`` until then. The snapshot is a JSON file
+        holding the payloads of these objects, snapshots using an older layout are ignored.
+        By default no snapshot is made.
+
+        .. versionadded:: 2.3
 
     Attributes
     -----------
@@ -264,6 +382,11 @@ class Client:
         unsync_clock: bool = options.pop('assume_unsync_clock', True)
         http_trace: Optional[aiohttp.TraceConfig] = options.pop('http_trace', None)
         max_ratelimit_timeout: Optional[float] = options.pop('max_ratelimit_timeout', None)
+        ratelimit_backend: Optional[RateLimitBackend] = options.pop('ratelimit_backend', None)
+        response_cache_ttls: Optional[Dict[str, float]] = options.pop('response_cache_ttls', None)
+        ratelimit_observer: Optional[RateLimitObserver] = options.pop('ratelimit_observer', None)
+        json_codec: Optional[JSONCodec] = options.pop('json_codec', None)
+        response_cache_max_size: int = options.pop('response_cache_max_size', 1000)
         self.http: HTTPClient = HTTPClient(
             self.loop,
             proxy=proxy,
@@ -271,6 +394,11 @@ class Client:
             unsync_clock=unsync_clock,
             http_trace=http_trace,
             max_ratelimit_timeout=max_ratelimit_timeout,
+            ratelimit_backend=ratelimit_backend,
+            response_cache_ttls=response_cache_ttls,
+            ratelimit_observer=ratelimit_observer,
+            json_codec=json_codec,
+            response_cache_max_size=response_cache_max_size,
         )
 
         self._handlers: Dict[str, Callable[..., None]] = {
@@ -282,6 +410,25 @@ class Client:
         }
 
         self._enable_debug_events: bool = options.pop('enable_debug_events', False)
+        self._session_store: Optional[SessionStore] = options.pop('session_store', None)
+        self._cache_snapshot: Optional[str] = options.pop('cache_snapshot', None)
+
+        compress: Optional[str] = options.pop('compress', 'zlib-stream')
+        if compress not in ('zlib-stream', 'zstd-stream', None):
+            raise ValueError(f'compress must be one of zlib-stream, zstd-stream or None not {compress!r}')
+        if compress == 'zstd-stream' and not HAS_ZSTD:
+            raise RuntimeError('zstandard library needed in order to use zstd-stream compression')
+        self._gateway_compress: Optional[str] = compress
+
+        socket_event_filter: Dict[str, Callable[[bytes], Any]] = options.pop('socket_event_filter', None) or {}
+        for event, callback in socket_event_filter.items():
+            if event in ('READY', 'RESUMED'):
+                raise ValueError(f'{event} events cannot be filtered')
+            if not callable(callback):
+                raise TypeError(f'socket_event_filter callback for {event} must be a callable')
+        self._socket_event_filter: Dict[bytes, Callable[[bytes], Any]] = {
+            event.encode('ascii'): callback for event, callback in socket_event_filter.items()
+        }
         self._connection: ConnectionState[Self] = self._get_state(intents=intents, **options)
         self._connection.shard_count = self.shard_count
         self._closed: bool = False
@@ -289,6 +436,7 @@ class Client:
         self._application: Optional[AppInfo] = None
         self._connection._get_websocket = self._get_websocket
         self._connection._get_client = lambda: self
+        self._connection._has_consumer = self._has_consumer
 
         if VoiceClient.warn_nacl:
             VoiceClient.warn_nacl = False
@@ -318,6 +466,46 @@ class Client:
     def _handle_ready(self) -> None:
         self._ready.set()
 
+    async def _load_session(self, shard_id: Optional[int]) -> Optional[GatewaySession]:
+        if self._session_store is None:
+            return None
+
+        try:
+            session = await self._session_store.load(shard_id)
+            if session is not None:
+                # A session is only valid until it is used. If the process doesn't get to save
+                # it again, e.g. after a crash, resuming it later would replay events.
+                await self._session_store.delete(shard_id)
+        except Exception:
+            _log.exception('Failed to load the saved session of shard ID %s.', shard_id)
+            return None
+
+        if session is not None:
+            _log.info('Shard ID %s will try to RESUME the saved session %s.', shard_id, session.session_id)
+            self._connection._restored_sessions.add(shard_id)
+        return session
+
+    async def _save_cache_snapshot(self) -> None:
+        # A client that never got ready has nothing worth replacing the previous snapshot with
+        if self._cache_snapshot is None or not self.is_ready():
+            return
+
+        count = await self._connection._save_cache_snapshot(self._cache_snapshot)
+        _log.info('Wrote %s guilds to the cache snapshot %s.', count, self._cache_snapshot)
+
+    async def _save_session(self, ws: Optional[DiscordWebSocket]) -> bool:
+        # Returns whether the session was saved, in which case it must be kept alive on Discord's side
+        if self._session_store is None or ws is None or not ws.open or ws.session_id is None:
+            return False
+
+        session = GatewaySession(ws.session_id, ws.sequence, str(ws.gateway))
+        try:
+            await self._session_store.save(ws.shard_id, session)
+        except Exception:
+            _log.exception('Failed to save the session of shard ID %s.', ws.shard_id)
+            return False
+        return True
+
     @property
     def latency(self) -> float:
         """:class:`float`: Measures latency between a HEARTBEAT and a HEARTBEAT_ACK in seconds.
@@ -458,6 +646,11 @@ class Client:
         # Schedules the task
         return self.loop.create_task(wrapped, name=f'discord.py: {event_name}')
 
+    def _has_consumer(self, event: str, /) -> bool:
+        # Whether anything would receive this event if it were dispatched right now,
+        # this lets the state skip building objects that nobody would see.
+        return event in self._listeners or hasattr(self, 'on_' + event)
+
     def dispatch(self, event: str, /, *args: Any, **kwargs: Any) -> None:
         _log.debug('Dispatching event %s', event)
         method = 'on_' + event
@@ -611,6 +804,9 @@ class Client:
 
         data = await self.http.static_login(token)
         self._connection.user = ClientUser(state=self._connection, data=data)
+        if self._cache_snapshot is not None:
+            count = await self._connection._load_cache_snapshot(self._cache_snapshot)
+            _log.info('Loaded %s guilds from the cache snapshot %s.', count, self._cache_snapshot)
         self._application = await self.application_info()
         if self._connection.application_id is None:
             self._connection.application_id = self._application.id
@@ -650,6 +846,15 @@ class Client:
             'initial': True,
             'shard_id': self.shard_id,
         }
+        session = await self._load_session(self.shard_id)
+        if session is not None:
+            ws_params.update(
+                resume=True,
+                session=session.session_id,
+                sequence=session.sequence,
+                gateway=yarl.URL(session.resume_gateway_url),
+            )
+
         while not self.is_closed():
             try:
                 coro = DiscordWebSocket.from_client(self, **ws_params)
@@ -732,8 +937,11 @@ class Client:
         await self._connection.close()
 
         if self.ws is not None and self.ws.open:
-            await self.ws.close(code=1000)
+            # Closing with 1000 would end the session, which is kept when it can be resumed later
+            code = 4000 if await self._save_session(self.ws) else 1000
+            await self.ws.close(code=code)
 
+        await self._save_cache_snapshot()
         await self.http.close()
 
         if self._ready is not MISSING:
@@ -0,0 +1,754 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+from . import utils
+from .activity import create_activity
+from .enums import Status, try_enum
+from .errors import ClientException, SessionStartLimitReached
+from .http import HTTPClient
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from .activity import BaseActivity
+    from .sessions import SessionStore
+    from .shard import AutoShardedClient
+
+    ClusterHandler = Callable[..., Awaitable[Any]]
+
+__all__ = (
+    'ShardCluster',
+    'ClusterConnection',
+)
+
+_log = logging.getLogger(__name__)
+
+
+def _split_shards(shard_count: int, clusters: int) -> List[List[int]]:
+    # Contiguous ranges, the first clusters get one shard more if it doesn't divide evenly
+    size, extra = divmod(shard_count, clusters)
+    result: List[List[int]] = []
+    start = 0
+    for cluster_id in range(clusters):
+        end = start + size + (cluster_id < extra)
+        result.append(list(range(start, end)))
+        start = end
+    return result
+
+
+class _PendingBroadcast:
+    __slots__ = ('writer', 'nonce', 'waiting', 'results')
+
+    def __init__(self, writer: asyncio.StreamWriter, nonce: int, waiting: Set[int]) -> None:
+        self.writer: asyncio.StreamWriter = writer
+        self.nonce: int = nonce
+        self.waiting: Set[int] = waiting
+        self.results: List[Dict[str, Any]] = []
+
+
+class _ClusterCoordinator:
+    # Runs in the launcher process. Every cluster connects to it to space out
+    # IDENTIFYs and to pass requests on to the other clusters.
+
+    IDENTIFY_INTERVAL: float = 5.0
+
+    def __init__(self, path: str, *, max_concurrency: int = 1, sock: Optional[socket.socket] = None) -> None:
+        self.path: str = path
+        self.max_concurrency: int = max_concurrency
+        self._sock: Optional[socket.socket] = sock
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clusters: Dict[int, asyncio.StreamWriter] = {}
+        # shard_id % max_concurrency -> earliest time the next IDENTIFY can happen
+        self._identify_at: Dict[int, float] = {}
+        self._pending: Dict[int, _PendingBroadcast] = {}
+        self._nonce: int = 0
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        if self._sock is not None:
+            self._server = await asyncio.start_unix_server(self._handle_client, sock=self._sock)
+        else:
+            self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        _log.info('Cluster coordinator is listening on %s.', self.path)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in self._clusters.values():
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _identify(self, shard_id: int, now: float) -> float:
+        # Reserves the next IDENTIFY slot of the shard's bucket and returns how long to wait for it
+        bucket = shard_id % self.max_concurrency
+        at = max(now, self._identify_at.get(bucket, 0.0))
+        self._identify_at[bucket] = at + self.IDENTIFY_INTERVAL
+        return at - now
+
+    def _send(self, writer: asyncio.StreamWriter, payload: Dict[str, Any]) -> None:
+        if not writer.is_closing():
+            writer.write(utils._to_json_bytes(payload) + b'\n')
+
+    def _request(self, writer: asyncio.StreamWriter, data: Dict[str, Any]) -> None:
+        target = data.get('cluster_id')
+        if target is None:
+            targets = set(self._clusters)
+        elif target in self._clusters:
+            targets = {target}
+        else:
+            self._send(writer, {'nonce': data['nonce'], 'results': [{'cluster_id': target, 'error': 'not connected'}]})
+            return
+
+        self._nonce += 1
+        pending = _PendingBroadcast(writer, data['nonce'], targets)
+        self._pending[self._nonce] = pending
+        payload = {'op': 'handle', 'nonce': self._nonce, 'name': data['name'], 'data': data['data']}
+        for cluster_id in targets:
+            self._send(self._clusters[cluster_id], payload)
+
+        self._maybe_finish(self._nonce)
+
+    def _reply(self, cluster_id: int, data: Dict[str, Any]) -> None:
+        pending = self._pending.get(data['nonce'])
+        if pending is None or cluster_id not in pending.waiting:
+            return
+
+        pending.waiting.discard(cluster_id)
+        result = {'cluster_id': cluster_id}
+        if 'error' in data:
+            result['error'] = data['error']
+        else:
+            result['result'] = data.get('result')
+        pending.results.append(result)
+        self._maybe_finish(data['nonce'])
+
+    def _maybe_finish(self, nonce: int) -> None:
+        pending = self._pending[nonce]
+        if pending.waiting:
+            return
+
+        del self._pending[nonce]
+        results = sorted(pending.results, key=lambda r: r['cluster_id'])
+        self._send(pending.writer, {'nonce': pending.nonce, 'results': results})
+
+    def _drop_cluster(self, cluster_id: int) -> None:
+        self._clusters.pop(cluster_id, None)
+        for nonce, pending in list(self._pending.items()):
+            if cluster_id in pending.waiting:
+                pending.waiting.discard(cluster_id)
+                pending.results.append({'cluster_id': cluster_id, 'error': 'disconnected'})
+                self._maybe_finish(nonce)
+
+    def _handle(self, cluster_id: Optional[int], writer: asyncio.StreamWriter, data: Dict[str, Any]) -> None:
+        op = data.get('op')
+        if op == 'identify':
+            wait = self._identify(data['shard_id'], time.monotonic())
+            self._send(writer, {'nonce': data['nonce'], 'wait': wait})
+        elif op == 'request':
+            self._request(writer, data)
+        elif op == 'reply' and cluster_id is not None:
+            self._reply(cluster_id, data)
+        else:
+            _log.debug('Cluster coordinator received an unknown op %r.', op)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        cluster_id: Optional[int] = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                data = utils._from_json(line)
+                if data.get('op') == 'hello':
+                    cluster_id = data['cluster_id']
+                    self._clusters[cluster_id] = writer
+                    _log.debug('Cluster %s connected to the coordinator.', cluster_id)
+                else:
+                    self._handle(cluster_id, writer, data)
+                await writer.drain()
+        except (OSError, ValueError, KeyError) as exc:
+            _log.debug('Dropping cluster %s: %s', cluster_id, exc)
+        finally:
+            if cluster_id is not None and self._clusters.get(cluster_id) is writer:
+                self._drop_cluster(cluster_id)
+            writer.close()
+
+
+class ClusterConnection:
+    """The connection of a cluster started by :class:`ShardCluster` to the other
+    clusters.
+
+    It is available as :attr:`AutoShardedClient.cluster` inside the worker
+    processes, and is used to space out IDENTIFYs across every cluster as well as
+    to make requests to the other clusters.
+
+    Every cluster answers ``'guild_count'``, ``'get_guild'`` and ``'change_presence'``
+    requests out of the box. Other requests can be answered by registering a
+    handler through :meth:`handler`. Arguments and return values of requests
+    must be JSON serialisable.
+
+    .. versionadded:: 2.3
+
+    Attributes
+    -----------
+    cluster_id: :class:`int`
+        The ID of this cluster.
+    clusters: List[List[:class:`int`]]
+        The shard IDs of every cluster, indexed by cluster ID.
+    shard_count: :class:`int`
+        The total number of shards across every cluster.
+    """
+
+    def __init__(
+        self,
+        client: AutoShardedClient,
+        path: str,
+        *,
+        cluster_id: int,
+        clusters: Sequence[Sequence[int]],
+        shard_count: int,
+    ) -> None:
+        self.client: AutoShardedClient = client
+        self.path: str = path
+        self.cluster_id: int = cluster_id
+        self.clusters: List[List[int]] = [list(shard_ids) for shard_ids in clusters]
+        self.shard_count: int = shard_count
+        self._handlers: Dict[str, ClusterHandler] = {
+            'guild_count': self._guild_count,
+            'get_guild': self._get_guild,
+            'change_presence': self._change_presence,
+        }
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task[None]] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self._nonce: int = 0
+        self._waiting: Dict[int, asyncio.Future[Dict[str, Any]]] = {}
+
+    @property
+    def cluster_count(self) -> int:
+        """:class:`int`: The number of clusters."""
+        return len(self.clusters)
+
+    def is_connected(self) -> bool:
+        """:class:`bool`: Whether the cluster is connected to the launcher."""
+        return self._writer is not None
+
+    def cluster_for(self, guild_id: int, /) -> int:
+        """Returns the ID of the cluster running the shard of a guild.
+
+        Parameters
+        -----------
+        guild_id: :class:`int`
+            The ID of the guild.
+
+        Returns
+        --------
+        :class:`int`
+            The cluster ID.
+        """
+        shard_id = (guild_id >> 22) % self.shard_count
+        for cluster_id, shard_ids in enumerate(self.clusters):
+            if shard_id in shard_ids:
+                return cluster_id
+        raise ValueError(f'shard {shard_id} does not belong to any cluster')
+
+    def handler(self, name: str) -> Callable[[ClusterHandler], ClusterHandler]:
+        """A decorator that registers a coroutine answering requests called ``name``
+        sent through :meth:`request`.
+
+        The coroutine is called with the keyword arguments given to :meth:`request`
+        and its return value is sent back to the requesting cluster.
+
+        .. code-block:: python3
+
+            @client.cluster.handler('user_count')
+            async def user_count():
+                return len(client.users)
+
+        Parameters
+        -----------
+        name: :class:`str`
+            The name of the request.
+        """
+
+        def decorator(func: ClusterHandler) -> ClusterHandler:
+            if not asyncio.iscoroutinefunction(func):
+                raise TypeError('cluster handlers must be coroutine functions')
+            self._handlers[name] = func
+            return func
+
+        return decorator
+
+    async def connect(self) -> None:
+        """|coro|
+
+        Connects to the launcher. This is done automatically before the
+        shards are launched.
+
+        Raises
+        -------
+        OSError
+            The launcher could not be reached.
+        """
+        if self._writer is not None:
+            return
+
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        self._writer.write(utils._to_json_bytes({'op': 'hello', 'cluster_id': self.cluster_id}) + b'\n')
+        await self._writer.drain()
+        self._read_task = asyncio.create_task(self._read())
+        _log.debug('Cluster %s connected to the launcher at %s.', self.cluster_id, self.path)
+
+    async def close(self) -> None:
+        """|coro|
+
+        Disconnects from the launcher.
+        """
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        for future in self._waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionResetError('lost the connection to the cluster launcher'))
+        self._waiting.clear()
+
+    async def _read(self) -> None:
+        reader = self._reader
+        assert reader is not None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                data = utils._from_json(line)
+                if data.get('op') == 'handle':
+                    task = asyncio.create_task(self._dispatch(data))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                    continue
+
+                future = self._waiting.pop(data.get('nonce'), None)
+                if future is not None and not future.done():
+                    future.set_result(data)
+        except (OSError, ValueError) as exc:
+            _log.warning('Cluster %s lost the connection to the launcher: %s', self.cluster_id, exc)
+        finally:
+            self._disconnect()
+
+    async def _dispatch(self, data: Dict[str, Any]) -> None:
+        reply: Dict[str, Any] = {'op': 'reply', 'nonce': data['nonce']}
+        handler = self._handlers.get(data['name'])
+        if handler is None:
+            reply['error'] = f'no handler for {data["name"]!r}'
+        else:
+            try:
+                reply['result'] = await handler(**data['data'])
+            except Exception as exc:
+                _log.exception('Cluster handler %r raised an exception', data['name'])
+                reply['error'] = f'{exc.__class__.__name__}: {exc}'
+
+        writer = self._writer
+        if writer is None:
+            return
+        try:
+            writer.write(utils._to_json_bytes(reply) + b'\n')
+            await writer.drain()
+        except (OSError, TypeError) as exc:
+            _log.warning('Cluster %s could not reply to %r: %s', self.cluster_id, data['name'], exc)
+
+    async def _send(self, payload: Dict[str, Any], *, timeout: Optional[float] = None) -> Dict[str, Any]:
+        writer = self._writer
+        if writer is None:
+            raise ClientException('not connected to the cluster launcher')
+
+        self._nonce += 1
+        nonce = payload['nonce'] = self._nonce
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[nonce] = future
+        try:
+            writer.write(utils._to_json_bytes(payload) + b'\n')
+            await writer.drain()
+            return await asyncio.wait_for(future, timeout=timeout)
+        except OSError as exc:
+            raise ClientException('lost the connection to the cluster launcher') from exc
+        finally:
+            self._waiting.pop(nonce, None)
+
+    async def acquire_identify(self, shard_id: int) -> None:
+        """|coro|
+
+        Waits until a shard of this cluster is allowed to IDENTIFY.
+
+        The launcher lets one shard per ``max_concurrency`` bucket IDENTIFY
+        every 5 seconds, across every cluster. If the launcher can't be reached
+        this waits for 5 seconds instead.
+
+        Parameters
+        -----------
+        shard_id: :class:`int`
+            The ID of the shard about to IDENTIFY.
+        """
+        try:
+            response = await self._send({'op': 'identify', 'shard_id': shard_id})
+        except ClientException:
+            _log.warning('Cluster %s could not reach the launcher before IDENTIFYing shard %s.', self.cluster_id, shard_id)
+            await asyncio.sleep(_ClusterCoordinator.IDENTIFY_INTERVAL)
+            return
+
+        delay = response['wait']
+        if delay > 0:
+            _log.debug('Shard %s waits %.2f seconds before IDENTIFYing.', shard_id, delay)
+            await asyncio.sleep(delay)
+
+    async def request(
+        self, name: str, *, cluster_id: Optional[int] = None, timeout: Optional[float] = 30.0, **data: Any
+    ) -> Dict[int, Any]:
+        r"""|coro|
+
+        Sends a request to other clusters and waits for their answers.
+
+        Parameters
+        -----------
+        name: :class:`str`
+            The name of the request.
+        cluster_id: Optional[:class:`int`]
+            The cluster to send the request to. By default it's sent to every cluster,
+            including this one.
+        timeout: Optional[:class:`float`]
+            How long to wait for the answers. ``None`` waits forever.
+        \*\*data
+            The arguments of the request, passed to the handler.
+
+        Raises
+        -------
+        ClientException
+            The launcher could not be reached, or a cluster failed to answer.
+        asyncio.TimeoutError
+            The clusters did not answer in time.
+
+        Returns
+        --------
+        Dict[:class:`int`, Any]
+            The answers, keyed by cluster ID.
+        """
+        payload = {'op': 'request', 'name': name, 'cluster_id': cluster_id, 'data': data}
+        response = await self._send(payload, timeout=timeout)
+        answers: Dict[int, Any] = {}
+        for result in response['results']:
+            if 'error' in result:
+                raise ClientException(f'cluster {result["cluster_id"]} failed to handle {name!r}: {result["error"]}')
+            answers[result['cluster_id']] = result['result']
+        return answers
+
+    async def guild_count(self) -> int:
+        """|coro|
+
+        Returns the number of guilds across every cluster.
+
+        Raises
+        -------
+        ClientException
+            A cluster could not be reached.
+
+        Returns
+        --------
+        :class:`int`
+            The number of guilds.
+        """
+        answers = await self.request('guild_count')
+        return sum(answers.values())
+
+    async def fetch_guild(self, guild_id: int, /) -> Optional[Dict[str, Any]]:
+        """|coro|
+
+        Looks up a guild in the cache of the cluster that runs its shard.
+
+        Since :class:`Guild` objects can't be sent between processes, a summary
+        of the guild is returned instead, with the ``id``, ``name``, ``member_count``,
+        ``shard_id`` and ``cluster_id`` keys.
+
+        Parameters
+        -----------
+        guild_id: :class:`int`
+            The ID of the guild.
+
+        Raises
+        -------
+        ClientException
+            The cluster could not be reached.
+
+        Returns
+        --------
+        Optional[Dict[:class:`str`, Any]]
+            The guild summary, or ``None`` if the guild isn't cached.
+        """
+        cluster_id = self.cluster_for(guild_id)
+        answers = await self.request('get_guild', cluster_id=cluster_id, guild_id=guild_id)
+        return answers[cluster_id]
+
+    async def change_presence(self, *, activity: Optional[BaseActivity] = None, status: Optional[Status] = None) -> None:
+        """|coro|
+
+        Changes the presence of every shard across every cluster.
+
+        The parameters are the same as :meth:`AutoShardedClient.change_presence`.
+
+        Raises
+        -------
+        ClientException
+            A cluster could not be reached.
+        """
+        await self.request(
+            'change_presence',
+            activity=activity.to_dict() if activity is not None else None,
+            status=str(status) if status is not None else None,
+        )
+
+    async def _guild_count(self) -> int:
+        return len(self.client.guilds)
+
+    async def _get_guild(self, guild_id: int) -> Optional[Dict[str, Any]]:
+        guild = self.client.get_guild(guild_id)
+        if guild is None:
+            return None
+        return {
+            'id': guild.id,
+            'name': guild.name,
+            'member_count': guild.member_count,
+            'shard_id': guild.shard_id,
+            'cluster_id': self.cluster_id,
+        }
+
+    async def _change_presence(self, activity: Optional[Dict[str, Any]], status: Optional[str]) -> None:
+        await self.client.change_presence(
+            activity=create_activity(activity, self.client._connection),  # type: ignore # activity payloads are dicts here
+            status=try_enum(Status, status) if status is not None else None,
+        )
+
+
+def _run_cluster(
+    factory: Callable[..., AutoShardedClient],
+    token: str,
+    path: str,
+    cluster_id: int,
+    clusters: List[List[int]],
+    shard_count: int,
+    session_store: Optional[SessionStore],
+    options: Dict[str, Any],
+) -> None:
+    kwargs: Dict[str, Any] = {'shard_ids': clusters[cluster_id], 'shard_count': shard_count}
+    if session_store is not None:
+        kwargs['session_store'] = session_store
+    client = factory(**kwargs)
+    client.cluster = ClusterConnection(client, path, cluster_id=cluster_id, clusters=clusters, shard_count=shard_count)
+    client.run(token, **options)
+
+
+class ShardCluster:
+    """Runs the shards of a bot across several worker processes on the same machine.
+
+    Each worker process runs an :class:`AutoShardedClient` with its own subset
+    of the shards, created by calling ``factory`` with the ``shard_ids`` and
+    ``shard_count`` keyword arguments. This allows the bot to use more than one
+    CPU core.
+
+    The launcher process spaces out the IDENTIFYs of every shard across the workers
+    according to the bot's ``max_concurrency`` and passes requests between the
+    workers through :attr:`AutoShardedClient.cluster`. Everything goes through a
+    Unix socket, so no external service is needed.
+
+    .. code-block:: python3
+
+        def create_bot(**options):
+            return commands.AutoShardedBot(command_prefix='!', intents=intents, **options)
+
+        if __name__ == '__main__':
+            discord.ShardCluster(create_bot, clusters=4).run(token)
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    factory: Callable[..., :class:`AutoShardedClient`]
+        A callable returning the client of a worker. It is called in the worker
+        process, so it must be importable by the workers.
+    clusters: :class:`int`
+        The number of worker processes to run.
+    shard_count: Optional[:class:`int`]
+        The total number of shards. By default the number recommended by Discord is used.
+    path: Optional[:class:`str`]
+        The path of the Unix socket the workers connect to. By default a temporary
+        path is used.
+    session_store: Optional[:class:`SessionStore`]
+        The store the sessions of the shards are saved to, passed to ``factory`` as
+        the ``session_store`` keyword argument. The shards with a saved session
+        don't count towards the session starts needed to launch the workers.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., AutoShardedClient],
+        *,
+        clusters: int,
+        shard_count: Optional[int] = None,
+        path: Optional[str] = None,
+        session_store: Optional[SessionStore] = None,
+    ) -> None:
+        if clusters <= 0:
+            raise ValueError('clusters must be greater than 0')
+        if shard_count is not None and shard_count < clusters:
+            raise ValueError('shard_count must be at least the number of clusters')
+
+        self.factory: Callable[..., AutoShardedClient] = factory
+        self.clusters: int = clusters
+        self.shard_count: Optional[int] = shard_count
+        self.path: Optional[str] = path
+        self.session_store: Optional[SessionStore] = session_store
+        self.processes: List[multiprocessing.Process] = []
+
+    async def _fetch_gateway_info(self, token: str) -> Dict[str, Any]:
+        http = HTTPClient(asyncio.get_running_loop())
+        try:
+            await http.static_login(token)
+            shard_count, _, session_start_limit = await http.get_bot_gateway_info()
+        finally:
+            await http.close()
+
+        if self.shard_count is not None:
+            shard_count = self.shard_count
+        shard_count = max(shard_count, self.clusters)
+
+        # Resumed shards don't use up a session start, the same as in AutoShardedClient.launch_shards
+        required = shard_count
+        if self.session_store is not None:
+            for shard_id in range(shard_count):
+                try:
+                    session = await self.session_store.load(shard_id)
+                except Exception:
+                    _log.exception('Failed to load the saved session of shard ID %s.', shard_id)
+                    continue
+                if session is not None:
+                    required -= 1
+
+        remaining = session_start_limit['remaining']
+        if remaining < required:
+            raise SessionStartLimitReached(remaining, required, session_start_limit['reset_after'] / 1000)
+
+        max_concurrency = session_start_limit.get('max_concurrency') or 1
+        return {'shard_count': shard_count, 'max_concurrency': max_concurrency}
+
+    async def _supervise(self, sock: socket.socket, path: str, max_concurrency: int) -> None:
+        async with _ClusterCoordinator(path, max_concurrency=max_concurrency, sock=sock):
+            while any(process.is_alive() for process in self.processes):
+                await asyncio.sleep(1.0)
+
+    def run(self, token: str, **options: Any) -> None:
+        """Starts the worker processes and blocks until all of them exit.
+
+        The keyword arguments are passed to :meth:`Client.run` in every worker.
+
+        Parameters
+        -----------
+        token: :class:`str`
+            The authentication token.
+
+        Raises
+        -------
+        SessionStartLimitReached
+            Not enough session starts are left to launch every shard.
+        """
+        info = asyncio.run(self._fetch_gateway_info(token))
+        shard_count = info['shard_count']
+        clusters = _split_shards(shard_count, self.clusters)
+
+        path = self.path
+        directory = None
+        if path is None:
+            directory = tempfile.mkdtemp(prefix='discord-cluster-')
+            path = os.path.join(directory, 'cluster.sock')
+
+        # The socket is listening before the workers are started so that they can
+        # connect right away, the coordinator only starts accepting them afterwards.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(path)
+        sock.listen(len(clusters))
+
+        self.processes = [
+            multiprocessing.Process(
+                target=_run_cluster,
+                args=(self.factory, token, path, cluster_id, clusters, shard_count, self.session_store, options),
+                name=f'discord-cluster-{cluster_id}',
+            )
+            for cluster_id in range(len(clusters))
+        ]
+
+        _log.info('Launching %s shards across %s clusters.', shard_count, len(clusters))
+        try:
+            for process in self.processes:
+                process.start()
+            asyncio.run(self._supervise(sock, path, info['max_concurrency']))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for process in self.processes:
+                if process.is_alive():
+                    process.terminate()
+            for process in self.processes:
+                process.join()
+            sock.close()
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+            else:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
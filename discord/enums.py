@@ -68,6 +68,7 @@ __all__ = (
     'AutoModRuleActionType',
     'ForumLayoutType',
     'ForumOrderType',
+    'RequestPriority',
 )
 
 if TYPE_CHECKING:
@@ -757,6 +758,12 @@ class ForumOrderType(Enum):
     creation_date = 1
 
 
+class RequestPriority(Enum):
+    low = 0
+    normal = 1
+    high = 2
+
+
 def create_unknown_value(cls: Type[E], val: Any) -> E:
     value_cls = cls._enum_value_cls_  # type: ignore # This is narrowed below
     name = f'unknown_{val}'
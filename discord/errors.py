@@ -47,6 +47,7 @@ __all__ = (
     'ConnectionClosed',
     'PrivilegedIntentsRequired',
     'InteractionResponded',
+    'SessionStartLimitReached',
 )
 
 
@@ -278,3 +279,32 @@ class InteractionResponded(ClientException):
     def __init__(self, interaction: Interaction):
         self.interaction: Interaction = interaction
         super().__init__('This interaction has already been responded to before')
+
+
+class SessionStartLimitReached(ClientException):
+    """Exception that's raised when there are not enough session starts left
+    for the day to IDENTIFY every shard.
+
+    Discord limits how many times a bot can IDENTIFY per day. Raising this
+    instead of connecting prevents a crash loop from using up the limit.
+
+    .. versionadded:: 2.3
+
+    Attributes
+    -----------
+    remaining: :class:`int`
+        The number of session starts left.
+    required: :class:`int`
+        The number of session starts needed to launch the shards.
+    reset_after: :class:`float`
+        The number of seconds until the limit resets.
+    """
+
+    def __init__(self, remaining: int, required: int, reset_after: float):
+        self.remaining: int = remaining
+        self.required: int = required
+        self.reset_after: float = reset_after
+        super().__init__(
+            f'{required} session starts are required but only {remaining} are left, '
+            f'the limit resets in {reset_after:.0f} seconds'
+        )
@@ -216,6 +216,10 @@ class BotBase(GroupMixin[None]):
             if trigger_warning:
                 _log.warning('Privileged message content intent is missing, commands may not work as expected.')
 
+    def _has_consumer(self, event: str, /) -> bool:
+        # super() will resolve to Client
+        return super()._has_consumer(event) or bool(self.extra_events.get('on_' + event))  # type: ignore
+
     def dispatch(self, event_name: str, /, *args: Any, **kwargs: Any) -> None:
         # super() will resolve to Client
         super().dispatch(event_name, *args, **kwargs)  # type: ignore
@@ -27,6 +27,7 @@ import asyncio
 from collections import deque
 import concurrent.futures
 import logging
+import re
 import struct
 import sys
 import time
@@ -34,11 +35,18 @@ import threading
 import traceback
 import zlib
 
-from typing import Any, Callable, Coroutine, Deque, Dict, List, TYPE_CHECKING, NamedTuple, Optional, TypeVar
+from typing import Any, Callable, Coroutine, Deque, Dict, List, TYPE_CHECKING, NamedTuple, Optional, TypeVar, Union
 
 import aiohttp
 import yarl
 
+try:
+    import zstandard  # type: ignore
+except ModuleNotFoundError:
+    HAS_ZSTD = False
+else:
+    HAS_ZSTD = True
+
 from . import utils
 from .activity import BaseActivity
 from .enums import SpeakingState
@@ -77,6 +85,58 @@ class WebSocketClosure(Exception):
     pass
 
 
+class _ZlibDecompressor:
+    COMPRESSION_TYPE = 'zlib-stream'
+    SUFFIX = b'\x00\x00\xff\xff'
+
+    __slots__ = ('context', 'buffer')
+
+    def __init__(self) -> None:
+        self.context: zlib._Decompress = zlib.decompressobj()
+        self.buffer: bytearray = bytearray()
+
+    def decompress(self, data: bytes, /) -> Optional[bytes]:
+        # A payload can be split across several messages, the last one ends with the suffix
+        if not data.endswith(self.SUFFIX):
+            self.buffer.extend(data)
+            return None
+
+        buffer = self.buffer
+        if not buffer:
+            # The common case, the payload fits in a single message so there is nothing to join
+            return self.context.decompress(data)
+
+        buffer.extend(data)
+        try:
+            return self.context.decompress(buffer)
+        finally:
+            # Keeps the allocation around for the next split payload
+            del buffer[:]
+
+
+class _ZstdDecompressor:
+    COMPRESSION_TYPE = 'zstd-stream'
+
+    __slots__ = ('context',)
+
+    def __init__(self) -> None:
+        self.context = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes, /) -> Optional[bytes]:
+        return self.context.decompress(data) or None
+
+
+_DECOMPRESSORS: Dict[str, Callable[[], Union[_ZlibDecompressor, _ZstdDecompressor]]] = {
+    _ZlibDecompressor.COMPRESSION_TYPE: _ZlibDecompressor,
+    _ZstdDecompressor.COMPRESSION_TYPE: _ZstdDecompressor,
+}
+
+
+# Used to peek at the event name and sequence of a dispatch without decoding the payload
+_EVENT_NAME_REGEX = re.compile(rb'"t":\s*"([A-Z0-9_]+)"')
+_SEQUENCE_REGEX = re.compile(rb'"s":\s*([0-9]+)')
+
+
 class EventListener(NamedTuple):
     predicate: Callable[[Dict[str, Any]], bool]
     event: str
@@ -100,6 +160,16 @@ class GatewayRatelimiter:
             return False
         return self.remaining == 0
 
+    def get_remaining(self) -> int:
+        # The number of commands that can be sent right away, without using one up
+        current = time.time()
+        if current > self.window + self.per:
+            return self.max
+        return self.remaining
+
+    def reset_after(self) -> float:
+        return max(0.0, self.window + self.per - time.time())
+
     def get_delay(self) -> float:
         current = time.time()
 
@@ -323,8 +393,8 @@ class DiscordWebSocket:
         # ws related stuff
         self.session_id: Optional[str] = None
         self.sequence: Optional[int] = None
-        self._zlib: zlib._Decompress = zlib.decompressobj()
-        self._buffer: bytearray = bytearray()
+        self._decompressor: Optional[Union[_ZlibDecompressor, _ZstdDecompressor]] = None
+        self._socket_event_filter: Dict[bytes, Callable[[bytes], Any]] = {}
         self._close_code: Optional[int] = None
         self._rate_limiter: GatewayRatelimiter = GatewayRatelimiter()
 
@@ -335,10 +405,12 @@ class DiscordWebSocket:
     def is_ratelimited(self) -> bool:
         return self._rate_limiter.is_ratelimited()
 
-    def debug_log_receive(self, data: Dict[str, Any], /) -> None:
+    def debug_log_receive(self, data: Union[str, bytes], /) -> None:
+        if type(data) is bytes:
+            data = data.decode('utf-8')
         self._dispatch('socket_raw_receive', data)
 
-    def log_receive(self, _: Dict[str, Any], /) -> None:
+    def log_receive(self, _: Union[str, bytes], /) -> None:
         pass
 
     @classmethod
@@ -364,13 +436,16 @@ class DiscordWebSocket:
 
         gateway = gateway or cls.DEFAULT_GATEWAY
 
-        if zlib:
-            url = gateway.with_query(v=INTERNAL_API_VERSION, encoding=encoding, compress='zlib-stream')
+        compress = client._gateway_compress if zlib else None
+        if compress is not None:
+            url = gateway.with_query(v=INTERNAL_API_VERSION, encoding=encoding, compress=compress)
         else:
             url = gateway.with_query(v=INTERNAL_API_VERSION, encoding=encoding)
 
         socket = await client.http.ws_connect(str(url))
         ws = cls(socket, loop=client.loop)
+        if compress is not None:
+            ws._decompressor = _DECOMPRESSORS[compress]()
 
         # dynamically add attributes needed
         ws.token = client.http.token
@@ -386,6 +461,7 @@ class DiscordWebSocket:
         ws.session_id = session
         ws.sequence = sequence
         ws._max_heartbeat_timeout = client._connection.heartbeat_timeout
+        ws._socket_event_filter = client._socket_event_filter
 
         if client._enable_debug_events:
             ws.send = ws.debug_send
@@ -484,17 +560,50 @@ class DiscordWebSocket:
         await self.send_as_json(payload)
         _log.debug('Shard ID %s has sent the RESUME payload.', self.shard_id)
 
-    async def received_message(self, msg: Any, /) -> None:
-        if type(msg) is bytes:
-            self._buffer.extend(msg)
+    def _forward_raw_event(self, msg: Union[str, bytes], /) -> bool:
+        if type(msg) is str:
+            msg = msg.encode('utf-8')
+
+        # Only the keys that come before the event data are looked at.
+        # Discord sends those first, if it doesn't then the payload is decoded as usual.
+        end = msg.find(b'"d":')
+        header = msg[:end] if end != -1 else msg
+        match = _EVENT_NAME_REGEX.search(header)
+        if match is None:
+            return False
+
+        try:
+            callback = self._socket_event_filter[match.group(1)]
+        except KeyError:
+            return False
+
+        sequence = _SEQUENCE_REGEX.search(header)
+        if sequence is None:
+            return False
+
+        self.sequence = int(sequence.group(1))
+        if self._keep_alive:
+            self._keep_alive.tick()
+
+        event = match.group(1).decode('ascii')
+        self._dispatch('socket_event_type', event)
+        try:
+            callback(msg)  # type: ignore # msg is bytes here
+        except Exception:
+            _log.exception('Ignoring exception in socket event filter for %s', event)
+        return True
 
-            if len(msg) < 4 or msg[-4:] != b'\x00\x00\xff\xff':
+    async def received_message(self, msg: Any, /) -> None:
+        if type(msg) is bytes and self._decompressor is not None:
+            msg = self._decompressor.decompress(msg)
+            if msg is None:
                 return
-            msg = self._zlib.decompress(self._buffer)
-            msg = msg.decode('utf-8')
-            self._buffer = bytearray()
 
+        # Both JSON decoders accept the UTF-8 bytes as is, so there is no need to decode to str first
         self.log_receive(msg)
+        if self._socket_event_filter and self._forward_raw_event(msg):
+            return
+
         msg = utils._from_json(msg)
 
         _log.debug('For Shard ID %s: WebSocket Event: %s', self.shard_id, msg)
@@ -570,7 +679,9 @@ class DiscordWebSocket:
         except KeyError:
             _log.debug('Unknown event %s.', event)
         else:
-            func(data)
+            self._connection._invalidate_cached_responses(event, data)
+            if self._connection._should_parse(event, data):
+                func(data)
 
         # remove the dispatched listeners
         removed = []
@@ -702,7 +813,7 @@ class DiscordWebSocket:
 
     async def request_chunks(
         self,
-        guild_id: int,
+        guild_id: Union[int, List[int]],
         query: Optional[str] = None,
         *,
         limit: int,
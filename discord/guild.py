@@ -34,8 +34,10 @@ from typing import (
     Collection,
     Coroutine,
     Dict,
+    Iterable,
     List,
     Mapping,
+    MutableMapping,
     NamedTuple,
     Sequence,
     Set,
@@ -48,7 +50,7 @@ from typing import (
 )
 import warnings
 
-from . import utils, abc
+from . import utils, abc, bulk
 from .role import Role
 from .member import Member, VoiceState
 from .emoji import Emoji
@@ -103,7 +105,7 @@ __all__ = (
 MISSING = utils.MISSING
 
 if TYPE_CHECKING:
-    from .abc import Snowflake, SnowflakeTime
+    from .abc import Snowflake, SnowflakeTime, _PermissionCache
     from .types.guild import (
         Ban as BanPayload,
         Guild as GuildPayload,
@@ -129,7 +131,9 @@ if TYPE_CHECKING:
         StageChannel as StageChannelPayload,
         ForumChannel as ForumChannelPayload,
     )
+    from .types.audit_log import AuditLog as AuditLogPayload, AuditLogEntry as AuditLogEntryPayload
     from .types.integration import IntegrationType
+    from .types.member import MemberWithUser as MemberWithUserPayload
     from .types.snowflake import SnowflakeList
     from .types.widget import EditWidgetSettings
     from .message import EmojiInputType
@@ -321,6 +325,7 @@ class Guild(Hashable):
         'premium_progress_bar_enabled',
         '_safety_alerts_channel_id',
         'max_stage_video_users',
+        '_permission_cache',
     )
 
     _PREMIUM_GUILD_LIMITS: ClassVar[Dict[Optional[int], _GuildLimit]] = {
@@ -332,12 +337,14 @@ class Guild(Hashable):
     }
 
     def __init__(self, *, data: GuildPayload, state: ConnectionState) -> None:
-        self._channels: Dict[int, GuildChannel] = {}
-        self._members: Dict[int, Member] = {}
+        self._channels: MutableMapping[int, GuildChannel] = state._create_store('channels')
+        self._members: MutableMapping[int, Member] = state._create_store('members')
         self._voice_states: Dict[int, VoiceState] = {}
-        self._threads: Dict[int, Thread] = {}
+        self._threads: MutableMapping[int, Thread] = state._create_store('threads')
         self._stage_instances: Dict[int, StageInstance] = {}
         self._scheduled_events: Dict[int, ScheduledEvent] = {}
+        # channel_id -> resolved permissions per role combination, see abc.GuildChannel.permissions_for
+        self._permission_cache: Dict[int, _PermissionCache] = {}
         self._state: ConnectionState = state
         self._member_count: Optional[int] = None
         self._from_data(data)
@@ -347,6 +354,7 @@ class Guild(Hashable):
 
     def _remove_channel(self, channel: Snowflake, /) -> None:
         self._channels.pop(channel.id, None)
+        self._permission_cache.pop(channel.id, None)
 
     def _voice_state_for(self, user_id: int, /) -> Optional[VoiceState]:
         return self._voice_states.get(user_id)
@@ -367,6 +375,7 @@ class Guild(Hashable):
 
     def _remove_thread(self, thread: Snowflake, /) -> None:
         self._threads.pop(thread.id, None)
+        self._permission_cache.pop(thread.id, None)
 
     def _clear_threads(self) -> None:
         self._threads.clear()
@@ -433,6 +442,7 @@ class Guild(Hashable):
             r.position += not r.is_default()
 
         self._roles[role.id] = role
+        self._invalidate_permissions()
 
     def _remove_role(self, role_id: int, /) -> Role:
         # this raises KeyError if it fails..
@@ -444,8 +454,13 @@ class Guild(Hashable):
         for r in self._roles.values():
             r.position -= r.position > role.position
 
+        self._invalidate_permissions()
         return role
 
+    def _invalidate_permissions(self) -> None:
+        # Role permissions feed into every channel's cached permissions
+        self._permission_cache.clear()
+
     @classmethod
     def _create_unavailable(cls, *, state: ConnectionState, guild_id: int) -> Guild:
         return cls(state=state, data={'id': guild_id, 'unavailable': True})  # type: ignore
@@ -467,8 +482,9 @@ class Guild(Hashable):
         self._banner: Optional[str] = guild.get('banner')
         self.unavailable: bool = guild.get('unavailable', False)
         self.id: int = int(guild['id'])
-        self._roles: Dict[int, Role] = {}
         state = self._state  # speed up attribute access
+        self._roles: MutableMapping[int, Role] = state._create_store('roles')
+        self._invalidate_permissions()
         for r in guild.get('roles', []):
             role = Role(guild=self, data=r, state=state)
             self._roles[role.id] = role
@@ -1053,9 +1069,14 @@ class Guild(Hashable):
 
         If this value returns ``False``, then you should request for
         offline members.
+
+        .. versionchanged:: 2.3
+
+            This is ``False`` while the guild has members restored from a cache
+            snapshot that were not refreshed yet.
         """
         count = self._member_count
-        if count is None:
+        if count is None or self.id in self._state._stale_members:
             return False
         return count == len(self._members)
 
@@ -2216,7 +2237,9 @@ class Guild(Hashable):
 
         return threads
 
-    async def fetch_members(self, *, limit: Optional[int] = 1000, after: SnowflakeTime = MISSING) -> AsyncIterator[Member]:
+    async def fetch_members(
+        self, *, limit: Optional[int] = 1000, after: SnowflakeTime = MISSING, prefetch: int = 0
+    ) -> AsyncIterator[Member]:
         """Retrieves an :term:`asynchronous iterator` that enables receiving the guild's members. In order to use this,
         :meth:`Intents.members` must be enabled.
 
@@ -2237,6 +2260,14 @@ class Guild(Hashable):
             Retrieve members after this date or object.
             If a datetime is provided, it is recommended to use a UTC aware datetime.
             If the datetime is naive, it is assumed to be local time.
+        prefetch: :class:`int`
+            The maximum number of pages of members to fetch in the background ahead
+            of the iteration, so that fetching the next page overlaps with processing the
+            current one. Pages are still fetched one after another, as every page starts
+            where the previous one ended. Defaults to ``0``, which fetches a page only once
+            the previous one has been consumed.
+
+            .. versionadded:: 2.3
 
         Raises
         ------
@@ -2262,28 +2293,32 @@ class Guild(Hashable):
         if not self._state._intents.members:
             raise ClientException('Intents.members must be enabled to use this.')
 
-        while True:
-            retrieve = 1000 if limit is None else min(limit, 1000)
-            if retrieve < 1:
-                return
+        state = self._state
 
-            if isinstance(after, datetime.datetime):
-                after = Object(id=utils.time_snowflake(after, high=True))
+        async def _pages(after: SnowflakeTime, limit: Optional[int]) -> AsyncIterator[List[MemberWithUserPayload]]:
+            while True:
+                retrieve = 1000 if limit is None else min(limit, 1000)
+                if retrieve < 1:
+                    return
 
-            after = after or OLDEST_OBJECT
-            after_id = after.id if after else None
-            state = self._state
+                if isinstance(after, datetime.datetime):
+                    after = Object(id=utils.time_snowflake(after, high=True))
 
-            data = await state.http.get_members(self.id, retrieve, after_id)
-            if not data:
-                return
+                after = after or OLDEST_OBJECT
+                after_id = after.id if after else None
 
-            # Terminate loop on next iteration; there's no data left after this
-            if len(data) < 1000:
-                limit = 0
+                data = await state.http.get_members(self.id, retrieve, after_id)
+                if not data:
+                    return
 
-            after = Object(id=int(data[-1]['user']['id']))
+                # Terminate loop on next iteration; there's no data left after this
+                if len(data) < 1000:
+                    limit = 0
 
+                after = Object(id=int(data[-1]['user']['id']))
+                yield data
+
+        async for data in utils._prefetch(_pages(after, limit), prefetch):
             for raw_member in reversed(data):
                 yield Member(data=raw_member, guild=self, state=state)
 
@@ -2402,6 +2437,7 @@ class Guild(Hashable):
         limit: Optional[int] = 1000,
         before: Snowflake = MISSING,
         after: Snowflake = MISSING,
+        prefetch: int = 0,
     ) -> AsyncIterator[BanEntry]:
         """Retrieves an :term:`asynchronous iterator` of the users that are banned from the guild as a :class:`BanEntry`.
 
@@ -2435,6 +2471,14 @@ class Guild(Hashable):
             Retrieves bans before this user.
         after: :class:`.abc.Snowflake`
             Retrieve bans after this user.
+        prefetch: :class:`int`
+            The maximum number of pages of bans to fetch in the background ahead
+            of the iteration, so that fetching the next page overlaps with processing the
+            current one. Pages are still fetched one after another, as every page starts
+            where the previous one ended. Defaults to ``0``, which fetches a page only once
+            the previous one has been consumed.
+
+            .. versionadded:: 2.3
 
         Raises
         -------
@@ -2487,17 +2531,21 @@ class Guild(Hashable):
         else:
             strategy, state = _after_strategy, after
 
-        while True:
-            retrieve = 1000 if limit is None else min(limit, 1000)
-            if retrieve < 1:
-                return
+        async def _pages(state: Optional[Snowflake], limit: Optional[int]) -> AsyncIterator[List[BanPayload]]:
+            while True:
+                retrieve = 1000 if limit is None else min(limit, 1000)
+                if retrieve < 1:
+                    return
+
+                data, state, limit = await strategy(retrieve, state, limit)
 
-            data, state, limit = await strategy(retrieve, state, limit)
+                # Terminate loop on next iteration; there's no data left after this
+                if len(data) < 1000:
+                    limit = 0
 
-            # Terminate loop on next iteration; there's no data left after this
-            if len(data) < 1000:
-                limit = 0
+                yield data
 
+        async for data in utils._prefetch(_pages(state, limit), prefetch):
             for e in data:
                 yield BanEntry(user=User(state=self._state, data=e['user']), reason=e['reason'])
 
@@ -3735,6 +3783,125 @@ class Guild(Hashable):
         """
         await self._state.http.unban(user.id, self.id, reason=reason)
 
+    def bulk_ban(
+        self,
+        users: Iterable[Snowflake],
+        *,
+        reason: Optional[str] = None,
+        delete_message_seconds: int = 86400,
+    ) -> AsyncIterator[bulk.BulkResult[Snowflake]]:
+        """Bans many users from the guild.
+
+        This is a shortcut for :func:`bulk.ban` with this guild.
+
+        You must have :attr:`~Permissions.ban_members` and :attr:`~Permissions.manage_guild`
+        to do this.
+
+        .. versionadded:: 2.3
+
+        Parameters
+        -----------
+        users: Iterable[:class:`abc.Snowflake`]
+            The users to ban.
+        reason: Optional[:class:`str`]
+            The reason for banning the users. Shows up on the audit log.
+        delete_message_seconds: :class:`int`
+            The number of seconds worth of messages to delete from the users
+            in the guild. The minimum is 0 and the maximum is 604800 (7 days).
+            Defaults to 1 day.
+
+        Yields
+        -------
+        :class:`bulk.BulkResult`
+            The outcome for every user.
+        """
+        return bulk.ban(self, users, reason=reason, delete_message_seconds=delete_message_seconds)
+
+    def bulk_add_roles(
+        self,
+        members: Iterable[Member],
+        *roles: Snowflake,
+        reason: Optional[str] = None,
+        concurrency: int = 4,
+    ) -> AsyncIterator[bulk.BulkResult[Member]]:
+        """Gives roles to many members of the guild.
+
+        This is a shortcut for :func:`bulk.add_roles` that checks that
+        every member belongs to this guild.
+
+        You must have :attr:`~Permissions.manage_roles` to do this.
+
+        .. versionadded:: 2.3
+
+        Parameters
+        -----------
+        members: Iterable[:class:`Member`]
+            The members to give the roles to.
+        \\*roles: :class:`abc.Snowflake`
+            The roles to give to every member.
+        reason: Optional[:class:`str`]
+            The reason for giving the roles. Shows up on the audit log.
+        concurrency: :class:`int`
+            The maximum number of requests in flight.
+
+        Raises
+        -------
+        ValueError
+            One of the members is not a member of this guild.
+
+        Yields
+        -------
+        :class:`bulk.BulkResult`
+            The outcome for every member.
+        """
+        return bulk.add_roles(self._own_members(members), *roles, reason=reason, concurrency=concurrency)
+
+    def bulk_remove_roles(
+        self,
+        members: Iterable[Member],
+        *roles: Snowflake,
+        reason: Optional[str] = None,
+        concurrency: int = 4,
+    ) -> AsyncIterator[bulk.BulkResult[Member]]:
+        """Removes roles from many members of the guild.
+
+        This is a shortcut for :func:`bulk.remove_roles` that checks that
+        every member belongs to this guild.
+
+        You must have :attr:`~Permissions.manage_roles` to do this.
+
+        .. versionadded:: 2.3
+
+        Parameters
+        -----------
+        members: Iterable[:class:`Member`]
+            The members to remove the roles from.
+        \\*roles: :class:`abc.Snowflake`
+            The roles to remove from every member.
+        reason: Optional[:class:`str`]
+            The reason for removing the roles. Shows up on the audit log.
+        concurrency: :class:`int`
+            The maximum number of requests in flight.
+
+        Raises
+        -------
+        ValueError
+            One of the members is not a member of this guild.
+
+        Yields
+        -------
+        :class:`bulk.BulkResult`
+            The outcome for every member.
+        """
+        return bulk.remove_roles(self._own_members(members), *roles, reason=reason, concurrency=concurrency)
+
+    def _own_members(self, members: Iterable[Member]) -> List[Member]:
+        members = list(members)
+        for member in members:
+            if member.guild.id != self.id:
+                raise ValueError(f'{member!r} is not a member of this guild')
+        return members
+
     @property
     def vanity_url(self) -> Optional[str]:
         """Optional[:class:`str`]: The Discord vanity invite URL for this guild, if available.
@@ -3794,6 +3961,7 @@ class Guild(Hashable):
         oldest_first: bool = MISSING,
         user: Snowflake = MISSING,
         action: AuditLogAction = MISSING,
+        prefetch: int = 0,
     ) -> AsyncIterator[AuditLogEntry]:
         """Returns an :term:`asynchronous iterator` that enables receiving the guild's audit logs.
 
@@ -3836,6 +4004,14 @@ class Guild(Hashable):
             The moderator to filter entries from.
         action: :class:`AuditLogAction`
             The action to filter with.
+        prefetch: :class:`int`
+            The maximum number of pages of entries to fetch in the background ahead
+            of the iteration, so that fetching the next page overlaps with processing the
+            current one. Pages are still fetched one after another, as every page starts
+            where the previous one ended. Defaults to ``0``, which fetches a page only once
+            the previous one has been consumed.
+
+            .. versionadded:: 2.3
 
         Raises
         -------
@@ -3914,16 +4090,27 @@ class Guild(Hashable):
         from .app_commands import AppCommand
         from .webhook import Webhook
 
-        while True:
-            retrieve = 100 if limit is None else min(limit, 100)
-            if retrieve < 1:
-                return
+        async def _pages(
+            state: Optional[Snowflake], limit: Optional[int]
+        ) -> AsyncIterator[Tuple[AuditLogPayload, List[AuditLogEntryPayload]]]:
+            while True:
+                retrieve = 100 if limit is None else min(limit, 100)
+                if retrieve < 1:
+                    return
 
-            data, raw_entries, state, limit = await strategy(retrieve, state, limit)
+                data, raw_entries, state, limit = await strategy(retrieve, state, limit)
 
-            if predicate:
-                raw_entries = filter(predicate, raw_entries)
+                if predicate:
+                    raw_entries = filter(predicate, raw_entries)
 
+                page = list(raw_entries)
+                yield data, page
+
+                if len(page) < 100:
+                    # There's no data left after this
+                    break
+
+        async for data, raw_entries in utils._prefetch(_pages(state, limit), prefetch):
             users = (User(data=raw_user, state=self._state) for raw_user in data.get('users', []))
             user_map = {user.id: user for user in users}
 
@@ -3942,9 +4129,7 @@ class Guild(Hashable):
             webhooks = (Webhook.from_state(data=raw_webhook, state=self._state) for raw_webhook in data.get('webhooks', []))
             webhook_map = {webhook.id: webhook for webhook in webhooks}
 
-            count = 0
-
-            for count, raw_entry in enumerate(raw_entries, 1):
+            for raw_entry in raw_entries:
                 # Weird Discord quirk
                 if raw_entry['action_type'] is None:
                     continue
@@ -3959,10 +4144,6 @@ class Guild(Hashable):
                     guild=self,
                 )
 
-            if count < 100:
-                # There's no data left after this
-                break
-
     async def widget(self) -> Widget:
         """|coro|
 
@@ -25,10 +25,15 @@ DEALINGS IN THE SOFTWARE.
 from __future__ import annotations
 
 import asyncio
+import copy
+import heapq
 import logging
+import re
 import sys
+import time
 from typing import (
     Any,
+    Callable,
     ClassVar,
     Coroutine,
     Dict,
@@ -39,6 +44,7 @@ from typing import (
     Optional,
     overload,
     Sequence,
+    Set,
     Tuple,
     TYPE_CHECKING,
     Type,
@@ -51,29 +57,43 @@ import datetime
 
 import aiohttp
 
+from .enums import RequestPriority
 from .errors import HTTPException, RateLimited, Forbidden, NotFound, LoginFailure, DiscordServerError, GatewayNotFound
 from .gateway import DiscordClientWebSocketResponse
 from .file import File
 from .mentions import AllowedMentions
 from . import __version__, utils
+from .ratelimits import _request_priority
 from .utils import MISSING
 
 _log = logging.getLogger(__name__)
 
+_SNOWFLAKE_REGEX = re.compile(r'/([0-9]{15,20})(?=/|$)')
+
 if TYPE_CHECKING:
     from typing_extensions import Self
 
     from .ui.view import View
+    from .ratelimits import RateLimitBackend, RateLimitObserver
     from .embeds import Embed
     from .message import Attachment
     from .flags import MessageFlags
     from .enums import AuditLogAction
+    from typing import Protocol
+
+    class JSONCodec(Protocol):
+        def encode(self, obj: Any, /) -> Union[bytes, str]:
+            ...
+
+        def decode(self, data: bytes, /) -> Any:
+            ...
 
     from .types import (
         appinfo,
         audit_log,
         automod,
         channel,
+        gateway,
         command,
         emoji,
         guild,
@@ -100,16 +120,33 @@ if TYPE_CHECKING:
     Response = Coroutine[Any, Any, T]
 
 
-async def json_or_text(response: aiohttp.ClientResponse) -> Union[Dict[str, Any], str]:
-    text = await response.text(encoding='utf-8')
+async def json_or_text(
+    response: aiohttp.ClientResponse, *, loads: Callable[[bytes], Any] = utils._from_json
+) -> Union[Dict[str, Any], str]:
+    # The JSON decoder is given the raw body to avoid decoding it to a str first
+    body = await response.read()
     try:
         if response.headers['content-type'] == 'application/json':
-            return utils._from_json(text)
+            return loads(body)
     except KeyError:
         # Thanks Cloudflare
         pass
 
-    return text
+    return body.decode('utf-8')
+
+
+class BucketStats(NamedTuple):
+    buckets: int
+    bucket_hashes: int
+    evicted_buckets: int
+
+
+class RateLimitSnapshot(NamedTuple):
+    limit: int
+    remaining: int
+    outgoing: int
+    pending: int
+    reset_after: Optional[float]
 
 
 class MultipartParameters(NamedTuple):
@@ -319,6 +356,91 @@ class Route:
         )
 
 
+# How often every priority is served relative to the others when they all have pending requests
+_PRIORITY_WEIGHTS: Dict[RequestPriority, int] = {
+    RequestPriority.low: 1,
+    RequestPriority.normal: 4,
+    RequestPriority.high: 16,
+}
+
+
+class _PendingRequests:
+    """A weighted fair queue of the requests waiting on a rate limit.
+
+    Every priority has its own FIFO lane. The lanes are served in proportion
+    to their weight so higher priorities overtake lower ones without starving them.
+    """
+
+    __slots__ = ('_lanes', '_passes', '_virtual_time')
+
+    def __init__(self) -> None:
+        self._lanes: Dict[RequestPriority, deque[asyncio.Future[Any]]] = {}
+        # Priority -> virtual time at which the lane is served next
+        self._passes: Dict[RequestPriority, float] = {}
+        self._virtual_time: float = 0.0
+
+    def __len__(self) -> int:
+        count = 0
+        for priority, lane in self._lanes.items():
+            if any(future.done() for future in lane):
+                # Drop the requests that were cancelled while waiting
+                self._lanes[priority] = lane = deque(future for future in lane if not future.done())
+            count += len(lane)
+        return count
+
+    def __bool__(self) -> bool:
+        for lane in self._lanes.values():
+            while lane and lane[0].done():
+                lane.popleft()
+            if lane:
+                return True
+        return False
+
+    def append(self, future: asyncio.Future[Any], priority: RequestPriority = RequestPriority.normal) -> None:
+        try:
+            lane = self._lanes[priority]
+        except KeyError:
+            lane = self._lanes[priority] = deque()
+
+        if not lane:
+            # An idle lane can't claim the turns it missed while it was idle
+            self._passes[priority] = max(self._passes.get(priority, 0.0), self._virtual_time)
+        lane.append(future)
+
+    def popleft(self) -> asyncio.Future[Any]:
+        best: Optional[RequestPriority] = None
+        for priority, lane in self._lanes.items():
+            # Cancelled requests shouldn't use up the turn of their lane
+            while lane and lane[0].done():
+                lane.popleft()
+            if not lane:
+                continue
+            if best is None or (self._passes[priority], -priority.value) < (self._passes[best], -best.value):
+                best = priority
+
+        if best is None:
+            raise IndexError('pop from an empty queue')
+
+        self._virtual_time = self._passes[best]
+        self._passes[best] += 1 / _PRIORITY_WEIGHTS[best]
+        return self._lanes[best].popleft()
+
+
+class _PrioritizedRatelimit:
+    __slots__ = ('ratelimit', 'priority')
+
+    def __init__(self, ratelimit: Ratelimit, priority: RequestPriority) -> None:
+        self.ratelimit: Ratelimit = ratelimit
+        self.priority: RequestPriority = priority
+
+    async def __aenter__(self) -> Ratelimit:
+        await self.ratelimit.acquire(self.priority)
+        return self.ratelimit
+
+    async def __aexit__(self, type: Type[BE], value: BE, traceback: TracebackType) -> None:
+        await self.ratelimit.__aexit__(type, value, traceback)
+
+
 class Ratelimit:
     """Represents a Discord rate limit.
 
@@ -328,6 +450,9 @@ class Ratelimit:
     everything into a single lock queue per route.
     """
 
+    # Seconds without requests after which an idle rate limit can be discarded
+    INACTIVE_AFTER: ClassVar[float] = 300.0
+
     __slots__ = (
         'limit',
         'remaining',
@@ -340,6 +465,8 @@ class Ratelimit:
         '_loop',
         '_pending_requests',
         '_sleeping',
+        '_notify',
+        'key',
     )
 
     def __init__(self, max_ratelimit_timeout: Optional[float]) -> None:
@@ -351,12 +478,15 @@ class Ratelimit:
         self.dirty: bool = False
         self._max_ratelimit_timeout: Optional[float] = max_ratelimit_timeout
         self._loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
-        self._pending_requests: deque[asyncio.Future[Any]] = deque()
+        self._pending_requests: _PendingRequests = _PendingRequests()
         # Only a single rate limit object should be sleeping at a time.
         # The object that is sleeping is ultimately responsible for freeing the semaphore
         # for the requests currently pending.
         self._sleeping: asyncio.Lock = asyncio.Lock()
         self._last_request: float = self._loop.time()
+        # Set by the HTTP client to report what happens to its observer
+        self._notify: Optional[Callable[..., None]] = None
+        self.key: str = ''
 
     def __repr__(self) -> str:
         return (
@@ -416,6 +546,8 @@ class Ratelimit:
         exception = RateLimited(self.reset_after) if error else None
         async with self._sleeping:
             if not error:
+                if self._notify is not None and self.reset_after > 0:
+                    self._notify('on_preemptive_sleep', self.key, self.reset_after)
                 await asyncio.sleep(self.reset_after)
 
         self.reset()
@@ -426,9 +558,12 @@ class Ratelimit:
 
     def is_inactive(self) -> bool:
         delta = self._loop.time() - self._last_request
-        return delta >= 300 and self.outgoing == 0 and len(self._pending_requests) == 0
+        return delta >= self.INACTIVE_AFTER and self.outgoing == 0 and len(self._pending_requests) == 0
+
+    def prioritized(self, priority: RequestPriority) -> _PrioritizedRatelimit:
+        return _PrioritizedRatelimit(self, priority)
 
-    async def acquire(self) -> None:
+    async def acquire(self, priority: RequestPriority = RequestPriority.normal) -> None:
         self._last_request = self._loop.time()
         if self.is_expired():
             self.reset()
@@ -441,7 +576,7 @@ class Ratelimit:
 
         while self.remaining <= 0:
             future = self._loop.create_future()
-            self._pending_requests.append(future)
+            self._pending_requests.append(future, priority)
             try:
                 await future
             except:
@@ -479,6 +614,14 @@ class Ratelimit:
 aiohttp.hdrs.WEBSOCKET = 'websocket'  # type: ignore
 
 
+class _InflightRequest:
+    __slots__ = ('task', 'shared')
+
+    def __init__(self, task: asyncio.Task[Any]) -> None:
+        self.task: asyncio.Task[Any] = task
+        self.shared: bool = False
+
+
 class HTTPClient:
     """Represents an HTTP client sending HTTP requests to the Discord API."""
 
@@ -492,6 +635,11 @@ class HTTPClient:
         unsync_clock: bool = True,
         http_trace: Optional[aiohttp.TraceConfig] = None,
         max_ratelimit_timeout: Optional[float] = None,
+        ratelimit_backend: Optional[RateLimitBackend] = None,
+        response_cache_ttls: Optional[Dict[str, float]] = None,
+        ratelimit_observer: Optional[RateLimitObserver] = None,
+        json_codec: Optional[JSONCodec] = None,
+        response_cache_max_size: int = 1000,
     ) -> None:
         self.loop: asyncio.AbstractEventLoop = loop
         self.connector: aiohttp.BaseConnector = connector or MISSING
@@ -503,15 +651,46 @@ class HTTPClient:
         # Route key + Major Parameters -> Rate limit
         # When the key is the latter, it is used for temporary
         # one shot requests that don't have a bucket hash
-        # When this reaches 256 elements, it will try to evict based off of expiry
+        # Inactive rate limits are evicted incrementally, see _evict_inactive_ratelimits
         self._buckets: Dict[str, Ratelimit] = {}
+        # (Time at which the rate limit can be evicted, Key) ordered by time
+        self._bucket_expiry: List[Tuple[float, str]] = []
+        # Keys of the rate limits that have an entry in _bucket_expiry
+        self._bucket_expiry_keys: Set[str] = set()
+        self.evicted_buckets: int = 0
         self._global_over: asyncio.Event = MISSING
+        # Requests waiting for the global rate limit to be over
+        self._global_waiters: _PendingRequests = _PendingRequests()
         self.token: Optional[str] = None
         self.proxy: Optional[str] = proxy
         self.proxy_auth: Optional[aiohttp.BasicAuth] = proxy_auth
         self.http_trace: Optional[aiohttp.TraceConfig] = http_trace
         self.use_clock: bool = not unsync_clock
         self.max_ratelimit_timeout: Optional[float] = max(30.0, max_ratelimit_timeout) if max_ratelimit_timeout else None
+        # Shares the rate limit state with other clients, e.g. in other processes
+        self.ratelimit_backend: Optional[RateLimitBackend] = ratelimit_backend
+        self.ratelimit_observer: Optional[RateLimitObserver] = ratelimit_observer
+        self._json_encode: Callable[[Any], Union[bytes, str]] = utils._to_json_bytes
+        self._json_decode: Callable[[bytes], Any] = utils._from_json
+        if json_codec is not None:
+            if not callable(getattr(json_codec, 'encode', None)) or not callable(getattr(json_codec, 'decode', None)):
+                raise TypeError('json_codec must have encode and decode methods')
+            self._json_encode = json_codec.encode
+            self._json_decode = json_codec.decode
+        # Route key -> Seconds to cache the responses of the route for
+        self.response_cache_ttls: Dict[str, float] = response_cache_ttls or {}
+        # URL + Parameters -> In flight GET request shared by all identical requests
+        self._inflight_requests: Dict[str, _InflightRequest] = {}
+        # URL + Parameters -> (Expiry, Response data, Snowflakes in the URL)
+        self._response_cache: Dict[str, Tuple[float, Any, Tuple[int, ...]]] = {}
+        # Snowflake -> URL + Parameters of the cached responses mentioning it
+        self._response_cache_index: Dict[int, Set[str]] = {}
+        # (Expiry, URL + Parameters) ordered by expiry, an entry is stale if the response
+        # it belongs to is no longer cached with the same expiry
+        self._response_cache_expiry: List[Tuple[float, str]] = []
+        if response_cache_max_size <= 0:
+            raise ValueError('response_cache_max_size must be greater than 0')
+        self.response_cache_max_size: int = response_cache_max_size
 
         user_agent = 'DiscordBot (https://github.com/Rapptz/discord.py {0}) Python/{1[0]}.{1[1]} aiohttp/{2}'
         self.user_agent: str = user_agent.format(__version__, sys.version_info, aiohttp.__version__)
@@ -535,38 +714,259 @@ class HTTPClient:
 
         return await self.__session.ws_connect(url, **kwargs)
 
-    def _try_clear_expired_ratelimits(self) -> None:
-        if len(self._buckets) < 256:
-            return
-
-        keys = [key for key, bucket in self._buckets.items() if bucket.is_inactive()]
-        for key in keys:
-            del self._buckets[key]
+    def _schedule_eviction(self, key: str, ratelimit: Ratelimit) -> None:
+        if key not in self._bucket_expiry_keys:
+            self._bucket_expiry_keys.add(key)
+            heapq.heappush(self._bucket_expiry, (ratelimit._last_request + Ratelimit.INACTIVE_AFTER, key))
+
+    def _set_ratelimit(self, key: str, ratelimit: Ratelimit) -> None:
+        ratelimit.key = key
+        self._buckets[key] = ratelimit
+        self._schedule_eviction(key, ratelimit)
+
+    def _evict_inactive_ratelimits(self, now: float, *, limit: int = 8) -> None:
+        # Every rate limit has a single entry in the heap, keyed by the earliest time it can become
+        # inactive. Entries of rate limits that were used since are pushed back instead of evicted.
+        # Only a few entries are looked at per call to keep the cost of a request bounded.
+        expiry = self._bucket_expiry
+        while expiry and limit > 0 and expiry[0][0] <= now:
+            limit -= 1
+            _, key = heapq.heappop(expiry)
+            self._bucket_expiry_keys.discard(key)
+            ratelimit = self._buckets.get(key)
+            if ratelimit is None:
+                continue
+
+            if ratelimit.is_inactive():
+                del self._buckets[key]
+                self.evicted_buckets += 1
+            else:
+                # Either it was used since it was scheduled or it still has requests going on
+                deadline = ratelimit._last_request + Ratelimit.INACTIVE_AFTER
+                if deadline <= now:
+                    deadline = now + Ratelimit.INACTIVE_AFTER
+                self._bucket_expiry_keys.add(key)
+                heapq.heappush(expiry, (deadline, key))
+
+    def bucket_stats(self) -> BucketStats:
+        """Returns the number of tracked rate limits, known bucket hashes and evicted rate limits."""
+        return BucketStats(
+            buckets=len(self._buckets),
+            bucket_hashes=len(self._bucket_hashes),
+            evicted_buckets=self.evicted_buckets,
+        )
 
     def get_ratelimit(self, key: str) -> Ratelimit:
+        self._evict_inactive_ratelimits(asyncio.get_running_loop().time())
         try:
             value = self._buckets[key]
         except KeyError:
-            self._buckets[key] = value = Ratelimit(self.max_ratelimit_timeout)
-            self._try_clear_expired_ratelimits()
+            value = Ratelimit(self.max_ratelimit_timeout)
+            value._notify = self._notify_observer
+            self._set_ratelimit(key, value)
         return value
 
+    def _notify_observer(self, event: str, /, *args: Any, **kwargs: Any) -> None:
+        observer = self.ratelimit_observer
+        if observer is None:
+            return
+
+        try:
+            getattr(observer, event)(*args, **kwargs)
+        except Exception:
+            _log.exception('Rate limit observer %r raised an exception in %s', observer, event)
+
+    def get_ratelimit_snapshot(self) -> Dict[str, RateLimitSnapshot]:
+        """Returns the current state of every tracked rate limit, keyed by the
+        bucket hash (or route) and major parameters."""
+        now = asyncio.get_running_loop().time()
+        return {
+            key: RateLimitSnapshot(
+                limit=ratelimit.limit,
+                remaining=ratelimit.remaining,
+                outgoing=ratelimit.outgoing,
+                pending=len(ratelimit._pending_requests),
+                reset_after=None if ratelimit.expires is None else max(ratelimit.expires - now, 0.0),
+            )
+            for key, ratelimit in self._buckets.items()
+        }
+
+    def _drop_cached_response(self, key: str) -> None:
+        try:
+            _, _, snowflakes = self._response_cache.pop(key)
+        except KeyError:
+            return
+
+        for snowflake in snowflakes:
+            keys = self._response_cache_index.get(snowflake)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._response_cache_index[snowflake]
+
+    def _pop_cached_response_expiry(self) -> None:
+        # Drops the response that expires first, skipping the stale entries
+        cache = self._response_cache
+        expiry = self._response_cache_expiry
+        while expiry:
+            expires, key = heapq.heappop(expiry)
+            entry = cache.get(key)
+            if entry is not None and entry[0] == expires:
+                self._drop_cached_response(key)
+                return
+
+    def _cache_response(self, route: Route, key: str, ttl: float, data: Any) -> None:
+        now = time.monotonic()
+        cache = self._response_cache
+        expiry = self._response_cache_expiry
+        while expiry and expiry[0][0] <= now:
+            self._pop_cached_response_expiry()
+
+        self._drop_cached_response(key)
+        while len(cache) >= self.response_cache_max_size:
+            self._pop_cached_response_expiry()
+
+        if len(expiry) >= 2 * self.response_cache_max_size:
+            # Too many stale entries from dropped or replaced responses
+            expiry[:] = [(expires, k) for k, (expires, _, _) in cache.items()]
+            heapq.heapify(expiry)
+
+        snowflakes = tuple(int(snowflake) for snowflake in _SNOWFLAKE_REGEX.findall(route.url))
+        cache[key] = (now + ttl, data, snowflakes)
+        heapq.heappush(expiry, (now + ttl, key))
+        for snowflake in snowflakes:
+            self._response_cache_index.setdefault(snowflake, set()).add(key)
+
+    def invalidate_cached_responses(self, snowflakes: Iterable[int]) -> None:
+        """Drops every cached response whose route mentions one of the given IDs."""
+        for snowflake in snowflakes:
+            keys = self._response_cache_index.get(snowflake)
+            if keys:
+                for key in list(keys):
+                    self._drop_cached_response(key)
+
+    async def _fetch(self, route: Route, key: str, ttl: Optional[float], **kwargs: Any) -> Any:
+        data = await self._request(route, **kwargs)
+        if ttl is not None:
+            self._cache_response(route, key, ttl, data)
+        return data
+
     async def request(
         self,
         route: Route,
         *,
         files: Optional[Sequence[File]] = None,
         form: Optional[Iterable[Dict[str, Any]]] = None,
+        priority: Optional[RequestPriority] = None,
         **kwargs: Any,
     ) -> Any:
+        if priority is not None:
+            kwargs['priority'] = priority
+
+        if route.method != 'GET' or files or form or 'json' in kwargs or 'data' in kwargs:
+            if self._response_cache:
+                # Anything that modifies a resource makes the cached responses about it stale
+                self.invalidate_cached_responses(int(s) for s in _SNOWFLAKE_REGEX.findall(route.url))
+            return await self._request(route, files=files, form=form, **kwargs)
+
+        params = kwargs.get('params')
+        key = route.url if not params else f'{route.url}?{params!r}'
+        ttl = self.response_cache_ttls.get(route.key)
+        if ttl is not None:
+            try:
+                expires, data, _ = self._response_cache[key]
+            except KeyError:
+                pass
+            else:
+                if expires > time.monotonic():
+                    return copy.deepcopy(data)
+                self._drop_cached_response(key)
+
+        if any(name not in ('params', 'priority') for name in kwargs):
+            # Anything else, e.g. an audit log reason, is specific to the caller
+            return await self._fetch(route, key, ttl, **kwargs)
+
+        # The shared request is sent at the priority of the caller that started it
+        if priority is None:
+            kwargs['priority'] = priority = _request_priority.get()
+        inflight_key = f'{priority.value}:{key}'
+
+        # Identical GET requests that are issued while one is in flight share its response
+        try:
+            inflight = self._inflight_requests[inflight_key]
+        except KeyError:
+            task = asyncio.create_task(self._fetch(route, key, ttl, **kwargs))
+            inflight = self._inflight_requests[inflight_key] = _InflightRequest(task)
+            task.add_done_callback(lambda _: self._finish_inflight_request(inflight_key, inflight))
+        else:
+            inflight.shared = True
+
+        data = await asyncio.shield(inflight.task)
+        if inflight.shared or ttl is not None:
+            # Every caller gets its own copy as the response data might be mutated
+            return copy.deepcopy(data)
+        return data
+
+    async def _wait_global_ratelimit(self, priority: RequestPriority) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._global_waiters.append(future, priority)
+        try:
+            await future
+        except:
+            if future.done() and not future.cancelled():
+                # This request was released but won't be sent, pass its turn on
+                self._release_next_global_waiter()
+            future.cancel()
+            raise
+
+        # Requests are resumed one after another in weighted priority order,
+        # so higher priorities get to their rate limits first
+        self._release_next_global_waiter()
+
+    def _release_next_global_waiter(self) -> None:
+        if not self._global_over.is_set():
+            # The global rate limit was hit again in the meantime
+            return
+
+        while self._global_waiters:
+            future = self._global_waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+
+    def _finish_inflight_request(self, key: str, inflight: _InflightRequest) -> None:
+        if self._inflight_requests.get(key) is inflight:
+            del self._inflight_requests[key]
+
+        # Every caller might have been cancelled, so retrieve the exception to not log it
+        if not inflight.task.cancelled():
+            inflight.task.exception()
+
+    async def _request(
+        self,
+        route: Route,
+        *,
+        files: Optional[Sequence[File]] = None,
+        form: Optional[Iterable[Dict[str, Any]]] = None,
+        priority: Optional[RequestPriority] = None,
+        **kwargs: Any,
+    ) -> Any:
+        if priority is None:
+            priority = _request_priority.get()
+
         method = route.method
         url = route.url
         route_key = route.key
+        backend = self.ratelimit_backend
 
-        bucket_hash = None
-        try:
-            bucket_hash = self._bucket_hashes[route_key]
-        except KeyError:
+        bucket_hash = self._bucket_hashes.get(route_key)
+        if bucket_hash is None and backend is not None:
+            # Another client might have already discovered the bucket of this route
+            bucket_hash = await backend.get_bucket_hash(route_key)
+            if bucket_hash is not None:
+                self._bucket_hashes[route_key] = bucket_hash
+
+        if bucket_hash is None:
             key = f'{route_key}:{route.major_parameters}'
         else:
             key = f'{bucket_hash}:{route.major_parameters}'
@@ -583,7 +983,7 @@ class HTTPClient:
         # some checking if it's a JSON request
         if 'json' in kwargs:
             headers['Content-Type'] = 'application/json'
-            kwargs['data'] = utils._to_json(kwargs.pop('json'))
+            kwargs['data'] = self._json_encode(kwargs.pop('json'))
 
         try:
             reason = kwargs.pop('reason')
@@ -603,11 +1003,11 @@ class HTTPClient:
 
         if not self._global_over.is_set():
             # wait until the global lock is complete
-            await self._global_over.wait()
+            await self._wait_global_ratelimit(priority)
 
         response: Optional[aiohttp.ClientResponse] = None
         data: Optional[Union[Dict[str, Any], str]] = None
-        async with ratelimit:
+        async with ratelimit.prioritized(priority):
             for tries in range(5):
                 if files:
                     for f in files:
@@ -620,12 +1020,20 @@ class HTTPClient:
                         form_data.add_field(**params)
                     kwargs['data'] = form_data
 
+                if backend is not None:
+                    await backend.acquire(key)
+
+                self._notify_observer('on_request_start', route_key, key)
+                start = time.perf_counter()
+                ended = False
                 try:
                     async with self.__session.request(method, url, **kwargs) as response:
                         _log.debug('%s %s with %s has returned %s', method, url, kwargs.get('data'), response.status)
 
                         # even errors have text involved in them so this is safe to call
-                        data = await json_or_text(response)
+                        data = await json_or_text(response, loads=self._json_decode)
+                        ended = True
+                        self._notify_observer('on_request_end', route_key, key, response.status, time.perf_counter() - start)
 
                         # Update and use rate limit information if the bucket header is present
                         discord_hash = response.headers.get('X-Ratelimit-Bucket')
@@ -651,17 +1059,32 @@ class HTTPClient:
 
                                     self._bucket_hashes[route_key] = discord_hash
                                     recalculated_key = discord_hash + route.major_parameters
-                                    self._buckets[recalculated_key] = ratelimit
+                                    self._set_ratelimit(recalculated_key, ratelimit)
                                     self._buckets.pop(key, None)
+                                    key = recalculated_key
+                                    self._notify_observer('on_bucket_discovered', route_key, discord_hash, bucket_hash)
+                                    if backend is not None:
+                                        await backend.set_bucket_hash(route_key, discord_hash)
                                 elif route_key not in self._bucket_hashes:
                                     fmt = '%s has found its initial rate limit bucket hash (%s).'
                                     _log.debug(fmt, route_key, discord_hash)
                                     self._bucket_hashes[route_key] = discord_hash
-                                    self._buckets[discord_hash + route.major_parameters] = ratelimit
+                                    key = discord_hash + route.major_parameters
+                                    self._set_ratelimit(key, ratelimit)
+                                    self._notify_observer('on_bucket_discovered', route_key, discord_hash, None)
+                                    if backend is not None:
+                                        await backend.set_bucket_hash(route_key, discord_hash)
 
                         if has_ratelimit_headers:
                             if response.status != 429:
                                 ratelimit.update(response, use_clock=self.use_clock)
+                                if backend is not None:
+                                    await backend.update(
+                                        key,
+                                        limit=ratelimit.limit,
+                                        remaining=int(response.headers['X-Ratelimit-Remaining']),
+                                        reset_after=ratelimit.reset_after,
+                                    )
                                 if ratelimit.remaining == 0:
                                     _log.debug(
                                         'A rate limit bucket (%s) has been exhausted. Pre-emptively rate limiting...',
@@ -679,7 +1102,8 @@ class HTTPClient:
                                 # Banned by Cloudflare more than likely.
                                 raise HTTPException(response, data)
 
-                            if ratelimit.remaining > 0:
+                            sub_ratelimit = ratelimit.remaining > 0
+                            if sub_ratelimit:
                                 # According to night
                                 # https://github.com/discord/discord-api-docs/issues/2190#issuecomment-816363129
                                 # Remaining > 0 and 429 means that a sub ratelimit was hit.
@@ -713,23 +1137,42 @@ class HTTPClient:
 
                             # check if it's a global rate limit
                             is_global = data.get('global', False)
+                            self._notify_observer(
+                                'on_rate_limited',
+                                route_key,
+                                key,
+                                retry_after,
+                                is_global=is_global,
+                                sub_ratelimit=sub_ratelimit,
+                                scope=response.headers.get('X-RateLimit-Scope'),
+                            )
                             if is_global:
                                 _log.warning('Global rate limit has been hit. Retrying in %.2f seconds.', retry_after)
                                 self._global_over.clear()
 
-                            await asyncio.sleep(retry_after)
+                            if backend is not None:
+                                if is_global:
+                                    await backend.set_global(retry_after)
+                                else:
+                                    await backend.update(key, limit=ratelimit.limit, remaining=0, reset_after=retry_after)
+
+                            self._notify_observer('on_retry', route_key, key, tries + 1, retry_after, 'rate_limited')
+                            try:
+                                await asyncio.sleep(retry_after)
+                            finally:
+                                # release the global lock now that the global rate limit has
+                                # passed, even if this request was cancelled in the meantime
+                                if is_global:
+                                    self._global_over.set()
+                                    self._release_next_global_waiter()
+                                    _log.debug('Global rate limit is now over.')
                             _log.debug('Done sleeping for the rate limit. Retrying...')
 
-                            # release the global lock now that the
-                            # global rate limit has passed
-                            if is_global:
-                                self._global_over.set()
-                                _log.debug('Global rate limit is now over.')
-
                             continue
 
                         # we've received a 500, 502, 504, or 524, unconditional retry
                         if response.status in {500, 502, 504, 524}:
+                            self._notify_observer('on_retry', route_key, key, tries + 1, 1 + tries * 2, 'server_error')
                             await asyncio.sleep(1 + tries * 2)
                             continue
 
@@ -747,9 +1190,16 @@ class HTTPClient:
                 except OSError as e:
                     # Connection reset by peer
                     if tries < 4 and e.errno in (54, 10054):
+                        self._notify_observer('on_request_end', route_key, key, None, time.perf_counter() - start)
+                        ended = True
+                        self._notify_observer('on_retry', route_key, key, tries + 1, 1 + tries * 2, 'connection_reset')
                         await asyncio.sleep(1 + tries * 2)
                         continue
                     raise
+                finally:
+                    # No response was received, e.g. the request timed out or was cancelled
+                    if not ended:
+                        self._notify_observer('on_request_end', route_key, key, None, time.perf_counter() - start)
 
             if response is not None:
                 # We've run out of retries, raise.
@@ -778,6 +1228,8 @@ class HTTPClient:
     async def close(self) -> None:
         if self.__session:
             await self.__session.close()
+        if self.ratelimit_backend is not None:
+            await self.ratelimit_backend.close()
 
     # login management
 
@@ -1042,6 +1494,21 @@ class HTTPClient:
 
         return self.request(r, params=params, reason=reason)
 
+    def bulk_ban(
+        self,
+        guild_id: Snowflake,
+        user_ids: SnowflakeList,
+        delete_message_seconds: int = 86400,  # one day
+        reason: Optional[str] = None,
+    ) -> Response[guild.BulkBanUserResponse]:
+        r = Route('POST', '/guilds/{guild_id}/bulk-ban', guild_id=guild_id)
+        payload = {
+            'user_ids': user_ids,
+            'delete_message_seconds': delete_message_seconds,
+        }
+
+        return self.request(r, json=payload, reason=reason)
+
     def unban(self, user_id: Snowflake, guild_id: Snowflake, *, reason: Optional[str] = None) -> Response[None]:
         r = Route('DELETE', '/guilds/{guild_id}/bans/{user_id}', guild_id=guild_id, user_id=user_id)
         return self.request(r, reason=reason)
@@ -2390,8 +2857,14 @@ class HTTPClient:
         return value.format(data['url'], encoding, INTERNAL_API_VERSION)
 
     async def get_bot_gateway(self, *, encoding: str = 'json', zlib: bool = True) -> Tuple[int, str]:
+        shards, url, _ = await self.get_bot_gateway_info(encoding=encoding, zlib=zlib)
+        return shards, url
+
+    async def get_bot_gateway_info(
+        self, *, encoding: str = 'json', zlib: bool = True
+    ) -> Tuple[int, str, gateway.SessionStartLimit]:
         try:
-            data = await self.request(Route('GET', '/gateway/bot'))
+            data: gateway.GatewayBot = await self.request(Route('GET', '/gateway/bot'))
         except HTTPException as exc:
             raise GatewayNotFound() from exc
 
@@ -2399,7 +2872,7 @@ class HTTPClient:
             value = '{0}?encoding={1}&v={2}&compress=zlib-stream'
         else:
             value = '{0}?encoding={1}&v={2}'
-        return data['shards'], value.format(data['url'], encoding, INTERNAL_API_VERSION)
+        return data['shards'], value.format(data['url'], encoding, INTERNAL_API_VERSION), data['session_start_limit']
 
     def get_user(self, user_id: Snowflake) -> Response[user.User]:
         return self.request(Route('GET', '/users/{user_id}', user_id=user_id))
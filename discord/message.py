@@ -74,9 +74,11 @@ if TYPE_CHECKING:
         MessageApplication as MessageApplicationPayload,
         MessageActivity as MessageActivityPayload,
         RoleSubscriptionData as RoleSubscriptionDataPayload,
+        Reaction as ReactionPayload,
     )
 
     from .types.interactions import MessageInteraction as MessageInteractionPayload
+    from .types.sticker import StickerItem as StickerItemPayload
 
     from .types.components import Component as ComponentPayload
     from .types.threads import ThreadArchiveDuration
@@ -2335,3 +2337,78 @@ class Message(PartialMessage, Hashable):
             The newly edited message.
         """
         return await self.edit(attachments=[a for a in self.attachments if a not in attachments])
+
+
+class _LazyMessage(Message):
+    # The Message created for received messages when lazy_parsing is enabled. Its embeds,
+    # attachments, stickers, components and reactions keep their raw payload in the slots
+    # of Message until they are first accessed. Keeping this in a subclass leaves the
+    # attributes of a regular Message as plain slots.
+
+    __slots__ = ()
+
+    def __init__(self, *, state: ConnectionState, channel: MessageableChannel, data: MessagePayload) -> None:
+        stripped: Any = {**data, 'reactions': (), 'attachments': (), 'embeds': (), 'sticker_items': ()}
+        super().__init__(state=state, channel=channel, data=stripped)
+        _LazyMessage.reactions.defer(self, data.get('reactions', []))
+        _LazyMessage.attachments.defer(self, data['attachments'])
+        _LazyMessage.embeds.defer(self, data['embeds'])
+        _LazyMessage.stickers.defer(self, data.get('sticker_items', []))
+
+    def __copy__(self) -> Self:
+        # Reactions refer back to their message, so they are built for this message
+        # and the copy shares them, just like a regular Message does. Everything
+        # else is copied as is, still deferred if it hasn't been accessed yet.
+        reactions = self.reactions
+        cls = self.__class__
+        copied = cls.__new__(cls)
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                slot = klass.__dict__[name]
+                try:
+                    slot.__set__(copied, slot.__get__(self, klass))
+                except AttributeError:
+                    pass
+        copied.reactions = reactions
+        return copied
+
+    def _handle_attachments(self, value: List[AttachmentPayload]) -> None:
+        _LazyMessage.attachments.defer(self, value)
+
+    def _handle_embeds(self, value: List[EmbedPayload]) -> None:
+        _LazyMessage.embeds.defer(self, value)
+
+    def _handle_components(self, data: List[ComponentPayload]) -> None:
+        _LazyMessage.components.defer(self, data)
+
+    @utils.deferred_slot_property('reactions')
+    def reactions(self, data: List[ReactionPayload]) -> List[Reaction]:
+        return [Reaction(message=self, data=d) for d in data]
+
+    @utils.deferred_slot_property('attachments')
+    def attachments(self, data: List[AttachmentPayload]) -> List[Attachment]:
+        return [Attachment(data=a, state=self._state) for a in data]
+
+    @utils.deferred_slot_property('embeds')
+    def embeds(self, data: List[EmbedPayload]) -> List[Embed]:
+        return [Embed.from_dict(a) for a in data]
+
+    @utils.deferred_slot_property('stickers')
+    def stickers(self, data: List[StickerItemPayload]) -> List[StickerItem]:
+        return [StickerItem(data=d, state=self._state) for d in data]
+
+    @utils.deferred_slot_property('components')
+    def components(self, data: List[ComponentPayload]) -> List[MessageComponentType]:
+        components = []
+
+        for component_data in data:
+            component = _component_factory(component_data)
+
+            if component is not None:
+                components.append(component)
+
+        return components
+
+
+# Reuse the update handlers of Message with the deferring overrides above
+_LazyMessage._HANDLERS = [(key, getattr(_LazyMessage, f'_handle_{key}')) for key, _ in Message._HANDLERS]
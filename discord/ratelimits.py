@@ -0,0 +1,633 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import heapq
+import logging
+import time
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Tuple
+
+from . import utils
+from .enums import RequestPriority
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+__all__ = (
+    'RateLimitBackend',
+    'UnixSocketRateLimitBackend',
+    'RateLimitCoordinator',
+    'RateLimitObserver',
+    'request_priority',
+)
+
+_log = logging.getLogger(__name__)
+
+_request_priority: ContextVar[RequestPriority] = ContextVar('_request_priority', default=RequestPriority.normal)
+
+
+@contextlib.contextmanager
+def request_priority(priority: RequestPriority) -> Generator[None, None, None]:
+    """A context manager that sets the priority of every HTTP request made within it.
+
+    When requests have to wait on a rate limit, higher priority requests are let
+    through more often than lower priority ones. This allows latency sensitive
+    requests to overtake bulk traffic using the same rate limit.
+
+    .. versionadded:: 2.3
+
+    Example
+    --------
+
+    .. code-block:: python3
+
+        with discord.request_priority(discord.RequestPriority.low):
+            await channel.purge(limit=500)
+
+    Parameters
+    -----------
+    priority: :class:`RequestPriority`
+        The priority of the requests made within the context manager.
+    """
+    if not isinstance(priority, RequestPriority):
+        raise TypeError(f'expected RequestPriority, received {priority.__class__.__name__} instead')
+
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class RateLimitBackend:
+    """The base class for sharing REST rate limit state between several HTTP clients.
+
+    Every HTTP client keeps track of its own rate limits. That works fine for a single
+    process but when multiple processes share a token, e.g. a bot split into several
+    shard clusters, each of them would learn bucket hashes independently and together
+    they could go over the global rate limit. A backend is consulted by the HTTP client
+    in addition to its own rate limit handling so that the processes behave like a
+    single client.
+
+    The default implementation does nothing, which is the same as not having a backend.
+    Backends are passed to :class:`Client` through the ``ratelimit_backend`` parameter.
+
+    .. versionadded:: 2.3
+    """
+
+    async def acquire(self, key: str) -> None:
+        """|coro|
+
+        Waits until a request is allowed to be made for the given rate limit key,
+        taking other clients and the global rate limit into account.
+
+        Parameters
+        -----------
+        key: :class:`str`
+            The rate limit key, made from the bucket hash (or route) and major parameters.
+        """
+        pass
+
+    async def update(self, key: str, *, limit: int, remaining: int, reset_after: float) -> None:
+        """|coro|
+
+        Called with the rate limit information of a response for the given key.
+
+        Parameters
+        -----------
+        key: :class:`str`
+            The rate limit key.
+        limit: :class:`int`
+            The number of requests that can be made in the current window.
+        remaining: :class:`int`
+            The number of requests that remain in the current window.
+        reset_after: :class:`float`
+            The number of seconds until the window resets.
+        """
+        pass
+
+    async def get_bucket_hash(self, route_key: str) -> Optional[str]:
+        """|coro|
+
+        Returns the bucket hash another client has discovered for a route, if any.
+
+        Parameters
+        -----------
+        route_key: :class:`str`
+            The key of the route, made from the method and path.
+
+        Returns
+        --------
+        Optional[:class:`str`]
+            The bucket hash of the route.
+        """
+        return None
+
+    async def set_bucket_hash(self, route_key: str, bucket_hash: str) -> None:
+        """|coro|
+
+        Called when the bucket hash of a route has been discovered or changed.
+
+        Parameters
+        -----------
+        route_key: :class:`str`
+            The key of the route.
+        bucket_hash: :class:`str`
+            The bucket hash Discord responded with.
+        """
+        pass
+
+    async def set_global(self, retry_after: float) -> None:
+        """|coro|
+
+        Called when the global rate limit has been hit. No client should make
+        a request until ``retry_after`` seconds have passed.
+
+        Parameters
+        -----------
+        retry_after: :class:`float`
+            The number of seconds to wait for.
+        """
+        pass
+
+    async def close(self) -> None:
+        """|coro|
+
+        Releases the resources of the backend. Called when the HTTP client is closed.
+        """
+        pass
+
+
+class RateLimitObserver:
+    """The base class for observing how the HTTP client handles rate limits.
+
+    Subclasses override the methods of the events they are interested in, for
+    example to export them to a metrics system. Every method is called synchronously
+    from within the request, so they should return quickly. Exceptions raised by
+    them are logged and otherwise ignored.
+
+    In the methods below, ``route`` is the route of the request without its
+    parameters, e.g. ``'GET /channels/{channel_id}'``, and ``bucket`` is the key of
+    the rate limit handling it, made from the bucket hash (or route) and major parameters.
+
+    Observers are passed to :class:`Client` through the ``ratelimit_observer`` parameter.
+
+    .. versionadded:: 2.3
+    """
+
+    def on_request_start(self, route: str, bucket: str) -> None:
+        """Called right before a request is sent, including retries.
+
+        Parameters
+        -----------
+        route: :class:`str`
+            The route of the request.
+        bucket: :class:`str`
+            The rate limit key of the request.
+        """
+        pass
+
+    def on_request_end(self, route: str, bucket: str, status: Optional[int], duration: float) -> None:
+        """Called when a request has received its response or failed to.
+
+        Parameters
+        -----------
+        route: :class:`str`
+            The route of the request.
+        bucket: :class:`str`
+            The rate limit key of the request.
+        status: Optional[:class:`int`]
+            The status code of the response, or ``None`` if there was no response,
+            e.g. because the request timed out, failed to connect or was cancelled.
+        duration: :class:`float`
+            The number of seconds between sending the request and reading the response.
+        """
+        pass
+
+    def on_bucket_discovered(self, route: str, bucket_hash: str, previous_hash: Optional[str]) -> None:
+        """Called when the bucket hash of a route is found or changes.
+
+        Parameters
+        -----------
+        route: :class:`str`
+            The route the bucket hash belongs to.
+        bucket_hash: :class:`str`
+            The bucket hash Discord responded with.
+        previous_hash: Optional[:class:`str`]
+            The bucket hash that was previously known for the route, if any.
+            A changing hash can be a sign of sub-ratelimits.
+        """
+        pass
+
+    def on_preemptive_sleep(self, bucket: str, delay: float) -> None:
+        """Called when an exhausted rate limit starts waiting for its reset
+        instead of sending more requests.
+
+        Parameters
+        -----------
+        bucket: :class:`str`
+            The rate limit key that is exhausted.
+        delay: :class:`float`
+            The number of seconds until the rate limit resets.
+        """
+        pass
+
+    def on_rate_limited(
+        self,
+        route: str,
+        bucket: str,
+        retry_after: float,
+        *,
+        is_global: bool,
+        sub_ratelimit: bool,
+        scope: Optional[str],
+    ) -> None:
+        """Called when a request has been rate limited with a 429 response.
+
+        Parameters
+        -----------
+        route: :class:`str`
+            The route of the request.
+        bucket: :class:`str`
+            The rate limit key of the request.
+        retry_after: :class:`float`
+            The number of seconds Discord asked to wait for.
+        is_global: :class:`bool`
+            Whether the global rate limit was hit.
+        sub_ratelimit: :class:`bool`
+            Whether the bucket had remaining requests, meaning a sub-ratelimit was hit.
+        scope: Optional[:class:`str`]
+            The value of the ``X-RateLimit-Scope`` header, e.g. ``'user'`` or ``'shared'``.
+        """
+        pass
+
+    def on_retry(self, route: str, bucket: str, attempt: int, delay: float, reason: str) -> None:
+        """Called when a request is going to be retried.
+
+        Parameters
+        -----------
+        route: :class:`str`
+            The route of the request.
+        bucket: :class:`str`
+            The rate limit key of the request.
+        attempt: :class:`int`
+            The number of the attempt that failed, starting at ``1``.
+        delay: :class:`float`
+            The number of seconds waited for before retrying.
+        reason: :class:`str`
+            Why the request is retried. One of ``'rate_limited'``, ``'server_error'``
+            or ``'connection_reset'``.
+        """
+        pass
+
+
+class UnixSocketRateLimitBackend(RateLimitBackend):
+    """A :class:`RateLimitBackend` that shares the rate limit state through a
+    :class:`RateLimitCoordinator` listening on a Unix socket.
+
+    If the coordinator can't be reached then requests are only limited by the
+    client's own rate limit handling until the connection can be established again.
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The path of the Unix socket the coordinator is listening on.
+    """
+
+    RECONNECT_DELAY: float = 5.0
+    # How long a route the coordinator has no bucket hash for is not asked about again
+    UNKNOWN_HASH_TTL: float = 10.0
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._unknown_hashes: Dict[str, float] = {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task[None]] = None
+        self._connecting: Optional[asyncio.Lock] = None
+        self._last_attempt: float = 0.0
+        self._nonce: int = 0
+        self._waiting: Dict[int, asyncio.Future[Dict[str, Any]]] = {}
+
+    async def _connect(self) -> bool:
+        if self._writer is not None:
+            return True
+
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+
+        async with self._connecting:
+            if self._writer is not None:
+                return True
+
+            now = time.monotonic()
+            if now - self._last_attempt < self.RECONNECT_DELAY:
+                return False
+
+            self._last_attempt = now
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            except OSError as exc:
+                _log.warning('Could not connect to the rate limit coordinator at %s: %s', self.path, exc)
+                return False
+
+            self._read_task = asyncio.create_task(self._read_responses())
+            _log.debug('Connected to the rate limit coordinator at %s.', self.path)
+            return True
+
+    async def _read_responses(self) -> None:
+        reader = self._reader
+        assert reader is not None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                data = utils._from_json(line)
+                future = self._waiting.pop(data.get('nonce'), None)
+                if future is not None and not future.done():
+                    future.set_result(data)
+        except (OSError, ValueError) as exc:
+            _log.warning('Lost the connection to the rate limit coordinator: %s', exc)
+        finally:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+        for future in self._waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionResetError('lost the connection to the rate limit coordinator'))
+        self._waiting.clear()
+
+    async def _send(self, payload: Dict[str, Any], *, wait: bool = True) -> Optional[Dict[str, Any]]:
+        if not await self._connect():
+            return None
+
+        writer = self._writer
+        assert writer is not None
+        self._nonce += 1
+        payload['nonce'] = self._nonce
+        future: Optional[asyncio.Future[Dict[str, Any]]] = None
+        if wait:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[self._nonce] = future
+
+        try:
+            writer.write(utils._to_json_bytes(payload) + b'\n')
+            await writer.drain()
+            if future is not None:
+                return await future
+        except OSError as exc:
+            _log.warning('Could not talk to the rate limit coordinator: %s', exc)
+            self._disconnect()
+        finally:
+            if future is not None:
+                self._waiting.pop(payload['nonce'], None)
+        return None
+
+    async def acquire(self, key: str) -> None:
+        while True:
+            response = await self._send({'op': 'acquire', 'key': key})
+            if response is None:
+                return
+
+            delay = response['wait']
+            if delay <= 0:
+                return
+
+            _log.debug('Rate limit coordinator asked to wait %.2f seconds for %s.', delay, key)
+            await asyncio.sleep(delay)
+
+    async def update(self, key: str, *, limit: int, remaining: int, reset_after: float) -> None:
+        payload = {'op': 'update', 'key': key, 'limit': limit, 'remaining': remaining, 'reset_after': reset_after}
+        await self._send(payload, wait=False)
+
+    async def get_bucket_hash(self, route_key: str) -> Optional[str]:
+        now = time.monotonic()
+        unknown_until = self._unknown_hashes.get(route_key)
+        if unknown_until is not None:
+            if now < unknown_until:
+                return None
+            del self._unknown_hashes[route_key]
+
+        response = await self._send({'op': 'get_hash', 'route': route_key})
+        bucket_hash = response and response['hash']
+        if response is not None and bucket_hash is None:
+            self._unknown_hashes[route_key] = now + self.UNKNOWN_HASH_TTL
+        return bucket_hash
+
+    async def set_bucket_hash(self, route_key: str, bucket_hash: str) -> None:
+        self._unknown_hashes.pop(route_key, None)
+        await self._send({'op': 'set_hash', 'route': route_key, 'hash': bucket_hash}, wait=False)
+
+    async def set_global(self, retry_after: float) -> None:
+        await self._send({'op': 'global', 'retry_after': retry_after}, wait=False)
+
+    async def close(self) -> None:
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        self._disconnect()
+
+
+class _SharedBucket:
+    __slots__ = ('limit', 'remaining', 'reset_at')
+
+    def __init__(self, limit: int, remaining: int, reset_at: float) -> None:
+        self.limit: int = limit
+        self.remaining: int = remaining
+        self.reset_at: float = reset_at
+
+
+class RateLimitCoordinator:
+    """A server that keeps the rate limit state shared by several
+    :class:`UnixSocketRateLimitBackend` clients.
+
+    The coordinator keeps track of the bucket hashes, the remaining requests of
+    every bucket and the global rate limit, both when Discord reports it and by
+    spacing out requests so that all clients together stay below ``global_limit``
+    requests per second.
+
+    This can be run in its own process through ``python -m discord ratelimiter``
+    or as part of an existing event loop.
+
+    .. code-block:: python3
+
+        async with discord.RateLimitCoordinator('/tmp/discord-ratelimit.sock') as coordinator:
+            await coordinator.serve_forever()
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The path of the Unix socket to listen on.
+    global_limit: :class:`int`
+        The number of requests per second all clients are allowed to make together.
+        Defaults to 50, Discord's global rate limit.
+    """
+
+    def __init__(self, path: str, *, global_limit: int = 50) -> None:
+        if global_limit <= 0:
+            raise ValueError('global_limit must be greater than 0')
+
+        self.path: str = path
+        self.global_limit: int = global_limit
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._bucket_hashes: Dict[str, str] = {}
+        self._buckets: Dict[str, _SharedBucket] = {}
+        # The reset times of the buckets, an entry is stale if its bucket resets later
+        self._bucket_expiry: List[Tuple[float, str]] = []
+        self._global_until: float = 0.0
+        self._window_start: float = 0.0
+        self._window_count: int = 0
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """|coro|
+
+        Starts listening on the Unix socket.
+        """
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        _log.info('Rate limit coordinator is listening on %s.', self.path)
+
+    async def serve_forever(self) -> None:
+        """|coro|
+
+        Serves clients until the coordinator is closed.
+        """
+        if self._server is None:
+            await self.start()
+
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self) -> None:
+        """|coro|
+
+        Stops listening and disconnects every client.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _acquire(self, key: str, now: float) -> float:
+        # Returns how long the client has to wait before trying again, 0 if the request can go ahead
+        if now < self._global_until:
+            return self._global_until - now
+
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            if now >= bucket.reset_at:
+                del self._buckets[key]
+            elif bucket.remaining <= 0:
+                return bucket.reset_at - now
+
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_count = 0
+
+        if self._window_count >= self.global_limit:
+            return self._window_start + 1.0 - now
+
+        self._window_count += 1
+        if bucket is not None and now < bucket.reset_at:
+            bucket.remaining -= 1
+        return 0.0
+
+    def _update(self, key: str, limit: int, remaining: int, reset_after: float, now: float) -> None:
+        bucket = self._buckets.get(key)
+        reset_at = now + reset_after
+        if bucket is None or now >= bucket.reset_at:
+            self._buckets[key] = _SharedBucket(limit, remaining, reset_at)
+            heapq.heappush(self._bucket_expiry, (reset_at, key))
+        else:
+            # Other clients might have made requests in the meantime that Discord hasn't counted yet
+            bucket.limit = limit
+            bucket.remaining = min(bucket.remaining, remaining)
+            if reset_at > bucket.reset_at:
+                bucket.reset_at = reset_at
+                heapq.heappush(self._bucket_expiry, (reset_at, key))
+
+    def _expire_buckets(self, now: float) -> None:
+        # Buckets of routes that aren't used again would otherwise be kept forever
+        expiry = self._bucket_expiry
+        while expiry and expiry[0][0] <= now:
+            _, key = heapq.heappop(expiry)
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket.reset_at <= now:
+                del self._buckets[key]
+
+    def _handle(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        op = data.get('op')
+        now = time.monotonic()
+        self._expire_buckets(now)
+        if op == 'acquire':
+            return {'nonce': data['nonce'], 'wait': self._acquire(data['key'], now)}
+        elif op == 'update':
+            self._update(data['key'], data['limit'], data['remaining'], data['reset_after'], now)
+        elif op == 'get_hash':
+            return {'nonce': data['nonce'], 'hash': self._bucket_hashes.get(data['route'])}
+        elif op == 'set_hash':
+            self._bucket_hashes[data['route']] = data['hash']
+        elif op == 'global':
+            self._global_until = max(self._global_until, now + data['retry_after'])
+        else:
+            _log.debug('Rate limit coordinator received an unknown op %r.', op)
+        return None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                response = self._handle(utils._from_json(line))
+                if response is not None:
+                    writer.write(utils._to_json_bytes(response) + b'\n')
+                    await writer.drain()
+        except (OSError, ValueError, KeyError) as exc:
+            _log.debug('Dropping rate limit coordinator client: %s', exc)
+        finally:
+            writer.close()
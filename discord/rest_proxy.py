@@ -0,0 +1,244 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import secrets
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from urllib.parse import unquote
+
+import aiohttp
+from aiohttp import web
+
+from . import utils
+from .errors import HTTPException, RateLimited
+from .http import HTTPClient, Route
+
+if TYPE_CHECKING:
+    from .ratelimits import RateLimitBackend
+
+__all__ = ('create_app',)
+
+_log = logging.getLogger(__name__)
+
+_API_PREFIX = re.compile(r'^/api(?:/v[0-9]+)?')
+
+# The parameters Route uses to tell apart rate limits of the same bucket
+_MAJOR_PARAMETERS: Dict[str, str] = {
+    'channels': 'channel_id',
+    'guilds': 'guild_id',
+    'webhooks': 'webhook_id',
+}
+
+# Tokens that follow an ID in the path
+_TOKEN_PARAMETERS: Dict[str, str] = {
+    'webhooks': 'webhook_token',
+    'interactions': 'interaction_token',
+}
+
+# Segments that aren't IDs but are still parameters of the route
+_NAMED_PARAMETERS: Dict[str, str] = {
+    'reactions': 'emoji',
+}
+
+
+def _route_from_path(method: str, path: str) -> Route:
+    # Turns /channels/123/messages/456 into /channels/{channel_id}/messages/{message_id}
+    # so that the route is rate limited the same way the library does it
+    segments = path.strip('/').split('/')
+    template: List[str] = []
+    parameters: Dict[str, Any] = {}
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index > 0 else ''
+        name: Optional[str] = None
+        if segment.isdigit():
+            name = _MAJOR_PARAMETERS.get(previous) or (previous[:-1] if previous.endswith('s') else previous) + '_id'
+        elif index >= 2 and previous.isdigit() and segments[index - 2] in _TOKEN_PARAMETERS:
+            name = _TOKEN_PARAMETERS[segments[index - 2]]
+        elif previous in _NAMED_PARAMETERS:
+            name = _NAMED_PARAMETERS[previous]
+
+        if name is None:
+            # Already URL encoded, only the braces need escaping for str.format
+            template.append(segment.replace('{', '{{').replace('}', '}}'))
+            continue
+
+        if name in parameters:
+            name = f'{name}_{index}'
+
+        template.append('{' + name + '}')
+        # Route quotes string parameters, this keeps the segment as it was sent
+        parameters[name] = int(segment) if segment.isdigit() else unquote(segment)
+
+    return Route(method, '/' + '/'.join(template), **parameters)
+
+
+async def _read_body(request: web.Request) -> Dict[str, Any]:
+    if not request.body_exists:
+        return {}
+
+    if request.content_type == 'multipart/form-data':
+        form: List[Dict[str, Any]] = []
+        reader = await request.multipart()
+        async for part in reader:
+            params = {'name': part.name, 'value': await part.read()}  # type: ignore # nested multipart isn't used by Discord
+            if part.filename:
+                params['filename'] = part.filename
+            content_type = part.headers.get(aiohttp.hdrs.CONTENT_TYPE)
+            if content_type:
+                params['content_type'] = content_type
+            form.append(params)
+        return {'form': form}
+
+    body = await request.read()
+    if request.content_type == 'application/json':
+        return {'json': utils._from_json(body)}
+    return {'data': body}
+
+
+def _json_response(data: Any, *, status: int = 200) -> web.Response:
+    # Discord doesn't send a charset and json_or_text relies on that
+    body = utils._to_json_bytes(data)
+    return web.Response(body=body, status=status, headers={aiohttp.hdrs.CONTENT_TYPE: 'application/json'})
+
+
+def _error_response(exc: HTTPException) -> web.Response:
+    payload: Dict[str, Any] = {'message': exc.text, 'code': exc.code}
+    errors = getattr(exc, '_errors', None)
+    if errors:
+        payload['errors'] = errors
+    return _json_response(payload, status=exc.status)
+
+
+class _RESTProxy:
+    def __init__(self, token: str, authorization: Optional[str], **options: Any) -> None:
+        self.token: str = token
+        self.authorization: Optional[str] = authorization
+        self.options: Dict[str, Any] = options
+        self.http: HTTPClient = utils.MISSING
+
+    async def login(self, app: web.Application) -> None:
+        self.http = HTTPClient(asyncio.get_running_loop(), **self.options)
+        await self.http.static_login(self.token)
+        _log.info('REST proxy has logged in and is forwarding requests.')
+
+    async def close(self, app: web.Application) -> None:
+        if self.http is not utils.MISSING:
+            await self.http.close()
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        if self.authorization is not None:
+            given = request.headers.get(aiohttp.hdrs.AUTHORIZATION, '')
+            if not secrets.compare_digest(given.encode(), self.authorization.encode()):
+                return _json_response({'message': '401: Unauthorized', 'code': 0}, status=401)
+
+        path = _API_PREFIX.sub('', request.raw_path.split('?', 1)[0])
+        route = _route_from_path(request.method, path)
+
+        kwargs = await _read_body(request)
+        if request.query:
+            kwargs['params'] = list(request.query.items())
+
+        reason = request.headers.get('X-Audit-Log-Reason')
+        if reason:
+            kwargs['reason'] = unquote(reason)
+
+        try:
+            data = await self.http.request(route, **kwargs)
+        except RateLimited as exc:
+            payload = {'message': 'You are being rate limited.', 'retry_after': exc.retry_after, 'global': False}
+            return _json_response(payload, status=429)
+        except HTTPException as exc:
+            return _error_response(exc)
+
+        if isinstance(data, str):
+            if not data:
+                return web.Response(status=204)
+            return web.Response(text=data)
+
+        return _json_response(data)
+
+
+def create_app(
+    token: str,
+    *,
+    authorization: Optional[str] = None,
+    ratelimit_backend: Optional[RateLimitBackend] = None,
+    max_ratelimit_timeout: Optional[float] = None,
+) -> web.Application:
+    """Creates an :class:`aiohttp.web.Application` that forwards Discord REST requests.
+
+    Requests to the application are shaped like requests to the Discord API, e.g.
+    ``POST /api/v10/channels/123/messages``. They are forwarded through a single
+    long lived HTTP client, which keeps the connections to Discord open and handles
+    the rate limits for every worker using the application. Every request is sent
+    with the application's ``token`` and API version, whatever the worker sends.
+
+    This can be run on its own through ``python -m discord proxy`` or added to an
+    existing application as a sub application.
+
+    .. code-block:: python3
+
+        from aiohttp import web
+        from discord import rest_proxy
+
+        app = rest_proxy.create_app(token, authorization='a shared secret')
+        web.run_app(app, host='127.0.0.1', port=8080)
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    token: :class:`str`
+        The bot token to make the requests with.
+    authorization: Optional[:class:`str`]
+        The value the ``Authorization`` header of a request must have for it to be forwarded.
+        If not given then every request is forwarded, so the application should only be
+        reachable by trusted workers.
+    ratelimit_backend: Optional[:class:`~discord.RateLimitBackend`]
+        The backend to share the rate limit state with, if there are several proxies.
+    max_ratelimit_timeout: Optional[:class:`float`]
+        The maximum number of seconds to wait for a rate limit before responding
+        with a 429 instead. The same as the parameter of :class:`~discord.Client`.
+
+    Returns
+    --------
+    :class:`aiohttp.web.Application`
+        The application.
+    """
+
+    proxy = _RESTProxy(
+        token,
+        authorization,
+        ratelimit_backend=ratelimit_backend,
+        max_ratelimit_timeout=max_ratelimit_timeout,
+    )
+    app = web.Application()
+    app.on_startup.append(proxy.login)
+    app.on_cleanup.append(proxy.close)
+    app.router.add_route('*', '/{path:.*}', proxy.handle)
+    return app
@@ -0,0 +1,227 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Generator, NamedTuple, Optional
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    HAS_FCNTL = False
+else:
+    HAS_FCNTL = True
+
+from . import utils
+
+__all__ = (
+    'GatewaySession',
+    'SessionStore',
+    'FileSessionStore',
+)
+
+_log = logging.getLogger(__name__)
+
+
+class GatewaySession(NamedTuple):
+    """The state needed to RESUME a gateway session.
+
+    .. versionadded:: 2.3
+
+    Attributes
+    -----------
+    session_id: :class:`str`
+        The ID of the session.
+    sequence: Optional[:class:`int`]
+        The sequence number of the last event received.
+    resume_gateway_url: :class:`str`
+        The gateway URL to RESUME the session on.
+    """
+
+    session_id: str
+    sequence: Optional[int]
+    resume_gateway_url: str
+
+
+class SessionStore:
+    """The base class for persisting gateway sessions across restarts of the process.
+
+    When a store is passed to :class:`Client` through the ``session_store``
+    parameter, the session of every shard is saved when the client is closed,
+    and the next time the client starts it tries to RESUME the saved sessions
+    instead of IDENTIFYing. A RESUME doesn't use up a session start and doesn't
+    resend the guilds, only the events that were missed in the meantime.
+
+    If a saved session can't be resumed anymore then the shard IDENTIFYs as usual.
+
+    The default implementation does not store anything.
+
+    .. versionadded:: 2.3
+
+    .. warning::
+
+        A session must only be resumed by one client at a time.
+    """
+
+    async def load(self, shard_id: Optional[int]) -> Optional[GatewaySession]:
+        """|coro|
+
+        Returns the saved session of a shard.
+
+        Parameters
+        -----------
+        shard_id: Optional[:class:`int`]
+            The ID of the shard, ``None`` if the client isn't sharded.
+
+        Returns
+        --------
+        Optional[:class:`GatewaySession`]
+            The saved session or ``None`` if there is none.
+        """
+        return None
+
+    async def save(self, shard_id: Optional[int], session: GatewaySession) -> None:
+        """|coro|
+
+        Saves the session of a shard, replacing any previous one.
+
+        Parameters
+        -----------
+        shard_id: Optional[:class:`int`]
+            The ID of the shard, ``None`` if the client isn't sharded.
+        session: :class:`GatewaySession`
+            The session to save.
+        """
+        pass
+
+    async def delete(self, shard_id: Optional[int]) -> None:
+        """|coro|
+
+        Deletes the saved session of a shard, if any.
+
+        This is called once a saved session is loaded, since a session can only be
+        resumed from the point it was saved at once.
+
+        Parameters
+        -----------
+        shard_id: Optional[:class:`int`]
+            The ID of the shard, ``None`` if the client isn't sharded.
+        """
+        pass
+
+
+class FileSessionStore(SessionStore):
+    """A :class:`SessionStore` keeping the sessions of every shard in a JSON file.
+
+    The file can be shared by several processes, e.g. the workers of a
+    :class:`ShardCluster`. Updates to it are serialised through a lock on
+    a ``.lock`` file next to it, on platforms that support :func:`fcntl.flock`.
+
+    .. versionadded:: 2.3
+
+    Parameters
+    -----------
+    path: :class:`str`
+        The path of the file. It is created when the first session is saved.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._sessions: Optional[Dict[str, Any]] = None
+        # Updates run in executor threads, which the file lock alone doesn't cover on every platform
+        self._lock: threading.Lock = threading.Lock()
+
+    def _read(self, *, reload: bool = False) -> Dict[str, Any]:
+        if self._sessions is None or reload:
+            try:
+                with open(self.path, 'rb') as fp:
+                    self._sessions = utils._from_json(fp.read())
+            except FileNotFoundError:
+                self._sessions = {}
+            except (OSError, ValueError) as exc:
+                _log.warning('Ignoring unreadable session file %s: %s', self.path, exc)
+                self._sessions = {}
+        return self._sessions  # type: ignore # set above
+
+    @staticmethod
+    def _key(shard_id: Optional[int]) -> str:
+        return 'default' if shard_id is None else str(shard_id)
+
+    async def load(self, shard_id: Optional[int]) -> Optional[GatewaySession]:
+        sessions = self._sessions
+        if sessions is None:
+            sessions = await asyncio.get_running_loop().run_in_executor(None, self._read)
+
+        data = sessions.get(self._key(shard_id))
+        if data is None:
+            return None
+        return GatewaySession(data['session_id'], data['sequence'], data['resume_gateway_url'])
+
+    @contextlib.contextmanager
+    def _locked(self) -> Generator[None, None, None]:
+        with self._lock:
+            if not HAS_FCNTL:
+                yield
+                return
+
+            with open(f'{self.path}.lock', 'ab') as fp:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+    def _write(self, sessions: Dict[str, Any]) -> None:
+        # Write to a temporary file of its own first so a crash can't leave a truncated file behind
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', prefix=f'{os.path.basename(self.path)}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(utils._to_json_bytes(sessions))
+            os.replace(tmp, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+            raise
+
+    def _update(self, key: str, data: Optional[Dict[str, Any]]) -> None:
+        with self._locked():
+            # Other processes, e.g. the workers of a ShardCluster, may have written to the file since
+            sessions = self._read(reload=True)
+            if data is not None:
+                sessions[key] = data
+            elif sessions.pop(key, None) is None:
+                return
+            self._write(sessions)
+
+    async def save(self, shard_id: Optional[int], session: GatewaySession) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._update, self._key(shard_id), session._asdict())
+
+    async def delete(self, shard_id: Optional[int]) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._update, self._key(shard_id), None)
@@ -40,6 +40,7 @@ from .errors import (
     GatewayNotFound,
     ConnectionClosed,
     PrivilegedIntentsRequired,
+    SessionStartLimitReached,
 )
 
 from .enums import Status
@@ -49,6 +50,8 @@ from typing import TYPE_CHECKING, Any, Callable, Tuple, Type, Optional, List, Di
 if TYPE_CHECKING:
     from .gateway import DiscordWebSocket
     from .activity import BaseActivity
+    from .cluster import ClusterConnection
+    from .sessions import GatewaySession
     from .flags import Intents
 
 __all__ = (
@@ -121,9 +124,9 @@ class Shard:
         if self._task is not None and not self._task.done():
             self._task.cancel()
 
-    async def close(self) -> None:
+    async def close(self, code: int = 1000) -> None:
         self._cancel_task()
-        await self.ws.close(code=1000)
+        await self.ws.close(code=code)
 
     async def disconnect(self) -> None:
         await self.close()
@@ -310,6 +313,14 @@ class AutoShardedClient(Client):
     if this is used. By default, when omitted, the client will launch shards from
     0 to ``shard_count - 1``.
 
+    Shards are launched concurrently as far as the ``max_concurrency`` of the
+    bot's session start limit allows. If fewer session starts are left for the
+    day than there are shards to launch, :exc:`SessionStartLimitReached` is
+    raised instead of connecting.
+
+    .. versionchanged:: 2.3
+        Shards are launched concurrently and the session start limit is checked.
+
     .. container:: operations
 
         .. describe:: async with x
@@ -322,6 +333,11 @@ class AutoShardedClient(Client):
     ------------
     shard_ids: Optional[List[:class:`int`]]
         An optional list of shard_ids to launch the shards with.
+    cluster: Optional[:class:`ClusterConnection`]
+        The connection to the other clusters when the client is run by a
+        :class:`ShardCluster`, ``None`` otherwise.
+
+        .. versionadded:: 2.3
     """
 
     if TYPE_CHECKING:
@@ -330,6 +346,7 @@ class AutoShardedClient(Client):
     def __init__(self, *args: Any, intents: Intents, **kwargs: Any) -> None:
         kwargs.pop('shard_id', None)
         self.shard_ids: Optional[List[int]] = kwargs.pop('shard_ids', None)
+        self.cluster: Optional[ClusterConnection] = None
         super().__init__(*args, intents=intents, **kwargs)
 
         if self.shard_ids is not None:
@@ -404,14 +421,27 @@ class AutoShardedClient(Client):
         """Mapping[int, :class:`ShardInfo`]: Returns a mapping of shard IDs to their respective info object."""
         return {shard_id: ShardInfo(parent, self.shard_count) for shard_id, parent in self.__shards.items()}
 
-    async def launch_shard(self, gateway: yarl.URL, shard_id: int, *, initial: bool = False) -> None:
+    async def launch_shard(
+        self, gateway: yarl.URL, shard_id: int, *, initial: bool = False, session: Optional[GatewaySession] = None
+    ) -> None:
         try:
-            coro = DiscordWebSocket.from_client(self, initial=initial, gateway=gateway, shard_id=shard_id)
+            if session is not None:
+                coro = DiscordWebSocket.from_client(
+                    self,
+                    initial=initial,
+                    gateway=yarl.URL(session.resume_gateway_url),
+                    shard_id=shard_id,
+                    session=session.session_id,
+                    sequence=session.sequence,
+                    resume=True,
+                )
+            else:
+                coro = DiscordWebSocket.from_client(self, initial=initial, gateway=gateway, shard_id=shard_id)
             ws = await asyncio.wait_for(coro, timeout=180.0)
         except Exception:
             _log.exception('Failed to connect for shard_id: %s. Retrying...', shard_id)
             await asyncio.sleep(5.0)
-            return await self.launch_shard(gateway, shard_id)
+            return await self.launch_shard(gateway, shard_id, session=session)
 
         # keep reading the shard while others connect
         self.__shards[shard_id] = ret = Shard(ws, self, self.__queue.put_nowait)
@@ -421,21 +451,62 @@ class AutoShardedClient(Client):
         if self.is_closed():
             return
 
+        # The session start limit is needed even when the shard count is known
+        shard_count, gateway_url, session_start_limit = await self.http.get_bot_gateway_info()
         if self.shard_count is None:
-            self.shard_count: int
-            self.shard_count, gateway_url = await self.http.get_bot_gateway()
+            self.shard_count: int = shard_count
             gateway = yarl.URL(gateway_url)
         else:
             gateway = DiscordWebSocket.DEFAULT_GATEWAY
 
         self._connection.shard_count = self.shard_count
 
+        if self.cluster is not None:
+            await self.cluster.connect()
+
         shard_ids = self.shard_ids or range(self.shard_count)
         self._connection.shard_ids = shard_ids
 
+        # Resuming a saved session doesn't count towards the session start limit
+        sessions: Dict[int, GatewaySession] = {}
+        for shard_id in shard_ids:
+            session = await self._load_session(shard_id)
+            if session is not None:
+                sessions[shard_id] = session
+
+        required = len(shard_ids) - len(sessions)
+        remaining = session_start_limit['remaining']
+        if remaining < required:
+            # Don't use up the rest of the limit on shards that can't all connect anyway
+            raise SessionStartLimitReached(remaining, required, session_start_limit['reset_after'] / 1000)
+
+        # Shards are allowed to IDENTIFY concurrently as long as they are in different
+        # buckets, determined by shard_id % max_concurrency. The shards of a bucket
+        # IDENTIFY one after another, spaced out by the before_identify_hook.
+        max_concurrency = session_start_limit.get('max_concurrency') or 1
+        buckets: Dict[int, List[int]] = {}
         for shard_id in shard_ids:
-            initial = shard_id == shard_ids[0]
-            await self.launch_shard(gateway, shard_id, initial=initial)
+            buckets.setdefault(shard_id % max_concurrency, []).append(shard_id)
+
+        async def launch_bucket(bucket: List[int]) -> None:
+            initial = True
+            for shard_id in bucket:
+                session = sessions.get(shard_id)
+                await self.launch_shard(gateway, shard_id, initial=initial, session=session)
+                # A RESUME doesn't IDENTIFY, so the next shard can go without waiting
+                initial = initial and session is not None
+
+        await asyncio.gather(*(launch_bucket(bucket) for bucket in buckets.values()))
+
+    async def _call_before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False) -> None:
+        if self.cluster is None or shard_id is None:
+            return await super()._call_before_identify_hook(shard_id, initial=initial)
+
+        # The launcher spaces out IDENTIFYs across every cluster, so the default
+        # hook, which only sleeps, is skipped instead of waiting on top of that.
+        await self.cluster.acquire_identify(shard_id)
+        if getattr(self.before_identify_hook, '__func__', None) is not Client.before_identify_hook:
+            await self.before_identify_hook(shard_id, initial=initial)
 
     async def _async_setup_hook(self) -> None:
         await super()._async_setup_hook()
@@ -476,10 +547,20 @@ class AutoShardedClient(Client):
         self._closed = True
         await self._connection.close()
 
-        to_close = [asyncio.ensure_future(shard.close(), loop=self.loop) for shard in self.__shards.values()]
+        async def close_shard(shard: Shard) -> None:
+            # Closing with 1000 would end the session, which is kept when it can be resumed later
+            code = 4000 if await self._save_session(shard.ws) else 1000
+            await shard.close(code=code)
+
+        to_close = [asyncio.ensure_future(close_shard(shard), loop=self.loop) for shard in self.__shards.values()]
         if to_close:
             await asyncio.wait(to_close)
 
+        await self._save_cache_snapshot()
+
+        if self.cluster is not None:
+            await self.cluster.close()
+
         await self.http.close()
         self.__queue.put_nowait(EventItem(EventType.clean_close, None, None))
 
@@ -0,0 +1,329 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import os
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from . import utils
+from .channel import CategoryChannel, ForumChannel, StageChannel, TextChannel, VoiceChannel
+from .guild import Guild
+
+if TYPE_CHECKING:
+    from .abc import GuildChannel
+    from .emoji import Emoji
+    from .member import Member
+    from .role import Role
+    from .state import ConnectionState
+    from .sticker import GuildSticker
+    from .threads import Thread
+    from .user import BaseUser
+
+# This module is private, the snapshots are used through the cache_snapshot option of Client
+__all__ = ()
+
+_log = logging.getLogger(__name__)
+
+MAGIC = 'discord.py cache snapshot'
+#: Bumped whenever the layout of the payloads in the snapshot changes
+FORMAT_VERSION = 1
+
+# The snapshot only holds the payloads Discord sends for the cached objects, which are
+# turned back into objects the same way as when they are received from the gateway.
+# Unlike pickling the objects themselves, reading a snapshot can't run any code and
+# isn't tied to how the objects of a given library version look in memory.
+
+
+def _time(value: Optional[datetime.datetime]) -> Optional[str]:
+    return None if value is None else value.isoformat()
+
+
+def _user_payload(user: BaseUser) -> Dict[str, Any]:
+    payload = user._to_minimal_user_json()
+    payload['public_flags'] = user._public_flags
+    payload['banner'] = user._banner
+    payload['accent_color'] = user._accent_colour
+    payload['system'] = user.system
+    return payload
+
+
+def _role_payload(role: Role) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        'id': role.id,
+        'name': role.name,
+        'permissions': str(role._permissions),
+        'position': role.position,
+        'color': role._colour,
+        'hoist': role.hoist,
+        'icon': role._icon,
+        'unicode_emoji': role.unicode_emoji,
+        'managed': role.managed,
+        'mentionable': role.mentionable,
+    }
+    tags = role.tags
+    if tags is not None:
+        payload['tags'] = tags = {
+            'bot_id': tags.bot_id,
+            'integration_id': tags.integration_id,
+            'subscription_listing_id': tags.subscription_listing_id,
+        }
+        # These are null when set and missing otherwise
+        for name in ('premium_subscriber', 'available_for_purchase', 'guild_connections'):
+            if getattr(role.tags, f'_{name}'):
+                tags[name] = None
+    return payload
+
+
+def _emoji_payload(emoji: Emoji) -> Dict[str, Any]:
+    return {
+        'id': emoji.id,
+        'name': emoji.name,
+        'require_colons': emoji.require_colons,
+        'managed': emoji.managed,
+        'animated': emoji.animated,
+        'available': emoji.available,
+        'roles': list(emoji._roles),
+        'user': None if emoji.user is None else _user_payload(emoji.user),
+    }
+
+
+def _sticker_payload(sticker: GuildSticker) -> Dict[str, Any]:
+    return {
+        'id': sticker.id,
+        'name': sticker.name,
+        'description': sticker.description,
+        'format_type': sticker.format.value,
+        'available': sticker.available,
+        'guild_id': sticker.guild_id,
+        'user': None if sticker.user is None else _user_payload(sticker.user),
+        'tags': sticker.emoji,
+    }
+
+
+def _channel_payload(channel: GuildChannel) -> Optional[Dict[str, Any]]:
+    payload: Dict[str, Any] = {
+        'id': channel.id,
+        'type': channel.type.value,
+        'name': channel.name,
+        'position': channel.position,
+        'parent_id': channel.category_id,
+        'nsfw': getattr(channel, 'nsfw', False),
+        'permission_overwrites': [overwrite._asdict() for overwrite in channel._overwrites],
+    }
+
+    if isinstance(channel, TextChannel):
+        payload.update(
+            topic=channel.topic,
+            rate_limit_per_user=channel.slowmode_delay,
+            default_auto_archive_duration=channel.default_auto_archive_duration,
+            default_thread_rate_limit_per_user=channel.default_thread_slowmode_delay,
+            last_message_id=channel.last_message_id,
+        )
+    elif isinstance(channel, (VoiceChannel, StageChannel)):
+        payload.update(
+            rtc_region=channel.rtc_region,
+            video_quality_mode=channel.video_quality_mode.value,
+            last_message_id=channel.last_message_id,
+            rate_limit_per_user=channel.slowmode_delay,
+            bitrate=channel.bitrate,
+            user_limit=channel.user_limit,
+        )
+        if isinstance(channel, StageChannel):
+            payload['topic'] = channel.topic
+    elif isinstance(channel, ForumChannel):
+        emoji = channel.default_reaction_emoji
+        payload.update(
+            topic=channel.topic,
+            rate_limit_per_user=channel.slowmode_delay,
+            default_auto_archive_duration=channel.default_auto_archive_duration,
+            last_message_id=channel.last_message_id,
+            available_tags=[tag.to_dict() for tag in channel._available_tags.values()],
+            default_thread_rate_limit_per_user=channel.default_thread_slowmode_delay,
+            default_forum_layout=channel.default_layout.value,
+            default_reaction_emoji=None if emoji is None else emoji._to_forum_tag_payload(),
+            default_sort_order=None if channel.default_sort_order is None else channel.default_sort_order.value,
+            flags=channel._flags,
+        )
+    elif not isinstance(channel, CategoryChannel):
+        return None
+    return payload
+
+
+def _thread_payload(thread: Thread) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        'id': thread.id,
+        'guild_id': thread.guild.id,
+        'parent_id': thread.parent_id,
+        'owner_id': thread.owner_id,
+        'name': thread.name,
+        'type': thread._type.value,
+        'last_message_id': thread.last_message_id,
+        'rate_limit_per_user': thread.slowmode_delay,
+        'message_count': thread.message_count,
+        'member_count': thread.member_count,
+        'flags': thread._flags,
+        'applied_tags': list(thread._applied_tags),
+        'thread_metadata': {
+            'archived': thread.archived,
+            'archiver_id': thread.archiver_id,
+            'auto_archive_duration': thread.auto_archive_duration,
+            'archive_timestamp': _time(thread.archive_timestamp),
+            'locked': thread.locked,
+            'invitable': thread.invitable,
+            'create_timestamp': _time(thread._created_at),
+        },
+    }
+    me = thread.me
+    if me is not None:
+        payload['member'] = {'user_id': me.id, 'id': me.thread_id, 'join_timestamp': _time(me.joined_at), 'flags': me.flags}
+    return payload
+
+
+def _member_payload(member: Member) -> Dict[str, Any]:
+    return {
+        'user': _user_payload(member._user),
+        'roles': list(member._roles),
+        'joined_at': _time(member.joined_at),
+        'premium_since': _time(member.premium_since),
+        'nick': member.nick,
+        'pending': member.pending,
+        'avatar': member._avatar,
+        'flags': member._flags,
+        'communication_disabled_until': _time(member.timed_out_until),
+    }
+
+
+def _guild_payload(guild: Guild) -> Dict[str, Any]:
+    channels = (_channel_payload(channel) for channel in guild._channels.values())
+    return {
+        'id': guild.id,
+        'name': guild.name,
+        'member_count': guild._member_count,
+        'owner_id': guild.owner_id,
+        'verification_level': guild.verification_level.value,
+        'default_message_notifications': guild.default_notifications.value,
+        'explicit_content_filter': guild.explicit_content_filter.value,
+        'afk_timeout': guild.afk_timeout,
+        'afk_channel_id': None if guild.afk_channel is None else guild.afk_channel.id,
+        'icon': guild._icon,
+        'banner': guild._banner,
+        'splash': guild._splash,
+        'discovery_splash': guild._discovery_splash,
+        'features': list(guild.features),
+        'description': guild.description,
+        'max_presences': guild.max_presences,
+        'max_members': guild.max_members,
+        'max_video_channel_users': guild.max_video_channel_users,
+        'max_stage_video_channel_users': guild.max_stage_video_users,
+        'premium_tier': guild.premium_tier,
+        'premium_subscription_count': guild.premium_subscription_count,
+        'premium_progress_bar_enabled': guild.premium_progress_bar_enabled,
+        'vanity_url_code': guild.vanity_url_code,
+        'widget_enabled': guild.widget_enabled,
+        'widget_channel_id': guild._widget_channel_id,
+        'system_channel_id': guild._system_channel_id,
+        'system_channel_flags': guild._system_channel_flags,
+        'rules_channel_id': guild._rules_channel_id,
+        'public_updates_channel_id': guild._public_updates_channel_id,
+        'safety_alerts_channel_id': guild._safety_alerts_channel_id,
+        'preferred_locale': guild.preferred_locale.value,
+        'nsfw_level': guild.nsfw_level.value,
+        'mfa_level': guild.mfa_level.value,
+        'roles': [_role_payload(role) for role in guild._roles.values()],
+        'emojis': [_emoji_payload(emoji) for emoji in guild.emojis],
+        'stickers': [_sticker_payload(sticker) for sticker in guild.stickers],
+        'channels': [payload for payload in channels if payload is not None],
+        'threads': [_thread_payload(thread) for thread in guild._threads.values()],
+        'members': [_member_payload(member) for member in guild._members.values()],
+    }
+
+
+def _write(path: str, data: Dict[str, Any]) -> None:
+    # Only replace the previous snapshot once the new one is complete
+    directory, name = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(dir=directory or '.', prefix=f'{name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            fp.write(utils._to_json_bytes(data))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+async def dump(state: ConnectionState, path: str) -> int:
+    """Writes the guilds cached by ``state`` to ``path`` and returns how many were written."""
+    guilds = [_guild_payload(guild) for guild in state._guilds.values() if not guild.unavailable]
+    data = {'magic': MAGIC, 'format': FORMAT_VERSION, 'guilds': guilds}
+    await asyncio.get_running_loop().run_in_executor(None, _write, path, data)
+    return len(guilds)
+
+
+def _read(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, 'rb') as fp:
+            data = utils._from_json(fp.read())
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as exc:
+        _log.warning('Ignoring unreadable cache snapshot %s: %s', path, exc)
+        return []
+
+    if not isinstance(data, dict) or data.get('magic') != MAGIC:
+        _log.warning('Ignoring cache snapshot %s, it is not a cache snapshot.', path)
+        return []
+
+    if data.get('format') != FORMAT_VERSION:
+        _log.info('Ignoring cache snapshot %s, it uses format %s instead of %s.', path, data.get('format'), FORMAT_VERSION)
+        return []
+
+    return data['guilds']
+
+
+async def load(state: ConnectionState, path: str) -> List[Guild]:
+    """Loads the guilds of a snapshot written by :func:`dump` into ``state``.
+
+    Returns the loaded guilds, none if the snapshot is missing or can't be used.
+    """
+    payloads = await asyncio.get_running_loop().run_in_executor(None, _read, path)
+    guilds = []
+    for payload in payloads:
+        try:
+            guild = Guild(data=payload, state=state)
+        except (KeyError, TypeError, ValueError) as exc:
+            _log.warning('Ignoring a malformed guild in the cache snapshot %s: %s', path, exc)
+            continue
+
+        state._add_guild(guild)
+        guilds.append(guild)
+    return guilds
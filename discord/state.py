@@ -25,10 +25,14 @@ DEALINGS IN THE SOFTWARE.
 from __future__ import annotations
 
 import asyncio
-from collections import deque, OrderedDict
+from collections import OrderedDict
 import copy
+import functools
+import heapq
+import itertools
 import logging
 from typing import (
+    ClassVar,
     Dict,
     Optional,
     TYPE_CHECKING,
@@ -41,8 +45,12 @@ from typing import (
     Sequence,
     Generic,
     Tuple,
-    Deque,
+    Iterable,
+    Iterator,
     Literal,
+    MutableMapping,
+    Set,
+    Type,
     overload,
 )
 import weakref
@@ -56,7 +64,7 @@ from .user import User, ClientUser
 from .emoji import Emoji
 from .mentions import AllowedMentions
 from .partial_emoji import PartialEmoji
-from .message import Message
+from .message import Message, _LazyMessage
 from .channel import *
 from .channel import _channel_factory
 from .raw_models import *
@@ -66,6 +74,7 @@ from .enums import ChannelType, try_enum, Status
 from . import utils
 from .flags import ApplicationFlags, Intents, MemberCacheFlags
 from .invite import Invite
+from .object import Object
 from .integrations import _integration_factory
 from .interactions import Interaction
 from .ui.view import ViewStore, View
@@ -75,6 +84,8 @@ from .threads import Thread, ThreadMember
 from .sticker import GuildSticker
 from .automod import AutoModRule, AutoModAction
 from .audit_logs import AuditLogEntry
+from .cache import STORE_NAMES, LRUCacheStore
+from . import snapshot
 from ._types import ClientT
 
 if TYPE_CHECKING:
@@ -85,6 +96,7 @@ if TYPE_CHECKING:
     from .voice_client import VoiceProtocol
     from .gateway import DiscordWebSocket
     from .app_commands import CommandTree, Translator
+    from .cache import CacheStoreFactory
 
     from .types.automod import AutoModerationRule, AutoModerationActionExecution
     from .types.snowflake import Snowflake
@@ -118,6 +130,7 @@ class ChunkRequest:
         self.nonce: str = os.urandom(16).hex()
         self.buffer: List[Member] = []
         self.waiters: List[asyncio.Future[List[Member]]] = []
+        self.sent: asyncio.Event = asyncio.Event()
 
     def add_members(self, members: List[Member]) -> None:
         self.buffer.extend(members)
@@ -150,8 +163,380 @@ class ChunkRequest:
                 future.set_result(self.buffer)
 
 
+def _chunk_priority_key(policy: Union[str, Callable[[Guild], Any]]) -> Callable[[Guild], Any]:
+    if callable(policy):
+        return policy
+    if policy == 'smallest':
+        return lambda guild: guild._member_count or 0
+    if policy == 'largest':
+        return lambda guild: -(guild._member_count or 0)
+    if policy == 'active':
+        # The most recent message ID of a guild is known without any extra request
+        return lambda guild: -max((getattr(channel, 'last_message_id', None) or 0 for channel in guild._channels.values()), default=0)
+    raise ValueError(f'chunk_priority must be one of smallest, largest, active or a callable not {policy!r}')
+
+
+class ChunkScheduler:
+    """Sends the chunk requests of guilds received at start-up.
+
+    The requests of every shard are queued and sent in priority order as fast as
+    the gateway rate limit allows, while leaving a few commands for anything else
+    the shard needs to send. Queued guilds of the same shard are requested together,
+    so a single command covers up to :attr:`MAX_GUILDS_PER_REQUEST` guilds.
+    """
+
+    RESERVED_COMMANDS: ClassVar[int] = 5
+    # Gateway payloads are limited to 4096 bytes, a guild ID takes at most 21 of them
+    MAX_GUILDS_PER_REQUEST: ClassVar[int] = 100
+
+    def __init__(self, state: ConnectionState, key: Callable[[Guild], Any]) -> None:
+        self.state: ConnectionState = state
+        self.key: Callable[[Guild], Any] = key
+        self.total: int = 0
+        self.chunked: int = 0
+        # shard_id -> heap of (priority, insertion order, guild_id, request)
+        self._queues: Dict[int, List[Tuple[Any, int, int, ChunkRequest]]] = {}
+        self._tasks: Dict[int, asyncio.Task[None]] = {}
+        self._counter: Iterator[int] = itertools.count()
+
+    def schedule(self, guild: Guild, request: ChunkRequest) -> asyncio.Future[List[Member]]:
+        if self.chunked == self.total:
+            # Start counting again, e.g. for the guilds of a new session
+            self.chunked = self.total = 0
+
+        self.total += 1
+        future = request.get_future()
+        future.add_done_callback(functools.partial(self._on_done, guild.id))
+
+        shard_id = guild.shard_id
+        heapq.heappush(self._queues.setdefault(shard_id, []), (self.key(guild), next(self._counter), guild.id, request))
+        task = self._tasks.get(shard_id)
+        if task is None or task.done():
+            self._tasks[shard_id] = asyncio.create_task(self._drain(shard_id))
+        return future
+
+    def _on_done(self, guild_id: int, future: asyncio.Future[List[Member]]) -> None:
+        if future.cancelled():
+            # Nobody is waiting for these members anymore
+            self.total -= 1
+            return
+
+        self.chunked += 1
+        guild = self.state._get_guild(guild_id)
+        if guild is not None:
+            self.state.dispatch('chunk_progress', guild, self.chunked, self.total)
+
+    def _give_up(self, request: ChunkRequest, exc: Exception) -> None:
+        _log.warning('Could not request chunks for guild ID %s: %s', request.guild_id, exc)
+        self.state._chunk_requests.pop(request.guild_id, None)
+        request.sent.set()
+        request.done()
+
+    def _is_abandoned(self, request: ChunkRequest) -> bool:
+        if not all(future.done() for future in request.waiters):
+            return False
+
+        # Every waiter was cancelled before the request could be sent
+        if self.state._chunk_requests.get(request.guild_id) is request:
+            del self.state._chunk_requests[request.guild_id]
+        return True
+
+    async def _drain(self, shard_id: int) -> None:
+        state = self.state
+        queue = self._queues[shard_id]
+        while queue:
+            guild_id, request = queue[0][2:]
+            if self._is_abandoned(request):
+                heapq.heappop(queue)
+                continue
+
+            try:
+                limiter = state._get_websocket(guild_id)._rate_limiter
+            except Exception as exc:
+                self._give_up(heapq.heappop(queue)[3], exc)
+                continue
+
+            if limiter.get_remaining() <= self.RESERVED_COMMANDS:
+                await asyncio.sleep(limiter.reset_after())
+                continue
+
+            batch: List[ChunkRequest] = []
+            while queue and len(batch) < self.MAX_GUILDS_PER_REQUEST:
+                request = heapq.heappop(queue)[3]
+                if not self._is_abandoned(request):
+                    batch.append(request)
+
+            # The chunks of every guild in the batch carry the same nonce, each
+            # request still completes on its own as its guild's chunks arrive
+            nonce = os.urandom(16).hex()
+            for request in batch:
+                request.nonce = nonce
+
+            try:
+                await state.chunker([request.guild_id for request in batch], nonce=nonce)
+            except Exception as exc:
+                for request in batch:
+                    self._give_up(request, exc)
+            else:
+                for request in batch:
+                    request.sent.set()
+
+
+class MessageCache:
+    """An insertion ordered mapping of message IDs to :class:`Message` with FIFO eviction.
+
+    Messages are additionally partitioned by guild and channel ID. Each partition
+    can optionally be given its own budget, in which case a partition that goes over
+    its budget evicts its own oldest messages rather than those of other partitions.
+    When the cache as a whole is full, the oldest message of the guild holding the
+    most messages is evicted, so that a busy guild can't push out every other one.
+    """
+
+    def __init__(
+        self,
+        max_messages: int,
+        *,
+        max_messages_per_guild: Optional[int] = None,
+        max_messages_per_channel: Optional[int] = None,
+    ) -> None:
+        self.max_messages: int = max_messages
+        self.max_messages_per_guild: Optional[int] = max_messages_per_guild
+        self.max_messages_per_channel: Optional[int] = max_messages_per_channel
+        self._messages: OrderedDict[int, Message] = OrderedDict()
+        # partition_id -> message_id -> None, dicts are used as ordered sets
+        self._guilds: Dict[int, Dict[int, None]] = {}
+        self._channels: Dict[int, Dict[int, None]] = {}
+        # The messages that aren't from a guild share a partition
+        self._private: Dict[int, None] = {}
+        # Size -> guild IDs (None for the private partition) of the partitions holding
+        # that many messages, so the largest partition is found without scanning them
+        self._sizes: Dict[int, Dict[Optional[int], None]] = {}
+        self._largest: int = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __bool__(self) -> bool:
+        return bool(self._messages)
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages.values())
+
+    def __reversed__(self) -> Iterator[Message]:
+        return reversed(self._messages.values())
+
+    def __contains__(self, item: Any) -> bool:
+        return getattr(item, 'id', None) in self._messages
+
+    @staticmethod
+    def _guild_id(message: Message) -> Optional[int]:
+        guild = message.guild
+        return guild.id if guild is not None else None
+
+    @staticmethod
+    def _link(partitions: Dict[int, Dict[int, None]], key: Optional[int], message_id: int) -> Optional[Dict[int, None]]:
+        if key is None:
+            return None
+
+        try:
+            ids = partitions[key]
+        except KeyError:
+            partitions[key] = ids = {}
+        ids[message_id] = None
+        return ids
+
+    @staticmethod
+    def _unlink_from(partitions: Dict[int, Dict[int, None]], key: Optional[int], message_id: int) -> None:
+        try:
+            ids = partitions[key]  # type: ignore # None keys are never stored
+        except KeyError:
+            return
+
+        ids.pop(message_id, None)
+        if not ids:
+            del partitions[key]  # type: ignore
+
+    def _resize(self, guild_id: Optional[int], size: int, delta: int) -> None:
+        # Moves a partition that now holds `size` messages to its new size
+        sizes = self._sizes
+        previous = size - delta
+        if previous:
+            keys = sizes[previous]
+            del keys[guild_id]
+            if not keys:
+                del sizes[previous]
+                if previous == self._largest:
+                    # Sizes change one at a time, so this partition is the largest one now
+                    self._largest = size
+
+        if size:
+            try:
+                sizes[size][guild_id] = None
+            except KeyError:
+                sizes[size] = {guild_id: None}
+            if size > self._largest:
+                self._largest = size
+
+    def _unlink(self, message: Message) -> None:
+        message_id = message.id
+        guild_id = self._guild_id(message)
+        if guild_id is None:
+            ids = self._private
+            if message_id in ids:
+                del ids[message_id]
+                self._resize(None, len(ids), -1)
+        else:
+            ids = self._guilds.get(guild_id)
+            if ids is not None and message_id in ids:
+                del ids[message_id]
+                self._resize(guild_id, len(ids), -1)
+                if not ids:
+                    del self._guilds[guild_id]
+        self._unlink_from(self._channels, message.channel.id, message_id)
+
+    def _evict_oldest(self, ids: Dict[int, None], limit: int) -> None:
+        while len(ids) > limit:
+            self.pop(next(iter(ids)))
+
+    def get(self, message_id: Optional[int]) -> Optional[Message]:
+        # the keys of self._messages are ints
+        return self._messages.get(message_id)  # type: ignore
+
+    def append(self, message: Message) -> None:
+        message_id = message.id
+        messages = self._messages
+        if message_id in messages:
+            self._unlink(messages.pop(message_id))
+
+        messages[message_id] = message
+        channel_ids = self._link(self._channels, message.channel.id, message_id)
+        guild_id = self._guild_id(message)
+        guild_ids = self._link(self._guilds, guild_id, message_id)
+        if guild_ids is None:
+            self._private[message_id] = None
+            self._resize(None, len(self._private), 1)
+        else:
+            self._resize(guild_id, len(guild_ids), 1)
+
+        limit = self.max_messages_per_channel
+        if limit is not None and channel_ids is not None:
+            self._evict_oldest(channel_ids, limit)
+
+        limit = self.max_messages_per_guild
+        if limit is not None and guild_ids is not None:
+            self._evict_oldest(guild_ids, limit)
+
+        if len(messages) > self.max_messages:
+            # Every partition has the same fair share, so the largest one is the most over it
+            guild_id = next(iter(self._sizes[self._largest]))
+            ids = self._private if guild_id is None else self._guilds[guild_id]
+            self.pop(next(iter(ids)))
+
+    def pop(self, message_id: int) -> Optional[Message]:
+        message = self._messages.pop(message_id, None)
+        if message is not None:
+            self._unlink(message)
+        return message
+
+    def pop_many(self, message_ids: Iterable[int]) -> List[Message]:
+        # Snowflakes sort chronologically, so this keeps the oldest first order of the cache
+        found = [message for message in map(self._messages.get, message_ids) if message is not None]
+        found.sort(key=lambda m: m.id)
+        for message in found:
+            self.pop(message.id)
+        return found
+
+    def pop_guild(self, guild_id: int) -> List[Message]:
+        ids = self._guilds.get(guild_id)
+        if not ids:
+            return []
+
+        messages = self._messages
+        found = [messages[message_id] for message_id in ids]
+        for message in found:
+            self.pop(message.id)
+        return found
+
+    def channel_messages(self, channel_id: int, limit: Optional[int] = None) -> List[Message]:
+        ids = self._channels.get(channel_id)
+        if not ids:
+            return []
+
+        messages = self._messages
+        if limit is None or limit >= len(ids):
+            return [messages[message_id] for message_id in ids]
+
+        if limit <= 0:
+            return []
+
+        # Walk backwards so that only the requested messages are visited
+        found = [messages[message_id] for message_id in itertools.islice(reversed(ids), limit)]
+        found.reverse()
+        return found
+
+    def guild_message_count(self, guild_id: int) -> int:
+        return len(self._guilds.get(guild_id, ()))
+
+    def channel_message_count(self, channel_id: int) -> int:
+        return len(self._channels.get(channel_id, ()))
+
+    def clear(self) -> None:
+        self._messages.clear()
+        self._guilds.clear()
+        self._channels.clear()
+        self._private.clear()
+
+
 _log = logging.getLogger(__name__)
 
+# Gateway events whose parsers only build objects to dispatch and leave the cache alone.
+# These are skipped entirely when none of the events they dispatch have a consumer.
+_DISPATCH_ONLY_EVENTS: Dict[str, Tuple[str, ...]] = {
+    'TYPING_START': ('typing', 'raw_typing'),
+    'INVITE_CREATE': ('invite_create',),
+    'INVITE_DELETE': ('invite_delete',),
+    'CHANNEL_PINS_UPDATE': ('private_channel_pins_update', 'guild_channel_pins_update'),
+    'GUILD_AUDIT_LOG_ENTRY_CREATE': ('audit_log_entry_create',),
+    'AUTO_MODERATION_RULE_CREATE': ('automod_rule_create',),
+    'AUTO_MODERATION_RULE_UPDATE': ('automod_rule_update',),
+    'AUTO_MODERATION_RULE_DELETE': ('automod_rule_delete',),
+    'AUTO_MODERATION_ACTION_EXECUTION': ('automod_action',),
+    'GUILD_BAN_ADD': ('member_ban',),
+    'GUILD_INTEGRATIONS_UPDATE': ('guild_integrations_update',),
+    'INTEGRATION_CREATE': ('integration_create',),
+    'INTEGRATION_UPDATE': ('integration_update',),
+    'INTEGRATION_DELETE': ('raw_integration_delete',),
+    'WEBHOOKS_UPDATE': ('webhooks_update',),
+    'APPLICATION_COMMAND_PERMISSIONS_UPDATE': ('raw_app_command_permissions_update',),
+}
+
+# Events of the above that do update the cache when they're not from a guild,
+# TYPING_START in a DM sets the recipient of the channel.
+_GUILD_ONLY_DISPATCH_EVENTS: Tuple[str, ...] = ('TYPING_START',)
+
+# Gateway events that make cached REST responses stale, mapped to the
+# fields of their payload holding the IDs of the modified resources.
+_RESPONSE_INVALIDATING_EVENTS: Dict[str, Tuple[str, ...]] = {
+    'CHANNEL_UPDATE': ('id',),
+    'CHANNEL_DELETE': ('id',),
+    'THREAD_UPDATE': ('id',),
+    'THREAD_DELETE': ('id',),
+    'GUILD_UPDATE': ('id',),
+    'GUILD_DELETE': ('id',),
+    'GUILD_ROLE_UPDATE': ('guild_id',),
+    'GUILD_ROLE_DELETE': ('guild_id',),
+    'GUILD_EMOJIS_UPDATE': ('guild_id',),
+    'GUILD_STICKERS_UPDATE': ('guild_id',),
+    'GUILD_MEMBER_UPDATE': ('user.id',),
+    'GUILD_MEMBER_REMOVE': ('user.id',),
+    'GUILD_BAN_ADD': ('user.id',),
+    'GUILD_BAN_REMOVE': ('user.id',),
+    'MESSAGE_UPDATE': ('id',),
+    'MESSAGE_DELETE': ('id',),
+    'MESSAGE_DELETE_BULK': ('ids',),
+    'USER_UPDATE': ('id',),
+}
+
 
 async def logging_coroutine(coroutine: Coroutine[Any, Any, T], *, info: str) -> Optional[T]:
     try:
@@ -182,11 +567,27 @@ class ConnectionState(Generic[ClientT]):
         if self.max_messages is not None and self.max_messages <= 0:
             self.max_messages = 1000
 
+        self.max_messages_per_guild: Optional[int] = options.get('max_messages_per_guild')
+        self.max_messages_per_channel: Optional[int] = options.get('max_messages_per_channel')
+        for name in ('max_messages_per_guild', 'max_messages_per_channel'):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f'{name} must be greater than 0')
+
+        self.lazy_parsing: bool = options.get('lazy_parsing', False)
+        self._message_cls: Type[Message] = _LazyMessage if self.lazy_parsing else Message
+
         self.dispatch: Callable[..., Any] = dispatch
         self.handlers: Dict[str, Callable[..., Any]] = handlers
         self.hooks: Dict[str, Callable[..., Coroutine[Any, Any, Any]]] = hooks
         self.shard_count: Optional[int] = None
         self._ready_task: Optional[asyncio.Task] = None
+        # The shards that are resuming a session saved by a previous process
+        self._restored_sessions: Set[Optional[int]] = set()
+        # The guilds loaded from a cache snapshot that haven't been received from the gateway yet
+        self._restored_guilds: Set[int] = set()
+        # guild_id -> IDs of the members loaded from a cache snapshot that weren't refreshed yet
+        self._stale_members: Dict[int, Set[int]] = {}
         self.application_id: Optional[int] = utils._get_as_snowflake(options, 'application_id')
         self.application_flags: ApplicationFlags = utils.MISSING
         self.heartbeat_timeout: float = options.get('heartbeat_timeout', 60.0)
@@ -227,6 +628,9 @@ class ConnectionState(Generic[ClientT]):
             _log.warning('Guilds intent seems to be disabled. This may cause state related issues.')
 
         self._chunk_guilds: bool = options.get('chunk_guilds_at_startup', intents.members)
+        self._chunk_scheduler: ChunkScheduler = ChunkScheduler(
+            self, _chunk_priority_key(options.get('chunk_priority', 'smallest'))
+        )
 
         # Ensure these two are set properly
         if not intents.members and self._chunk_guilds:
@@ -242,6 +646,15 @@ class ConnectionState(Generic[ClientT]):
             cache_flags._verify_intents(intents)
 
         self.member_cache_flags: MemberCacheFlags = cache_flags
+
+        cache_stores = options.get('cache_stores') or {}
+        for name, factory in cache_stores.items():
+            if name not in STORE_NAMES:
+                raise ValueError(f'unknown cache store {name!r}, expected one of {", ".join(STORE_NAMES)}')
+            if not callable(factory):
+                raise TypeError(f'cache store factory for {name!r} must be callable not {factory.__class__.__name__}')
+
+        self._cache_stores: Dict[str, CacheStoreFactory] = dict(cache_stores)
         self._activity: Optional[ActivityPayload] = activity
         self._status: Optional[str] = status
         self._intents: Intents = intents
@@ -272,25 +685,40 @@ class ConnectionState(Generic[ClientT]):
 
         # Purposefully don't call `clear` because users rely on cache being available post-close
 
+    def _create_store(self, name: str, default: Optional[Callable[[], MutableMapping[int, Any]]] = None) -> MutableMapping[int, Any]:
+        try:
+            factory = self._cache_stores[name]
+        except KeyError:
+            return default() if default is not None else {}
+        else:
+            return factory()
+
     def clear(self, *, views: bool = True) -> None:
         self.user: Optional[ClientUser] = None
-        self._users: weakref.WeakValueDictionary[int, User] = weakref.WeakValueDictionary()
-        self._emojis: Dict[int, Emoji] = {}
-        self._stickers: Dict[int, GuildSticker] = {}
-        self._guilds: Dict[int, Guild] = {}
+        self._users: MutableMapping[int, User] = self._create_store('users', weakref.WeakValueDictionary)
+        self._emojis: MutableMapping[int, Emoji] = self._create_store('emojis')
+        self._stickers: MutableMapping[int, GuildSticker] = self._create_store('stickers')
+        self._guilds: MutableMapping[int, Guild] = self._create_store('guilds')
+        self._stale_members = {}
         if views:
             self._view_store: ViewStore = ViewStore(self)
 
         self._voice_clients: Dict[int, VoiceProtocol] = {}
 
-        # LRU of max size 128
-        self._private_channels: OrderedDict[int, PrivateChannel] = OrderedDict()
+        # LRU of max size 128 by default
+        self._private_channels: MutableMapping[int, PrivateChannel] = self._create_store(
+            'private_channels', lambda: LRUCacheStore(128)
+        )
         # extra dict to look up private channels by user id
         self._private_channels_by_user: Dict[int, DMChannel] = {}
         if self.max_messages is not None:
-            self._messages: Optional[Deque[Message]] = deque(maxlen=self.max_messages)
+            self._messages: Optional[MessageCache] = MessageCache(
+                self.max_messages,
+                max_messages_per_guild=self.max_messages_per_guild,
+                max_messages_per_channel=self.max_messages_per_channel,
+            )
         else:
-            self._messages: Optional[Deque[Message]] = None
+            self._messages: Optional[MessageCache] = None
 
     def process_chunk_requests(self, guild_id: int, nonce: Optional[str], members: List[Member], complete: bool) -> None:
         removed = []
@@ -409,6 +837,7 @@ class ConnectionState(Generic[ClientT]):
 
     def _remove_guild(self, guild: Guild) -> None:
         self._guilds.pop(guild.id, None)
+        self._stale_members.pop(guild.id, None)
 
         for emoji in guild.emojis:
             self._emojis.pop(emoji.id, None)
@@ -439,31 +868,30 @@ class ConnectionState(Generic[ClientT]):
         return utils.SequenceProxy(self._private_channels.values())
 
     def _get_private_channel(self, channel_id: Optional[int]) -> Optional[PrivateChannel]:
-        try:
-            # the keys of self._private_channels are ints
-            value = self._private_channels[channel_id]  # type: ignore
-        except KeyError:
-            return None
-        else:
-            # Type narrowing can't figure out that channel_id isn't None here
-            self._private_channels.move_to_end(channel_id)  # type: ignore
-            return value
+        # the keys of self._private_channels are ints
+        return self._private_channels.get(channel_id)  # type: ignore
 
     def _get_private_channel_by_user(self, user_id: Optional[int]) -> Optional[DMChannel]:
         # the keys of self._private_channels are ints
-        return self._private_channels_by_user.get(user_id)  # type: ignore
+        channel = self._private_channels_by_user.get(user_id)  # type: ignore
+        if channel is not None and channel.id not in self._private_channels:
+            # The store evicted it
+            del self._private_channels_by_user[user_id]  # type: ignore
+            return None
+        return channel
 
     def _add_private_channel(self, channel: PrivateChannel) -> None:
         channel_id = channel.id
         self._private_channels[channel_id] = channel
 
-        if len(self._private_channels) > 128:
-            _, to_remove = self._private_channels.popitem(last=False)
-            if isinstance(to_remove, DMChannel) and to_remove.recipient:
-                self._private_channels_by_user.pop(to_remove.recipient.id, None)
-
         if isinstance(channel, DMChannel) and channel.recipient:
-            self._private_channels_by_user[channel.recipient.id] = channel
+            by_user = self._private_channels_by_user
+            by_user[channel.recipient.id] = channel
+
+            # Stores evict without telling us, so drop the stale entries once they start piling up
+            if len(by_user) > 2 * len(self._private_channels) + 128:
+                channels = self._private_channels
+                self._private_channels_by_user = {k: v for k, v in by_user.items() if v.id in channels}
 
     def add_dm_channel(self, data: DMChannelPayload) -> DMChannel:
         # self.user is *always* cached when this is called
@@ -478,14 +906,88 @@ class ConnectionState(Generic[ClientT]):
             if recipient is not None:
                 self._private_channels_by_user.pop(recipient.id, None)
 
+    def _has_consumer(self, event: str, /) -> bool:
+        # The client replaces this with its own registry of listeners.
+        # Without one, assume that every event is being listened to.
+        return True
+
+    def _should_parse(self, event: str, data: Any) -> bool:
+        try:
+            events = _DISPATCH_ONLY_EVENTS[event]
+        except KeyError:
+            return True
+
+        if event in _GUILD_ONLY_DISPATCH_EVENTS and 'guild_id' not in data:
+            return True
+
+        return any(self._has_consumer(ev) for ev in events)
+
+    def _invalidate_cached_responses(self, event: str, data: Any) -> None:
+        if not self.http._response_cache:
+            return
+
+        try:
+            fields = _RESPONSE_INVALIDATING_EVENTS[event]
+        except KeyError:
+            return
+
+        snowflakes: List[int] = []
+        for field in fields:
+            value = data
+            for part in field.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            if isinstance(value, list):
+                snowflakes.extend(int(v) for v in value)
+            elif value is not None:
+                snowflakes.append(int(value))
+
+        self.http.invalidate_cached_responses(snowflakes)
+
     def _get_message(self, msg_id: Optional[int]) -> Optional[Message]:
-        return utils.find(lambda m: m.id == msg_id, reversed(self._messages)) if self._messages else None
+        return self._messages.get(msg_id) if self._messages else None
+
+    def _get_channel_messages(self, channel_id: int, limit: Optional[int] = None) -> List[Message]:
+        return self._messages.channel_messages(channel_id, limit) if self._messages else []
 
     def _add_guild_from_data(self, data: GuildPayload) -> Guild:
         guild = Guild(data=data, state=self)
         self._add_guild(guild)
         return guild
 
+    def _add_ready_guilds(self, guilds: List[GuildPayload], shard_id: Optional[int] = None) -> None:
+        restored = self._restored_guilds
+        if restored:
+            ready_ids = {int(data['id']) for data in guilds}
+            for guild_id in list(restored):
+                guild = self._get_guild(guild_id)
+                if guild is None or (shard_id is not None and guild.shard_id != shard_id):
+                    continue
+                if guild_id not in ready_ids:
+                    # The client was removed from the guild while it was offline
+                    restored.discard(guild_id)
+                    self._remove_guild(guild)
+
+        for data in guilds:
+            guild_id = int(data['id'])
+            guild = self._get_guild(guild_id) if guild_id in restored else None
+            if guild is not None:
+                # Keep the restored guild, it is updated once its GUILD_CREATE is received
+                guild.unavailable = data.get('unavailable', True)
+            else:
+                self._add_guild_from_data(data)
+
+    async def _load_cache_snapshot(self, path: str) -> int:
+        guilds = await snapshot.load(self, path)
+        self._restored_guilds.update(guild.id for guild in guilds)
+        return len(guilds)
+
+    async def _save_cache_snapshot(self, path: str) -> int:
+        try:
+            return await snapshot.dump(self, path)
+        except Exception:
+            _log.exception('Failed to write the cache snapshot to %s.', path)
+            return 0
+
     def _guild_needs_chunking(self, guild: Guild) -> bool:
         # If presences are enabled then we get back the old guild.large behaviour
         return self._chunk_guilds and not guild.chunked and not (self._intents.presences and not guild.large)
@@ -506,7 +1008,13 @@ class ConnectionState(Generic[ClientT]):
         return channel or PartialMessageable(state=self, guild_id=guild_id, id=channel_id), guild
 
     async def chunker(
-        self, guild_id: int, query: str = '', limit: int = 0, presences: bool = False, *, nonce: Optional[str] = None
+        self,
+        guild_id: Union[int, List[int]],
+        query: str = '',
+        limit: int = 0,
+        presences: bool = False,
+        *,
+        nonce: Optional[str] = None,
     ) -> None:
         ws = self._get_websocket(guild_id)  # This is ignored upstream
         await ws.request_chunks(guild_id, query=query, limit=limit, presences=presences, nonce=nonce)
@@ -544,7 +1052,7 @@ class ConnectionState(Generic[ClientT]):
                     break
                 else:
                     if self._guild_needs_chunking(guild):
-                        future = await self.chunk_guild(guild, wait=False)
+                        future = self._schedule_chunk(guild)
                         states.append((guild, future))
                     else:
                         if guild.unavailable is False:
@@ -553,12 +1061,7 @@ class ConnectionState(Generic[ClientT]):
                             self.dispatch('guild_join', guild)
 
             for guild, future in states:
-                timeout = self._chunk_timeout(guild)
-
-                try:
-                    await asyncio.wait_for(future, timeout=timeout)
-                except asyncio.TimeoutError:
-                    _log.warning('Shard ID %s timed out waiting for chunks for guild_id %s.', guild.shard_id, guild.id)
+                await self._wait_for_chunks(guild, future)
 
                 if guild.unavailable is False:
                     self.dispatch('guild_available', guild)
@@ -572,7 +1075,9 @@ class ConnectionState(Generic[ClientT]):
                 pass  # already been deleted somehow
 
         except asyncio.CancelledError:
-            pass
+            # Drop the requests that were not sent yet
+            for _, future in states:
+                future.cancel()
         else:
             # dispatch the event
             self.call_handlers('ready')
@@ -585,7 +1090,9 @@ class ConnectionState(Generic[ClientT]):
             self._ready_task.cancel()
 
         self._ready_state: asyncio.Queue[Guild] = asyncio.Queue()
-        self.clear(views=False)
+        self._restored_sessions.clear()
+        if not self._restored_guilds:
+            self.clear(views=False)
         self.user = user = ClientUser(state=self, data=data['user'])
         self._users[user.id] = user  # type: ignore
 
@@ -598,19 +1105,27 @@ class ConnectionState(Generic[ClientT]):
                 self.application_id = utils._get_as_snowflake(application, 'id')
                 self.application_flags: ApplicationFlags = ApplicationFlags._from_value(application['flags'])
 
-        for guild_data in data['guilds']:
-            self._add_guild_from_data(guild_data)  # type: ignore
+        self._add_ready_guilds(data['guilds'])  # type: ignore
 
         self.dispatch('connect')
         self._ready_task = asyncio.create_task(self._delay_ready())
 
     def parse_resumed(self, data: gw.ResumedEvent) -> None:
         self.dispatch('resumed')
+        # The missed events were replayed, so the restored guilds are up to date
+        self._restored_guilds.clear()
+
+        shard_id = data.get('__shard_id__')  # type: ignore # This is an internal discord.py key
+        if shard_id in self._restored_sessions:
+            # A saved session doesn't receive a READY, so this is when the client is ready
+            self._restored_sessions.discard(shard_id)
+            self.call_handlers('ready')
+            self.dispatch('ready')
 
     def parse_message_create(self, data: gw.MessageCreateEvent) -> None:
         channel, _ = self._get_guild_channel(data)
         # channel would be the correct type here
-        message = Message(channel=channel, data=data, state=self)  # type: ignore
+        message = self._message_cls(channel=channel, data=data, state=self)  # type: ignore
         self.dispatch('message', message)
         if self._messages is not None:
             self._messages.append(message)
@@ -625,34 +1140,35 @@ class ConnectionState(Generic[ClientT]):
         self.dispatch('raw_message_delete', raw)
         if self._messages is not None and found is not None:
             self.dispatch('message_delete', found)
-            self._messages.remove(found)
+            self._messages.pop(found.id)
 
     def parse_message_delete_bulk(self, data: gw.MessageDeleteBulkEvent) -> None:
         raw = RawBulkMessageDeleteEvent(data)
         if self._messages:
-            found_messages = [message for message in self._messages if message.id in raw.message_ids]
+            found_messages = self._messages.pop_many(raw.message_ids)
         else:
             found_messages = []
         raw.cached_messages = found_messages
         self.dispatch('raw_bulk_message_delete', raw)
         if found_messages:
             self.dispatch('bulk_message_delete', found_messages)
-            for msg in found_messages:
-                # self._messages won't be None here
-                self._messages.remove(msg)  # type: ignore
 
     def parse_message_update(self, data: gw.MessageUpdateEvent) -> None:
         raw = RawMessageUpdateEvent(data)
         message = self._get_message(raw.message_id)
         if message is not None:
-            older_message = copy.copy(message)
-            raw.cached_message = older_message
-            self.dispatch('raw_message_edit', raw)
-            message._update(data)
-            # Coerce the `after` parameter to take the new updated Member
-            # ref: #5999
-            older_message.author = message.author
-            self.dispatch('message_edit', older_message, message)
+            if not self._has_consumer('message_edit') and not self._has_consumer('raw_message_edit'):
+                # Nothing needs the old copy, only keep the cached message up to date
+                message._update(data)
+            else:
+                older_message = copy.copy(message)
+                raw.cached_message = older_message
+                self.dispatch('raw_message_edit', raw)
+                message._update(data)
+                # Coerce the `after` parameter to take the new updated Member
+                # ref: #5999
+                older_message.author = message.author
+                self.dispatch('message_edit', older_message, message)
         else:
             self.dispatch('raw_message_edit', raw)
 
@@ -671,7 +1187,7 @@ class ConnectionState(Generic[ClientT]):
         raw = RawReactionActionEvent(data, emoji, 'REACTION_ADD')
 
         member_data = data.get('member')
-        if member_data:
+        if member_data and (self._has_consumer('raw_reaction_add') or self._has_consumer('reaction_add')):
             guild = self._get_guild(raw.guild_id)
             if guild is not None:
                 raw.member = Member(data=member_data, guild=guild, state=self)
@@ -768,12 +1284,14 @@ class ConnectionState(Generic[ClientT]):
             _log.debug('PRESENCE_UPDATE referencing an unknown member ID: %s. Discarding', member_id)
             return
 
-        old_member = Member._copy(member)
+        # Copying the member is only needed if someone wants the old state
+        old_member = Member._copy(member) if self._has_consumer('presence_update') else None
         user_update = member._presence_update(data=data, user=user)
         if user_update:
             self.dispatch('user_update', user_update[0], user_update[1])
 
-        self.dispatch('presence_update', old_member, member)
+        if old_member is not None:
+            self.dispatch('presence_update', old_member, member)
 
     def parse_user_update(self, data: gw.UserUpdateEvent) -> None:
         if self.user:
@@ -935,7 +1453,7 @@ class ConnectionState(Generic[ClientT]):
         except KeyError:
             # If not provided, then the entire guild is being synced
             # So all previous thread data should be overwritten
-            previous_threads = guild._threads.copy()
+            previous_threads = dict(guild._threads.items())
             guild._clear_threads()
         else:
             previous_threads = guild._filter_threads(channel_ids)
@@ -1053,13 +1571,14 @@ class ConnectionState(Generic[ClientT]):
 
         member = guild.get_member(user_id)
         if member is not None:
-            old_member = Member._copy(member)
+            old_member = Member._copy(member) if self._has_consumer('member_update') else None
             member._update(data)
             user_update = member._update_inner_user(user)
             if user_update:
                 self.dispatch('user_update', user_update[0], user_update[1])
 
-            self.dispatch('member_update', old_member, member)
+            if old_member is not None:
+                self.dispatch('member_update', old_member, member)
         else:
             if self.member_cache_flags.joined:
                 member = Member(data=data, guild=guild, state=self)  # type: ignore # the data is not complete, contains a delta of values
@@ -1157,6 +1676,34 @@ class ConnectionState(Generic[ClientT]):
         self.dispatch('automod_action', execution)
 
     def _get_create_guild(self, data: gw.GuildCreateEvent) -> Guild:
+        guild_id = int(data['id'])
+        if guild_id in self._restored_guilds:
+            self._restored_guilds.discard(guild_id)
+            guild = self._get_guild(guild_id)
+            if guild is not None:
+                # The payload is applied on top of the restored guild, which keeps the members
+                # that were cached until they are refreshed. Channels, threads and voice states
+                # are all part of the payload, so the ones that are missing from it are gone.
+                channel_ids = {int(channel['id']) for channel in data.get('channels', [])}
+                for channel in [channel for channel in guild._channels.values() if channel.id not in channel_ids]:
+                    guild._remove_channel(channel)
+                thread_ids = {int(thread['id']) for thread in data.get('threads', [])}
+                for thread in [thread for thread in guild._threads.values() if thread.id not in thread_ids]:
+                    guild._remove_thread(thread)
+                guild._voice_states = {}
+                guild.unavailable = False
+                stale = set(guild._members)
+                guild._from_data(data)
+                stale.difference_update(int(member['user']['id']) for member in data.get('members', []))
+                if stale:
+                    if self._intents.presences and not guild.large:
+                        # Every member is part of the payload
+                        self._prune_stale_members(guild, stale)
+                    else:
+                        # The members are refreshed, and the ones that left pruned, once the guild is chunked
+                        self._stale_members[guild_id] = stale
+                return guild
+
         if data.get('unavailable') is False:
             # GUILD_CREATE with unavailable in the response
             # usually means that the guild has become available
@@ -1169,6 +1716,10 @@ class ConnectionState(Generic[ClientT]):
 
         return self._add_guild_from_data(data)
 
+    def _prune_stale_members(self, guild: Guild, member_ids: Set[int]) -> None:
+        for member_id in member_ids:
+            guild._remove_member(Object(id=member_id))
+
     def is_guild_evicted(self, guild: Guild) -> bool:
         return guild.id not in self._guilds
 
@@ -1190,14 +1741,34 @@ class ConnectionState(Generic[ClientT]):
         if request is None:
             self._chunk_requests[guild.id] = request = ChunkRequest(guild.id, self.loop, self._get_guild, cache=cache)
             await self.chunker(guild.id, nonce=request.nonce)
+            request.sent.set()
 
         if wait:
             return await request.wait()
         return request.get_future()
 
+    def _schedule_chunk(self, guild: Guild) -> asyncio.Future[List[Member]]:
+        request = self._chunk_requests.get(guild.id)
+        if request is None:
+            request = ChunkRequest(guild.id, self.loop, self._get_guild, cache=self.member_cache_flags.joined)
+            self._chunk_requests[guild.id] = request
+            return self._chunk_scheduler.schedule(guild, request)
+        return request.get_future()
+
     def _chunk_timeout(self, guild: Guild) -> float:
         return max(5.0, (guild.member_count or 0) / 10000)
 
+    async def _wait_for_chunks(self, guild: Guild, future: asyncio.Future[List[Member]]) -> None:
+        request = self._chunk_requests.get(guild.id)
+        if request is not None:
+            # Scheduled requests can be queued for a while, only time the response
+            await request.sent.wait()
+
+        try:
+            await asyncio.wait_for(future, timeout=self._chunk_timeout(guild))
+        except asyncio.TimeoutError:
+            _log.warning('Shard ID %s timed out waiting for chunks for guild_id %s.', guild.shard_id, guild.id)
+
     async def _chunk_and_dispatch(self, guild, unavailable):
         timeout = self._chunk_timeout(guild)
 
@@ -1266,9 +1837,7 @@ class ConnectionState(Generic[ClientT]):
 
         # do a cleanup of the messages cache
         if self._messages is not None:
-            self._messages: Optional[Deque[Message]] = deque(
-                (msg for msg in self._messages if msg.guild != guild), maxlen=self.max_messages
-            )
+            self._messages.pop_guild(guild.id)
 
         self._remove_guild(guild)
         self.dispatch('guild_remove', guild)
@@ -1328,6 +1897,7 @@ class ConnectionState(Generic[ClientT]):
             if role is not None:
                 old_role = copy.copy(role)
                 role._update(role_data)
+                guild._invalidate_permissions()
                 self.dispatch('guild_role_update', old_role, role)
         else:
             _log.debug('GUILD_ROLE_UPDATE referencing an unknown guild ID: %s. Discarding.', data['guild_id'])
@@ -1353,6 +1923,20 @@ class ConnectionState(Generic[ClientT]):
                     member._presence_update(presence, user)
 
         complete = data.get('chunk_index', 0) + 1 == data.get('chunk_count')
+        stale = self._stale_members.get(guild_id)
+        if stale is not None:
+            # Replace the members restored from a cache snapshot with the received ones
+            for member in members:
+                if member.id in stale:
+                    stale.discard(member.id)
+                    guild._add_member(member)
+
+            request = self._chunk_requests.get(guild_id)
+            if complete and request is not None and request.nonce == data.get('nonce'):
+                # Every member was requested, so the ones that weren't received left the guild
+                del self._stale_members[guild_id]
+                self._prune_stale_members(guild, stale)
+
         self.process_chunk_requests(guild_id, data.get('nonce'), members, complete)
 
     def parse_guild_integrations_update(self, data: gw.GuildIntegrationsUpdateEvent) -> None:
@@ -1611,7 +2195,7 @@ class ConnectionState(Generic[ClientT]):
                 return channel
 
     def create_message(self, *, channel: MessageableChannel, data: MessagePayload) -> Message:
-        return Message(state=self, channel=channel, data=data)
+        return self._message_cls(state=self, channel=channel, data=data)
 
 
 class AutoShardedConnectionState(ConnectionState[ClientT]):
@@ -1639,7 +2223,7 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
 
     async def chunker(
         self,
-        guild_id: int,
+        guild_id: Union[int, List[int]],
         query: str = '',
         limit: int = 0,
         presences: bool = False,
@@ -1647,7 +2231,8 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
         shard_id: Optional[int] = None,
         nonce: Optional[str] = None,
     ) -> None:
-        ws = self._get_websocket(guild_id, shard_id=shard_id)
+        # Batched guilds all belong to the same shard
+        ws = self._get_websocket(guild_id if isinstance(guild_id, int) else guild_id[0], shard_id=shard_id)
         await ws.request_chunks(guild_id, query=query, limit=limit, presences=presences, nonce=nonce)
 
     def _add_ready_state(self, guild: Guild) -> bool:
@@ -1682,7 +2267,7 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
                     break
                 else:
                     if self._guild_needs_chunking(guild):
-                        future = await self.chunk_guild(guild, wait=False)
+                        future = self._schedule_chunk(guild)
                         states.append((guild, future))
                     else:
                         if guild.unavailable is False:
@@ -1691,12 +2276,7 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
                             self.dispatch('guild_join', guild)
 
             for guild, future in states:
-                timeout = self._chunk_timeout(guild)
-
-                try:
-                    await asyncio.wait_for(future, timeout=timeout)
-                except asyncio.TimeoutError:
-                    _log.warning('Shard ID %s timed out waiting for chunks for guild_id %s.', guild.shard_id, guild.id)
+                await self._wait_for_chunks(guild, future)
 
                 if guild.unavailable is False:
                     self.dispatch('guild_available', guild)
@@ -1710,7 +2290,9 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
                 pass  # already been deleted somehow
 
         except asyncio.CancelledError:
-            pass
+            # Drop the requests that were not sent yet
+            for _, future in states:
+                future.cancel()
         else:
             # dispatch the event
             self.dispatch('shard_ready', shard_id)
@@ -1727,6 +2309,8 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
         if shard_id not in self._ready_states:
             self._ready_states[shard_id] = asyncio.Queue()
 
+        self._restored_sessions.discard(shard_id)
+
         self.user: Optional[ClientUser]
         self.user = user = ClientUser(state=self, data=data['user'])
         # self._users is a list of Users, we're setting a ClientUser
@@ -1741,8 +2325,7 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
                 self.application_id: Optional[int] = utils._get_as_snowflake(application, 'id')
                 self.application_flags: ApplicationFlags = ApplicationFlags._from_value(application['flags'])
 
-        for guild_data in data['guilds']:
-            self._add_guild_from_data(guild_data)  # type: ignore # _add_guild_from_data requires a complete Guild payload
+        self._add_ready_guilds(data['guilds'], shard_id)  # type: ignore # _add_ready_guilds requires complete Guild payloads
 
         if self._messages:
             self._update_message_references()
@@ -1756,6 +2339,22 @@ class AutoShardedConnectionState(ConnectionState[ClientT]):
         if len(self._ready_tasks) == len(self.shard_ids):
             self._ready_task = asyncio.create_task(self._delay_ready())
 
+    async def _delay_restored_shard_ready(self, shard_id: int) -> None:
+        self.dispatch('shard_ready', shard_id)
+
     def parse_resumed(self, data: gw.ResumedEvent) -> None:
+        shard_id: int = data['__shard_id__']  # type: ignore # This is an internal discord.py key
         self.dispatch('resumed')
-        self.dispatch('shard_resumed', data['__shard_id__'])  # type: ignore # This is an internal discord.py key
+        self.dispatch('shard_resumed', shard_id)
+        # The missed events were replayed, so the restored guilds of the shard are up to date
+        for guild_id in list(self._restored_guilds):
+            guild = self._get_guild(guild_id)
+            if guild is None or guild.shard_id == shard_id:
+                self._restored_guilds.discard(guild_id)
+
+        if shard_id in self._restored_sessions:
+            # A saved session doesn't receive a READY, the shard is ready once it has resumed
+            self._restored_sessions.discard(shard_id)
+            self._ready_tasks[shard_id] = asyncio.create_task(self._delay_restored_shard_ready(shard_id))
+            if len(self._ready_tasks) == len(self.shard_ids):
+                self._ready_task = asyncio.create_task(self._delay_ready())
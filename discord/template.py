@@ -81,6 +81,9 @@ class _PartialTemplateState:
     def _get_guild(self, id):
         return self.__state._get_guild(id)
 
+    def _create_store(self, name, default=None):
+        return {}
+
     async def query_members(self, **kwargs: Any) -> List[Any]:
         return []
 
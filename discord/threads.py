@@ -315,6 +315,27 @@ class Thread(Messageable, Hashable):
         """
         return self._state._get_message(self.last_message_id) if self.last_message_id else None
 
+    def get_cached_messages(self, limit: Optional[int] = None) -> List[Message]:
+        """Returns the messages of this thread that are in the message cache.
+
+        This does not scan the whole cache, so it is cheap enough to call
+        from event handlers.
+
+        .. versionadded:: 2.3
+
+        Parameters
+        -----------
+        limit: Optional[:class:`int`]
+            The maximum number of messages to return, starting from the most recent one.
+            If ``None`` then every cached message of this thread is returned.
+
+        Returns
+        --------
+        List[:class:`Message`]
+            The cached messages, ordered from oldest to newest.
+        """
+        return self._state._get_channel_messages(self.id, limit)
+
     @property
     def category(self) -> Optional[CategoryChannel]:
         """The category channel the parent channel belongs to, if applicable.
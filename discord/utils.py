@@ -194,6 +194,63 @@ class CachedSlotProperty(Generic[T, T_co]):
             return value
 
 
+class _DeferredPayload:
+    __slots__ = ('data',)
+
+    def __init__(self, data: Any) -> None:
+        self.data: Any = data
+
+
+class DeferredSlotProperty(Generic[T, T_co]):
+    def __init__(self, name: str, function: Callable[[T, Any], T_co]) -> None:
+        self.name = name
+        self.function = function
+        self.slot: Any = None
+        self.__doc__ = getattr(function, '__doc__')
+
+    def __set_name__(self, owner: Type[T], name: str) -> None:
+        if name != self.name:
+            return
+
+        # The property shadows a slot of the same name declared by a base class,
+        # so that slot is used to store the value instead of declaring another one
+        for base in owner.__mro__[1:]:
+            slot = base.__dict__.get(name)
+            if slot is not None:
+                self.slot = slot
+                return
+
+        raise TypeError(f'no base class of {owner.__name__} declares a {name!r} slot')
+
+    @overload
+    def __get__(self, instance: None, owner: Type[T]) -> DeferredSlotProperty[T, T_co]:
+        ...
+
+    @overload
+    def __get__(self, instance: T, owner: Type[T]) -> T_co:
+        ...
+
+    def __get__(self, instance: Optional[T], owner: Type[T]) -> Any:
+        if instance is None:
+            return self
+
+        value = getattr(instance, self.name) if self.slot is None else self.slot.__get__(instance, owner)
+        if value.__class__ is _DeferredPayload:
+            value = self.function(instance, value.data)
+            self.__set__(instance, value)
+        return value
+
+    def __set__(self, instance: T, value: Any) -> None:
+        if self.slot is None:
+            setattr(instance, self.name, value)
+        else:
+            self.slot.__set__(instance, value)
+
+    def defer(self, instance: T, data: Any) -> None:
+        # Keep the raw payload around and only build the value once it's accessed
+        self.__set__(instance, _DeferredPayload(data))
+
+
 class classproperty(Generic[T_co]):
     def __init__(self, fget: Callable[[Any], T_co]) -> None:
         self.fget = fget
@@ -212,6 +269,13 @@ def cached_slot_property(name: str) -> Callable[[Callable[[T], T_co]], CachedSlo
     return decorator
 
 
+def deferred_slot_property(name: str) -> Callable[[Callable[[T, Any], T_co]], DeferredSlotProperty[T, T_co]]:
+    def decorator(func: Callable[[T, Any], T_co]) -> DeferredSlotProperty[T, T_co]:
+        return DeferredSlotProperty(name, func)
+
+    return decorator
+
+
 class SequenceProxy(Sequence[T_co]):
     """A proxy of a sequence that only creates a copy when necessary."""
 
@@ -642,6 +706,7 @@ if HAS_ORJSON:
     def _to_json(obj: Any) -> str:
         return orjson.dumps(obj).decode('utf-8')
 
+    _to_json_bytes = orjson.dumps  # type: ignore
     _from_json = orjson.loads  # type: ignore
 
 else:
@@ -649,6 +714,11 @@ else:
     def _to_json(obj: Any) -> str:
         return json.dumps(obj, separators=(',', ':'), ensure_ascii=True)
 
+    def _to_json_bytes(obj: Any) -> bytes:
+        # ensure_ascii makes the output valid UTF-8 without a separate encoding step
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=True).encode('ascii')
+
+    # json.loads accepts bytes as well
     _from_json = json.loads
 
 
@@ -1039,6 +1109,39 @@ async def _achunk(iterator: AsyncIterable[T], max_size: int) -> AsyncIterator[Li
         yield ret
 
 
+async def _prefetch(iterator: AsyncIterable[T], size: int) -> AsyncIterator[T]:
+    # Consumes the iterator in a background task, buffering up to size items
+    # ahead of the caller. This is used to fetch the next page of a paginated
+    # endpoint while the current one is being processed.
+    if size < 1:
+        async for item in iterator:
+            yield item
+        return
+
+    queue: asyncio.Queue[Tuple[bool, Any]] = asyncio.Queue(maxsize=size)
+
+    async def producer() -> None:
+        try:
+            async for item in iterator:
+                await queue.put((False, item))
+        except Exception as e:
+            await queue.put((True, e))
+        else:
+            await queue.put((True, None))
+
+    task = asyncio.create_task(producer())
+    try:
+        while True:
+            done, item = await queue.get()
+            if done:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        task.cancel()
+
+
 @overload
 def as_chunks(iterator: AsyncIterable[T], max_size: int) -> AsyncIterator[List[T]]:
     ...
@@ -138,7 +138,7 @@ class AsyncWebhookAdapter:
     ) -> Any:
         headers: Dict[str, str] = {}
         files = files or []
-        to_send: Optional[Union[str, aiohttp.FormData]] = None
+        to_send: Optional[Union[bytes, aiohttp.FormData]] = None
         bucket = (route.webhook_id, route.webhook_token)
 
         try:
@@ -148,7 +148,7 @@ class AsyncWebhookAdapter:
 
         if payload is not None:
             headers['Content-Type'] = 'application/json'
-            to_send = utils._to_json(payload)
+            to_send = utils._to_json_bytes(payload)
 
         if auth_token is not None:
             headers['Authorization'] = f'Bot {auth_token}'
@@ -133,7 +133,7 @@ class WebhookAdapter:
 
         if payload is not None:
             headers['Content-Type'] = 'application/json; charset=utf-8'
-            to_send = utils._to_json(payload).encode('utf-8')
+            to_send = utils._to_json_bytes(payload)
 
         if auth_token is not None:
             headers['Authorization'] = f'Bot {auth_token}'
@@ -42,6 +42,7 @@ extras_require = {
     ],
     'speed': [
         'orjson>=3.5.4',
+        'zstandard>=0.18',
         'aiodns>=1.1',
         'Brotli',
         'cchardet==2.1.7; python_version < "3.10"',
@@ -0,0 +1,493 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+# Replays a synthetic gateway session through a fake DiscordWebSocket driving a real
+# ConnectionState. Everything runs offline, nothing is sent or received over the network.
+#
+# Usage:
+#
+#     python tests/gateway_benchmark.py --guilds 1000 --messages 50000
+#     python tests/gateway_benchmark.py --json > before.json
+#     python tests/gateway_benchmark.py --listen message --listen typing --lazy-parsing
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import discord
+from discord import utils
+from discord.gateway import DiscordWebSocket, _ZlibDecompressor
+
+
+SELF_ID = 1
+# Used to generate unique snowflakes for everything in the session
+_SNOWFLAKE_BASE = 1_000_000_000_000_000
+
+
+class SessionGenerator:
+    """Generates the payloads of a gateway session in the order Discord would send them."""
+
+    def __init__(
+        self,
+        *,
+        guilds: int = 1000,
+        channels: int = 20,
+        roles: int = 10,
+        members: int = 50,
+        chunk_guilds: int = 100,
+        chunk_size: int = 1000,
+        messages: int = 50000,
+        reactions: int = 20000,
+        presences: int = 50000,
+        typing: int = 10000,
+        seed: int = 0,
+    ) -> None:
+        self.guilds = guilds
+        self.channels = channels
+        self.roles = roles
+        self.members = members
+        self.chunk_guilds = min(chunk_guilds, guilds)
+        self.chunk_size = chunk_size
+        self.messages = messages
+        self.reactions = reactions
+        self.presences = presences
+        self.typing = typing
+        self.random = random.Random(seed)
+        self.sequence = 0
+        self._next_id = _SNOWFLAKE_BASE
+
+    def snowflake(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def guild_id(self, index: int) -> int:
+        return _SNOWFLAKE_BASE // 10 + index
+
+    def channel_id(self, guild: int, index: int) -> int:
+        return guild * 1000 + index
+
+    def role_id(self, guild: int, index: int) -> int:
+        return guild * 1000 + 500 + index
+
+    def user(self, user_id: int) -> Dict[str, Any]:
+        return {'id': str(user_id), 'username': f'user{user_id}', 'discriminator': '0001', 'avatar': None}
+
+    def member(self, guild: int, user_id: int) -> Dict[str, Any]:
+        roles = [str(self.role_id(guild, i)) for i in range(1, self.roles) if (user_id + i) % 3 == 0]
+        return {
+            'user': self.user(user_id),
+            'roles': roles,
+            'joined_at': '2023-01-01T00:00:00+00:00',
+            'deaf': False,
+            'mute': False,
+            'flags': 0,
+        }
+
+    def guild_create(self, index: int) -> Dict[str, Any]:
+        guild_id = self.guild_id(index)
+        roles = [
+            {
+                'id': str(guild_id if i == 0 else self.role_id(guild_id, i)),
+                'name': '@everyone' if i == 0 else f'role {i}',
+                'permissions': str(1071698660929 if i == 0 else 1 << i),
+                'position': i,
+                'color': 0,
+                'hoist': False,
+                'managed': False,
+                'mentionable': False,
+            }
+            for i in range(self.roles)
+        ]
+        channels = [
+            {
+                'id': str(self.channel_id(guild_id, i)),
+                'type': 0,
+                'name': f'channel-{i}',
+                'position': i,
+                'permission_overwrites': [
+                    {'id': str(self.role_id(guild_id, 1)), 'type': 0, 'allow': '1024', 'deny': '2048'},
+                ],
+                'nsfw': False,
+                'topic': None,
+                'parent_id': None,
+                'rate_limit_per_user': 0,
+            }
+            for i in range(self.channels)
+        ]
+        members = [self.member(guild_id, SELF_ID)] + [self.member(guild_id, 10_000 + i) for i in range(self.members)]
+        return {
+            'id': str(guild_id),
+            'name': f'guild {index}',
+            'owner_id': str(SELF_ID),
+            'member_count': self.members + 1,
+            'roles': roles,
+            'channels': channels,
+            'threads': [],
+            'members': members,
+            'presences': [],
+            'voice_states': [],
+            'emojis': [],
+            'stickers': [],
+            'features': [],
+            'large': False,
+        }
+
+    def dispatch(self, event: str, data: Any) -> Dict[str, Any]:
+        self.sequence += 1
+        return {'op': 0, 't': event, 's': self.sequence, 'd': data}
+
+    def ready(self) -> Dict[str, Any]:
+        return self.dispatch(
+            'READY',
+            {
+                'v': 10,
+                'user': self.user(SELF_ID),
+                'guilds': [{'id': str(self.guild_id(i)), 'unavailable': True} for i in range(self.guilds)],
+                'session_id': 'benchmark',
+                'resume_gateway_url': 'wss://gateway.discord.gg',
+                'application': {'id': str(SELF_ID), 'flags': 0},
+            },
+        )
+
+    def members_chunk(self, index: int) -> Dict[str, Any]:
+        guild_id = self.guild_id(index)
+        members = [self.member(guild_id, 100_000 + i) for i in range(self.chunk_size)]
+        return self.dispatch(
+            'GUILD_MEMBERS_CHUNK',
+            {'guild_id': str(guild_id), 'members': members, 'chunk_index': 0, 'chunk_count': 1},
+        )
+
+    def _random_target(self):
+        guild_id = self.guild_id(self.random.randrange(self.guilds))
+        channel_id = self.channel_id(guild_id, self.random.randrange(self.channels))
+        user_id = 10_000 + self.random.randrange(self.members)
+        return guild_id, channel_id, user_id
+
+    def message_create(self) -> Dict[str, Any]:
+        guild_id, channel_id, user_id = self._random_target()
+        message_id = self.snowflake()
+        self._last_messages.append((guild_id, channel_id, message_id))
+        data = {
+            'id': str(message_id),
+            'channel_id': str(channel_id),
+            'guild_id': str(guild_id),
+            'author': self.user(user_id),
+            'member': {k: v for k, v in self.member(guild_id, user_id).items() if k != 'user'},
+            'content': 'hello world ' * self.random.randint(1, 20),
+            'timestamp': '2023-01-01T00:00:00+00:00',
+            'edited_timestamp': None,
+            'tts': False,
+            'mention_everyone': False,
+            'mentions': [],
+            'mention_roles': [],
+            'attachments': [],
+            'embeds': [],
+            'components': [],
+            'pinned': False,
+            'type': 0,
+            'flags': 0,
+        }
+        if self.random.random() < 0.1:
+            data['embeds'] = [{'title': 'embed', 'description': 'description', 'fields': [{'name': 'a', 'value': 'b'}]}]
+        return self.dispatch('MESSAGE_CREATE', data)
+
+    def reaction_add(self) -> Dict[str, Any]:
+        guild_id, channel_id, message_id = self.random.choice(self._last_messages)
+        user_id = 10_000 + self.random.randrange(self.members)
+        return self.dispatch(
+            'MESSAGE_REACTION_ADD',
+            {
+                'user_id': str(user_id),
+                'channel_id': str(channel_id),
+                'message_id': str(message_id),
+                'guild_id': str(guild_id),
+                'member': self.member(guild_id, user_id),
+                'emoji': {'id': None, 'name': '\N{THUMBS UP SIGN}'},
+            },
+        )
+
+    def presence_update(self) -> Dict[str, Any]:
+        guild_id, _, user_id = self._random_target()
+        status = self.random.choice(('online', 'idle', 'dnd', 'offline'))
+        return self.dispatch(
+            'PRESENCE_UPDATE',
+            {
+                'user': {'id': str(user_id)},
+                'guild_id': str(guild_id),
+                'status': status,
+                'activities': [{'name': 'a game', 'type': 0}] if status != 'offline' else [],
+                'client_status': {'desktop': status} if status != 'offline' else {},
+            },
+        )
+
+    def typing_start(self) -> Dict[str, Any]:
+        guild_id, channel_id, user_id = self._random_target()
+        return self.dispatch(
+            'TYPING_START',
+            {
+                'channel_id': str(channel_id),
+                'guild_id': str(guild_id),
+                'user_id': str(user_id),
+                'timestamp': 1672531200,
+                'member': self.member(guild_id, user_id),
+            },
+        )
+
+    def generate(self) -> List[Dict[str, Any]]:
+        self._last_messages = []
+        payloads = [self.ready()]
+        payloads.extend(self.dispatch('GUILD_CREATE', self.guild_create(i)) for i in range(self.guilds))
+        payloads.extend(self.members_chunk(i) for i in range(self.chunk_guilds))
+
+        # The floods are interleaved the way they would be on a busy connection.
+        # Messages come first so that reactions have something to refer to.
+        payloads.append(self.message_create())
+        kinds: List[Callable[[], Dict[str, Any]]] = (
+            [self.message_create] * (self.messages - 1)
+            + [self.reaction_add] * self.reactions
+            + [self.presence_update] * self.presences
+            + [self.typing_start] * self.typing
+        )
+        self.random.shuffle(kinds)
+        payloads.extend(kind() for kind in kinds)
+        return payloads
+
+
+def encode(payloads: List[Dict[str, Any]], *, compress: bool) -> List[bytes]:
+    encoded = [utils._to_json(payload).encode('utf-8') for payload in payloads]
+    if not compress:
+        return encoded
+
+    compressor = zlib.compressobj()
+    return [compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH) for data in encoded]
+
+
+class FakeWebSocket(DiscordWebSocket):
+    """A DiscordWebSocket that is fed payloads directly instead of reading from a socket."""
+
+    def __init__(self, client: discord.Client, *, compress: bool) -> None:
+        super().__init__(None, loop=client.loop)  # type: ignore # There is no socket
+        self.token = None
+        self._connection = client._connection
+        self._discord_parsers = client._connection.parsers
+        self._dispatch = client.dispatch
+        self.call_hooks = client._connection.call_hooks
+        self._initial_identify = True
+        self.shard_id = None
+        self.shard_count = None
+        self._max_heartbeat_timeout = client._connection.heartbeat_timeout
+        self._socket_event_filter = client._socket_event_filter
+        if compress:
+            self._decompressor = _ZlibDecompressor()
+
+    async def send_as_json(self, data: Any) -> None:
+        pass
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of the process in bytes, if known."""
+    if resource is None:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes while macOS reports bytes
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+def percentile(values: List[int], fraction: float) -> int:
+    index = min(len(values) - 1, int(len(values) * fraction))
+    return values[index]
+
+
+class BenchmarkResult:
+    def __init__(self, events: int, elapsed: float, timings: Dict[str, List[int]], rss: Optional[int]) -> None:
+        self.events = events
+        self.elapsed = elapsed
+        self.timings = timings
+        self.peak_rss = rss
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    def parsers(self) -> Dict[str, Dict[str, float]]:
+        """Per parser statistics in microseconds."""
+        result = {}
+        for event, timings in sorted(self.timings.items()):
+            timings = sorted(timings)
+            result[event] = {
+                'count': len(timings),
+                'mean': sum(timings) / len(timings) / 1000,
+                'p50': percentile(timings, 0.50) / 1000,
+                'p90': percentile(timings, 0.90) / 1000,
+                'p99': percentile(timings, 0.99) / 1000,
+                'max': timings[-1] / 1000,
+            }
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'events': self.events,
+            'elapsed': self.elapsed,
+            'events_per_second': self.events_per_second,
+            'peak_rss': self.peak_rss,
+            'parsers': self.parsers(),
+        }
+
+    def format(self) -> str:
+        lines = [
+            f'{self.events} events in {self.elapsed:.3f}s ({self.events_per_second:,.0f} events/sec)',
+            f'peak RSS: {self.peak_rss / 2**20:.1f} MiB' if self.peak_rss is not None else 'peak RSS: unknown',
+            '',
+            f'{"parser":<24} {"count":>8} {"mean":>9} {"p50":>9} {"p90":>9} {"p99":>9} {"max":>10}  (µs)',
+        ]
+        for event, stats in self.parsers().items():
+            lines.append(
+                f'{event:<24} {stats["count"]:>8} {stats["mean"]:>9.1f} {stats["p50"]:>9.1f} '
+                f'{stats["p90"]:>9.1f} {stats["p99"]:>9.1f} {stats["max"]:>10.1f}'
+            )
+        return '\n'.join(lines)
+
+
+async def _noop_listener(*args: Any) -> None:
+    pass
+
+
+async def replay(
+    payloads: List[bytes],
+    *,
+    compress: bool = True,
+    listen: Iterable[str] = (),
+    **options: Any,
+) -> BenchmarkResult:
+    """Feeds the payloads through a fake websocket and measures how long every parser takes.
+
+    ``listen`` are the names of the events to register a no-op listener for,
+    the options are passed to the :class:`discord.Client` that owns the state.
+    """
+    options.setdefault('intents', discord.Intents.all())
+    options.setdefault('chunk_guilds_at_startup', False)
+    client = discord.Client(**options)
+    for event in listen:
+        setattr(client, 'on_' + event, _noop_listener)
+    await client._async_setup_hook()
+    ws = FakeWebSocket(client, compress=compress)
+
+    timings: Dict[str, List[int]] = {}
+    perf_counter_ns = time.perf_counter_ns
+
+    def timed(event: str, func: Callable[[Any], None]) -> Callable[[Any], None]:
+        samples = timings.setdefault(event, [])
+
+        def wrapped(data: Any) -> None:
+            start = perf_counter_ns()
+            func(data)
+            samples.append(perf_counter_ns() - start)
+
+        return wrapped
+
+    ws._discord_parsers = {event: timed(event, func) for event, func in ws._discord_parsers.items()}
+
+    start = time.perf_counter()
+    for index, payload in enumerate(payloads):
+        await ws.received_message(payload)
+        if index % 1000 == 0:
+            # Let the tasks scheduled by dispatch run so they don't pile up
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+
+    ready_task = client._connection._ready_task
+    # asyncio.wait_for swallows the cancellation if a guild was queued at the same time
+    while ready_task is not None and not ready_task.done():
+        ready_task.cancel()
+        await asyncio.sleep(0)
+
+    return BenchmarkResult(len(payloads), elapsed, {k: v for k, v in timings.items() if v}, peak_rss())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Replays a synthetic gateway session to benchmark event parsing.')
+    parser.add_argument('--guilds', type=int, default=1000, help='number of GUILD_CREATEs')
+    parser.add_argument('--channels', type=int, default=20, help='channels per guild')
+    parser.add_argument('--roles', type=int, default=10, help='roles per guild')
+    parser.add_argument('--members', type=int, default=50, help='members sent with every GUILD_CREATE')
+    parser.add_argument('--chunk-guilds', type=int, default=100, help='number of guilds that get a member chunk')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='members in every chunk')
+    parser.add_argument('--messages', type=int, default=50000, help='number of MESSAGE_CREATEs')
+    parser.add_argument('--reactions', type=int, default=20000, help='number of MESSAGE_REACTION_ADDs')
+    parser.add_argument('--presences', type=int, default=50000, help='number of PRESENCE_UPDATEs')
+    parser.add_argument('--typing', type=int, default=10000, help='number of TYPING_STARTs')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random session')
+    parser.add_argument('--no-compress', action='store_true', help='skip zlib-stream compression')
+    parser.add_argument('--max-messages', type=int, default=1000, help='the max_messages client option')
+    parser.add_argument('--lazy-parsing', action='store_true', help='enable the lazy_parsing client option')
+    parser.add_argument('--listen', action='append', default=[], metavar='EVENT', help='register a listener for an event')
+    parser.add_argument('--json', action='store_true', help='output the results as JSON')
+    args = parser.parse_args(argv)
+
+    generator = SessionGenerator(
+        guilds=args.guilds,
+        channels=args.channels,
+        roles=args.roles,
+        members=args.members,
+        chunk_guilds=args.chunk_guilds,
+        chunk_size=args.chunk_size,
+        messages=args.messages,
+        reactions=args.reactions,
+        presences=args.presences,
+        typing=args.typing,
+        seed=args.seed,
+    )
+    compress = not args.no_compress
+    payloads = encode(generator.generate(), compress=compress)
+    result = asyncio.run(
+        replay(
+            payloads,
+            compress=compress,
+            listen=args.listen,
+            max_messages=args.max_messages,
+            lazy_parsing=args.lazy_parsing,
+        )
+    )
+
+    if args.json:
+        print(json.dumps(result.to_dict(), indent=2))
+    else:
+        print(result.format())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any, List
+
+import pytest
+
+import discord
+from discord import utils
+
+
+def make_error() -> discord.NotFound:
+    return discord.NotFound(SimpleNamespace(status=404, reason='Not Found'), {'message': 'Unknown', 'code': 10008})  # type: ignore
+
+
+class FakeHTTP:
+    def __init__(self, concurrency: Any) -> None:
+        self.calls: List[Any] = []
+        self.concurrency = concurrency
+
+    async def _call(self, *args: Any) -> None:
+        self.calls.append(args)
+        await self.concurrency.run()
+
+    async def delete_messages(self, channel_id: int, message_ids: List[int], *, reason: Any = None) -> None:
+        await self._call('bulk', channel_id, len(message_ids))
+
+    async def delete_message(self, channel_id: int, message_id: int, *, reason: Any = None) -> None:
+        await self._call('single', channel_id, message_id)
+        if message_id == 1:
+            raise make_error()
+
+    async def bulk_ban(self, guild_id: int, user_ids: List[int], **kwargs: Any) -> Any:
+        await self._call('ban', len(user_ids))
+        return {'banned_users': [u for u in user_ids if u != 7], 'failed_users': [7]}
+
+    async def add_role(self, guild_id: int, user_id: int, role_id: int, *, reason: Any = None) -> None:
+        await self._call('add', guild_id, user_id, role_id)
+        if user_id == 3 and role_id == 101:
+            raise make_error()
+
+    async def remove_role(self, guild_id: int, user_id: int, role_id: int, *, reason: Any = None) -> None:
+        await self._call('remove', guild_id, user_id, role_id)
+
+
+def make_members(http: FakeHTTP, guilds: List[Any], ids: range) -> List[Any]:
+    state = SimpleNamespace(http=http)
+    return [SimpleNamespace(id=i, guild=guilds[i % len(guilds)], _state=state) for i in ids]
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_messages(concurrency):
+    http = FakeHTTP(concurrency)
+    state = SimpleNamespace(http=http)
+    first = SimpleNamespace(id=10)
+    second = SimpleNamespace(id=20)
+    recent = utils.time_snowflake(utils.utcnow())
+    messages = [SimpleNamespace(id=recent + i, channel=first, _state=state) for i in range(150)]
+    # Too old to be bulk deleted
+    messages += [SimpleNamespace(id=i, channel=first, _state=state) for i in (1, 2)]
+    messages.append(SimpleNamespace(id=recent, channel=second, _state=state))
+
+    results = [result async for result in discord.bulk.delete_messages(messages)]
+    assert len(results) == len(messages)
+    failed = [result for result in results if not result.succeeded]
+    assert [result.item.id for result in failed] == [1]
+    assert isinstance(failed[0].error, discord.NotFound)
+
+    assert sorted(http.calls) == sorted(
+        [('bulk', 10, 100), ('bulk', 10, 50), ('single', 10, 1), ('single', 10, 2), ('single', 20, recent)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_ban_chunks(concurrency):
+    http = FakeHTTP(concurrency)
+    guild = SimpleNamespace(id=1, _state=SimpleNamespace(http=http))
+    users = [discord.Object(id=i) for i in range(450)]
+
+    results = [result async for result in discord.bulk.ban(guild, users)]  # type: ignore
+    assert http.calls == [('ban', 200), ('ban', 200), ('ban', 50)]
+    assert [result.item.id for result in results if not result.succeeded] == [7]
+    assert concurrency.max_active == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_add_roles_concurrency(concurrency):
+    http = FakeHTTP(concurrency)
+    members = make_members(http, [SimpleNamespace(id=1), SimpleNamespace(id=2)], range(20))
+    roles = [discord.Object(id=100), discord.Object(id=101)]
+
+    results = [result async for result in discord.bulk.add_roles(members, *roles, concurrency=2)]  # type: ignore
+    assert len(results) == 20
+    failed = [result for result in results if not result.succeeded]
+    assert [result.item.id for result in failed] == [3]
+    # The other role was still given
+    assert failed[0].applied == [roles[0]]
+    assert all(result.applied == roles for result in results if result.succeeded)
+    # Two guilds with two requests in flight each, one request per role
+    assert concurrency.max_active == 4
+    assert len(http.calls) == 40
+
+    with pytest.raises(ValueError):
+        async for _ in discord.bulk.add_roles(members, *roles, concurrency=0):  # type: ignore
+            pass
+
+
+@pytest.mark.asyncio
+async def test_bulk_remove_roles(concurrency):
+    http = FakeHTTP(concurrency)
+    members = make_members(http, [SimpleNamespace(id=1)], range(10, 12))
+
+    results = [result async for result in discord.bulk.remove_roles(members, discord.Object(id=100))]  # type: ignore
+    assert all(result.succeeded for result in results)
+    assert sorted(http.calls) == [('remove', 1, 10, 100), ('remove', 1, 11, 100)]
+
+
+@pytest.mark.asyncio
+async def test_bulk_stops_when_closed(concurrency):
+    http = FakeHTTP(concurrency)
+    members = make_members(http, [SimpleNamespace(id=1)], range(10, 30))
+
+    async for _ in discord.bulk.add_roles(members, discord.Object(id=100), concurrency=1):  # type: ignore
+        break
+
+    await asyncio.sleep(0.01)
+    assert len(http.calls) < 20
@@ -0,0 +1,165 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import discord
+import pytest
+
+from discord.cache import CompactMemberStore, LRUCacheStore, NoCacheStore, TTLCacheStore
+
+
+def test_lru_cache_store():
+    store = LRUCacheStore(2)
+    store[1] = 'a'
+    store[2] = 'b'
+    assert store[1] == 'a'  # 1 is now the most recently used
+    store[3] = 'c'
+
+    assert 2 not in store
+    assert list(store) == [1, 3]
+    assert list(store.values()) == ['a', 'c']
+    assert store.get(2) is None
+    assert store.pop(1) == 'a'
+    assert len(store) == 1
+
+    with pytest.raises(ValueError):
+        LRUCacheStore(0)
+
+
+def test_ttl_cache_store(monkeypatch):
+    now = 100.0
+    monkeypatch.setattr('discord.cache.time.monotonic', lambda: now)
+
+    store = TTLCacheStore(10, max_size=3)
+    store[1] = 'a'
+    now = 105.0
+    store[2] = 'b'
+    assert store[1] == 'a'
+    assert dict(store.items()) == {1: 'a', 2: 'b'}
+
+    now = 111.0
+    assert 1 not in store
+    assert store.get(2) == 'b'
+    assert len(store) == 1
+
+    store[3] = 'c'
+    store[4] = 'd'
+    store[5] = 'e'
+    assert list(store) == [3, 4, 5]
+
+
+def test_no_cache_store():
+    store = NoCacheStore()
+    store[1] = 'a'
+    assert 1 not in store
+    assert store.get(1) is None
+    assert len(store) == 0
+    assert list(store.values()) == []
+
+
+def test_client_cache_stores():
+    client = discord.Client(
+        intents=discord.Intents.default(),
+        cache_stores={'members': lambda: LRUCacheStore(2), 'users': NoCacheStore},
+    )
+    state = client._connection
+    assert isinstance(state._users, NoCacheStore)
+
+    guild = discord.Guild(data={'id': 1, 'unavailable': True}, state=state)  # type: ignore
+    assert isinstance(guild._members, LRUCacheStore)
+    assert isinstance(guild._channels, dict)
+
+    with pytest.raises(ValueError):
+        discord.Client(intents=discord.Intents.default(), cache_stores={'foo': dict})
+
+    with pytest.raises(TypeError):
+        discord.Client(intents=discord.Intents.default(), cache_stores={'roles': 1})
+
+
+def _member_payload(id: int, **extra):
+    data = {
+        'user': {
+            'id': str(id),
+            'username': f'user{id}',
+            'discriminator': '0',
+            'global_name': None,
+            'avatar': 'a_' + 'ab' * 16 if id % 2 else None,
+            'public_flags': 64,
+        },
+        'roles': [str(r) for r in range(id % 3)],
+        'joined_at': '2021-05-11T07:27:17.123456+00:00',
+        'flags': 2,
+        'nick': None,
+    }
+    data.update(extra)
+    return data
+
+
+def test_compact_member_store():
+    client = discord.Client(intents=discord.Intents.all(), cache_stores={'members': lambda: CompactMemberStore(hot_size=2)})
+    state = client._connection
+    guild = discord.Guild(data={'id': 1, 'unavailable': True}, state=state)  # type: ignore
+    assert isinstance(guild._members, CompactMemberStore)
+
+    originals = {}
+    for id in range(10, 20):
+        member = discord.Member(data=_member_payload(id, nick='nick' if id == 15 else None), guild=guild, state=state)  # type: ignore
+        originals[id] = member
+        guild._add_member(member)
+
+    assert len(guild.members) == 10
+    assert guild.get_member(100) is None
+
+    for id, original in originals.items():
+        member = guild.get_member(id)
+        assert member is not None
+        assert member.guild is guild
+        for attr in ('id', 'name', 'nick', 'joined_at', 'pending', 'bot', 'avatar', 'public_flags', 'flags', 'timed_out_until'):
+            assert getattr(member, attr) == getattr(original, attr), attr
+        assert member._roles == original._roles
+
+    # The working set keeps returning the same instance
+    assert guild.get_member(19) is guild.get_member(19)
+
+    # Updates made to a materialized member survive it being packed again
+    member = guild.get_member(12)
+    member._update({'roles': ['5'], 'nick': 'changed'})  # type: ignore
+    guild.get_member(13)
+    guild.get_member(14)
+    assert 12 not in guild._members._hot
+    member = guild.get_member(12)
+    assert member.nick == 'changed'
+    assert list(member._roles) == [5]
+
+    guild._remove_member(member)
+    assert guild.get_member(12) is None
+    assert sorted(m.id for m in guild.members) == [10, 11, 13, 14, 15, 16, 17, 18, 19]
+
+    # Removing or iterating over members doesn't change the working set
+    hot = list(guild._members._hot)
+    assert guild._members.pop(10).id == 10
+    assert [m.id for m in guild.members][0] == 11
+    assert list(guild._members._hot) == hot
@@ -0,0 +1,230 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+import discord
+from discord.gateway import GatewayRatelimiter
+
+
+class FakeWebSocket:
+    def __init__(self, count: int, per: float) -> None:
+        self._rate_limiter = GatewayRatelimiter(count=count, per=per)
+
+
+def make_client(ws: FakeWebSocket, **options: Any) -> Tuple[discord.Client, List[Tuple[List[int], float]], List[Any]]:
+    client = discord.Client(intents=discord.Intents.all(), **options)
+    state = client._connection
+    state.loop = asyncio.get_running_loop()
+    state._get_websocket = lambda guild_id=None, *, shard_id=None: ws  # type: ignore
+    sent: List[Tuple[List[int], float]] = []
+
+    async def chunker(guild_id: Any, query: str = '', limit: int = 0, presences: bool = False, *, nonce: Optional[str] = None):
+        await ws._rate_limiter.block()
+        sent.append((guild_id, time.monotonic()))
+
+    state.chunker = chunker  # type: ignore
+    progress: List[Any] = []
+    state.dispatch = lambda event, *args: progress.append((event, *args)) if event == 'chunk_progress' else None  # type: ignore
+    return client, sent, progress
+
+
+def add_guild(client: discord.Client, guild_id: int, member_count: int, last_message_id: Optional[int] = None) -> discord.Guild:
+    data: Dict[str, Any] = {'id': str(guild_id), 'name': 'guild', 'member_count': member_count}
+    if last_message_id is not None:
+        data['channels'] = [{'id': str(guild_id + 1), 'type': 0, 'name': 'c', 'position': 0, 'last_message_id': str(last_message_id)}]
+    return client._connection._add_guild_from_data(data)  # type: ignore
+
+
+def complete(client: discord.Client, guild_id: int) -> None:
+    state = client._connection
+    request = state._chunk_requests[guild_id]
+    state.process_chunk_requests(guild_id, request.nonce, [], True)
+
+
+@pytest.mark.asyncio
+async def test_smallest_guilds_are_chunked_first():
+    client, sent, _ = make_client(FakeWebSocket(count=100, per=60.0))
+    guilds = [add_guild(client, guild_id, member_count) for guild_id, member_count in ((1, 500), (2, 10), (3, 5000), (4, 100))]
+    for guild in guilds:
+        client._connection._schedule_chunk(guild)
+
+    await asyncio.sleep(0.01)
+    assert [guild_ids for guild_ids, _ in sent] == [[2, 4, 1, 3]]
+
+
+@pytest.mark.asyncio
+async def test_priority_policies():
+    client, sent, _ = make_client(FakeWebSocket(count=100, per=60.0), chunk_priority='active')
+    guilds = [add_guild(client, guild_id, 10, last_message_id) for guild_id, last_message_id in ((10, 5), (20, 50), (30, 1))]
+    for guild in guilds:
+        client._connection._schedule_chunk(guild)
+    await asyncio.sleep(0.01)
+    assert [guild_ids for guild_ids, _ in sent] == [[20, 10, 30]]
+
+    client, sent, _ = make_client(FakeWebSocket(count=100, per=60.0), chunk_priority=lambda guild: guild.id % 3)
+    for guild_id in (3, 4, 5):
+        client._connection._schedule_chunk(add_guild(client, guild_id, 10))
+    await asyncio.sleep(0.01)
+    assert [guild_ids for guild_ids, _ in sent] == [[3, 4, 5]]
+
+    with pytest.raises(ValueError):
+        discord.Client(intents=discord.Intents.all(), chunk_priority='random')
+
+
+@pytest.mark.asyncio
+async def test_requests_leave_room_in_the_gateway_rate_limit(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(discord.state.ChunkScheduler, 'MAX_GUILDS_PER_REQUEST', 2)
+    ws = FakeWebSocket(count=8, per=0.2)
+    client, sent, _ = make_client(ws)
+    start = time.monotonic()
+    for guild_id in range(1, 9):
+        client._connection._schedule_chunk(add_guild(client, guild_id, guild_id))
+
+    await asyncio.sleep(0.05)
+    # Three commands are sent right away, the rest wait for the window to reset
+    assert [guild_ids for guild_ids, _ in sent] == [[1, 2], [3, 4], [5, 6]]
+    assert ws._rate_limiter.get_remaining() == discord.state.ChunkScheduler.RESERVED_COMMANDS
+
+    await asyncio.sleep(0.3)
+    assert [guild_ids for guild_ids, _ in sent] == [[1, 2], [3, 4], [5, 6], [7, 8]]
+    assert sent[3][1] - start >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_guilds_are_requested_in_batches(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(discord.state.ChunkScheduler, 'MAX_GUILDS_PER_REQUEST', 3)
+    client, sent, _ = make_client(FakeWebSocket(count=100, per=60.0))
+    state = client._connection
+    guilds = [add_guild(client, guild_id, guild_id) for guild_id in range(1, 6)]
+    futures = [state._schedule_chunk(guild) for guild in guilds]
+    await asyncio.sleep(0.01)
+    assert [guild_ids for guild_ids, _ in sent] == [[1, 2, 3], [4, 5]]
+
+    # A nonce is shared by the guilds of a batch only
+    nonces = [state._chunk_requests[guild.id].nonce for guild in guilds]
+    assert len(set(nonces[:3])) == 1
+    assert nonces[3] == nonces[4] != nonces[0]
+
+    # Each guild is resolved as soon as its own chunks arrive
+    user = {'id': '10', 'username': 'user', 'discriminator': '0', 'avatar': None}
+    member = discord.Member(data={'user': user, 'roles': [], 'flags': 0}, guild=guilds[1], state=state)  # type: ignore
+    state.process_chunk_requests(2, nonces[1], [member], False)
+    state.process_chunk_requests(2, nonces[1], [], True)
+    await asyncio.sleep(0)
+    assert [future.done() for future in futures] == [False, True, False, False, False]
+    assert futures[1].result() == [member]
+    assert guilds[1].get_member(10) is member
+
+    for guild_id in (1, 3, 4, 5):
+        complete(client, guild_id)
+    assert await asyncio.gather(*futures) == [[], [member], [], [], []]
+    assert state._chunk_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_chunk_progress_is_dispatched():
+    client, _, progress = make_client(FakeWebSocket(count=100, per=60.0))
+    first = add_guild(client, 1, 10)
+    second = add_guild(client, 2, 20)
+    futures = [client._connection._schedule_chunk(first), client._connection._schedule_chunk(second)]
+    await asyncio.sleep(0.01)
+
+    complete(client, 2)
+    complete(client, 1)
+    await asyncio.gather(*futures)
+    assert progress == [('chunk_progress', second, 1, 2), ('chunk_progress', first, 2, 2)]
+
+    # A later batch is counted on its own
+    progress.clear()
+    third = add_guild(client, 3, 30)
+    future = client._connection._schedule_chunk(third)
+    await asyncio.sleep(0.01)
+    complete(client, 3)
+    assert await future == []
+    # Let the progress callback run
+    await asyncio.sleep(0)
+    assert progress == [('chunk_progress', third, 1, 1)]
+
+
+@pytest.mark.asyncio
+async def test_failed_request_does_not_hang():
+    client, _, progress = make_client(FakeWebSocket(count=100, per=60.0))
+
+    async def chunker(*args: Any, **kwargs: Any) -> None:
+        raise ConnectionResetError('closed')
+
+    client._connection.chunker = chunker  # type: ignore
+    guild = add_guild(client, 1, 10)
+    assert await asyncio.wait_for(client._connection._schedule_chunk(guild), timeout=1) == []
+    assert progress == [('chunk_progress', guild, 1, 1)]
+    assert client._connection._chunk_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_timeout_starts_when_the_request_is_sent(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(discord.state.ChunkScheduler, 'MAX_GUILDS_PER_REQUEST', 1)
+    ws = FakeWebSocket(count=6, per=0.3)
+    client, sent, _ = make_client(ws)
+    state = client._connection
+    state._chunk_timeout = lambda guild: 0.1  # type: ignore
+    first = add_guild(client, 1, 1)
+    second = add_guild(client, 2, 2)
+    futures = [state._schedule_chunk(first), state._schedule_chunk(second)]
+
+    async def answer() -> None:
+        for count, guild_id in enumerate((1, 2), start=1):
+            while len(sent) < count:
+                await asyncio.sleep(0.01)
+            complete(client, guild_id)
+
+    # The second request waits for the rate limit longer than its timeout
+    task = asyncio.create_task(answer())
+    await state._wait_for_chunks(first, futures[0])
+    await state._wait_for_chunks(second, futures[1])
+    await task
+    assert [future.result() for future in futures] == [[], []]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_requests_are_dropped():
+    client, sent, progress = make_client(FakeWebSocket(count=100, per=60.0))
+    state = client._connection
+    guilds = [add_guild(client, guild_id, guild_id) for guild_id in (1, 2)]
+    futures = [state._schedule_chunk(guild) for guild in guilds]
+    futures[1].cancel()
+    await asyncio.sleep(0.01)
+    assert [guild_ids for guild_ids, _ in sent] == [[1]]
+    assert list(state._chunk_requests) == [1]
+
+    complete(client, 1)
+    await asyncio.sleep(0)
+    assert progress == [('chunk_progress', guilds[0], 1, 1)]
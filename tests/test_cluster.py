@@ -0,0 +1,241 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pytest
+
+import discord
+from discord.cluster import _ClusterCoordinator, _split_shards
+
+
+class FakeGuild:
+    def __init__(self, id: int, shard_count: int) -> None:
+        self.id = id
+        self.name = f'guild {id}'
+        self.member_count = 10
+        self.shard_id = (id >> 22) % shard_count
+
+
+class FakeClient:
+    def __init__(self, guilds: List[FakeGuild]) -> None:
+        self.guilds = guilds
+        self.presences: List[Tuple[Any, Any]] = []
+        self._connection = None
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:
+        return discord.utils.get(self.guilds, id=guild_id)
+
+    async def change_presence(self, *, activity: Any = None, status: Any = None) -> None:
+        self.presences.append((activity, status))
+
+
+SHARD_COUNT = 4
+CLUSTERS = _split_shards(SHARD_COUNT, 2)
+
+
+def guild_on_shard(shard_id: int) -> int:
+    return shard_id << 22
+
+
+@contextlib.asynccontextmanager
+async def start_cluster() -> AsyncIterator[Tuple[_ClusterCoordinator, List[discord.ClusterConnection], List[FakeClient]]]:
+    path = os.path.join(tempfile.mkdtemp(), 'cluster.sock')
+    coordinator = _ClusterCoordinator(path, max_concurrency=1)
+    await coordinator.start()
+
+    clients = [
+        FakeClient([FakeGuild(guild_on_shard(shard_id), SHARD_COUNT) for shard_id in shard_ids]) for shard_ids in CLUSTERS
+    ]
+    connections = [
+        discord.ClusterConnection(client, path, cluster_id=cluster_id, clusters=CLUSTERS, shard_count=SHARD_COUNT)  # type: ignore
+        for cluster_id, client in enumerate(clients)
+    ]
+    for connection in connections:
+        await connection.connect()
+    # Let the coordinator read the hellos
+    await asyncio.sleep(0.05)
+
+    yield coordinator, connections, clients
+
+    for connection in connections:
+        await connection.close()
+    await coordinator.close()
+
+
+def test_split_shards():
+    assert _split_shards(4, 2) == [[0, 1], [2, 3]]
+    assert _split_shards(5, 2) == [[0, 1, 2], [3, 4]]
+    assert _split_shards(3, 3) == [[0], [1], [2]]
+
+
+def test_cluster_validates_options():
+    with pytest.raises(ValueError):
+        discord.ShardCluster(discord.AutoShardedClient, clusters=0)
+    with pytest.raises(ValueError):
+        discord.ShardCluster(discord.AutoShardedClient, clusters=4, shard_count=2)
+
+
+class FakeGatewayHTTP:
+    def __init__(self, loop: Any) -> None:
+        pass
+
+    async def static_login(self, token: str) -> None:
+        pass
+
+    async def get_bot_gateway_info(self) -> Tuple[int, str, Dict[str, Any]]:
+        return 4, 'wss://gateway', {'remaining': 1, 'reset_after': 1000, 'max_concurrency': 1}
+
+    async def close(self) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_saved_sessions_do_not_need_session_starts(monkeypatch, tmp_path):
+    monkeypatch.setattr(discord.cluster, 'HTTPClient', FakeGatewayHTTP)
+    store = discord.FileSessionStore(str(tmp_path / 'sessions.json'))
+    cluster = discord.ShardCluster(discord.AutoShardedClient, clusters=2, session_store=store)
+    with pytest.raises(discord.SessionStartLimitReached):
+        await cluster._fetch_gateway_info('token')
+
+    for shard_id in (0, 1, 2):
+        await store.save(shard_id, discord.GatewaySession(f'session {shard_id}', 1, 'wss://resume'))
+    assert await cluster._fetch_gateway_info('token') == {'shard_count': 4, 'max_concurrency': 1}
+
+
+@pytest.mark.asyncio
+async def test_guild_count():
+    async with start_cluster() as (_, connections, _):
+        assert await connections[0].guild_count() == SHARD_COUNT
+        assert await connections[1].guild_count() == SHARD_COUNT
+
+
+@pytest.mark.asyncio
+async def test_fetch_guild_from_other_cluster():
+    async with start_cluster() as (_, connections, _):
+        guild_id = guild_on_shard(3)
+        assert connections[0].cluster_for(guild_id) == 1
+
+        guild = await connections[0].fetch_guild(guild_id)
+        assert guild == {'id': guild_id, 'name': f'guild {guild_id}', 'member_count': 10, 'shard_id': 3, 'cluster_id': 1}
+        assert await connections[0].fetch_guild(guild_on_shard(3) + SHARD_COUNT * 2) is None
+
+
+@pytest.mark.asyncio
+async def test_broadcast_presence():
+    async with start_cluster() as (_, connections, clients):
+        await connections[1].change_presence(status=discord.Status.idle)
+        for client in clients:
+            assert client.presences == [(None, discord.Status.idle)]
+
+
+@pytest.mark.asyncio
+async def test_custom_handler():
+    async with start_cluster() as (_, connections, _):
+
+        for connection in connections:
+
+            @connection.handler('double')
+            async def double(value: int, connection: discord.ClusterConnection = connection) -> int:
+                return value * 2 + connection.cluster_id
+
+        assert await connections[0].request('double', value=4) == {0: 8, 1: 9}
+        assert await connections[0].request('double', cluster_id=1, value=4) == {1: 9}
+
+        with pytest.raises(discord.ClientException):
+            await connections[0].request('missing')
+
+        with pytest.raises(TypeError):
+            connections[0].handler('sync')(lambda: None)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_disconnected_cluster_fails_requests():
+    async with start_cluster() as (_, connections, _):
+        await connections[1].close()
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(discord.ClientException):
+            await connections[0].request('guild_count', cluster_id=1)
+        assert await connections[0].guild_count() == 2
+
+
+@pytest.mark.asyncio
+async def test_identify_is_spaced_across_clusters(monkeypatch):
+    async with start_cluster() as (coordinator, connections, _):
+        monkeypatch.setattr(_ClusterCoordinator, 'IDENTIFY_INTERVAL', 0.2)
+
+        times: Dict[int, float] = {}
+
+        async def identify(connection: discord.ClusterConnection, shard_id: int) -> None:
+            await connection.acquire_identify(shard_id)
+            times[shard_id] = time.monotonic()
+
+        start = time.monotonic()
+        await asyncio.gather(identify(connections[0], 0), identify(connections[1], 2), identify(connections[1], 3))
+        spaced = sorted(times.values())
+        assert spaced[0] - start < 0.1
+        assert spaced[1] - spaced[0] >= 0.15
+        assert spaced[2] - spaced[1] >= 0.15
+
+        # Shards in different buckets may IDENTIFY at the same time
+        coordinator.max_concurrency = 2
+        coordinator._identify_at.clear()
+        times.clear()
+        await asyncio.gather(identify(connections[0], 0), identify(connections[0], 1))
+        assert abs(times[0] - times[1]) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_client_identifies_through_cluster():
+    client = discord.AutoShardedClient(intents=discord.Intents.none(), shard_ids=[2], shard_count=4)
+    acquired: List[int] = []
+    hooks: List[Tuple[Optional[int], bool]] = []
+
+    class Connection:
+        async def acquire_identify(self, shard_id: int) -> None:
+            acquired.append(shard_id)
+
+    async def before_identify_hook(shard_id: Optional[int], *, initial: bool = False) -> None:
+        hooks.append((shard_id, initial))
+
+    client.cluster = Connection()  # type: ignore
+    client.before_identify_hook = before_identify_hook  # type: ignore
+    await client._call_before_identify_hook(2, initial=False)
+
+    assert acquired == [2]
+    assert hooks == [(2, False)]
+
+    # The default hook only sleeps, the launcher already did the waiting
+    del client.before_identify_hook
+    await asyncio.wait_for(client._call_before_identify_hook(2, initial=False), timeout=1)
+    assert acquired == [2, 2]
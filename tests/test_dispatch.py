@@ -0,0 +1,70 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import discord
+from discord.ext import commands
+
+
+def test_client_has_consumer():
+    client = discord.Client(intents=discord.Intents.default())
+    state = client._connection
+
+    assert not client._has_consumer('typing')
+    assert not state._should_parse('TYPING_START', {'guild_id': '1'})
+    # Events that maintain the cache are always parsed
+    assert state._should_parse('GUILD_MEMBER_UPDATE', {})
+    assert state._should_parse('GUILD_BAN_REMOVE', {})
+    # Typing in a DM updates the recipient of the channel
+    assert state._should_parse('TYPING_START', {'channel_id': '1'})
+
+    @client.event
+    async def on_typing(channel, user, when):
+        pass
+
+    assert client._has_consumer('typing')
+    assert state._should_parse('TYPING_START', {'guild_id': '1'})
+
+    client._listeners['invite_create'] = []
+    assert state._should_parse('INVITE_CREATE', {})
+
+
+def test_bot_has_consumer():
+    bot = commands.Bot(command_prefix='!', intents=discord.Intents.default())
+    state = bot._connection
+
+    # Bot listens to messages to process commands
+    assert bot._has_consumer('message')
+    assert not state._should_parse('INVITE_CREATE', {})
+
+    async def on_invite_create(invite):
+        pass
+
+    bot.add_listener(on_invite_create)
+    assert state._should_parse('INVITE_CREATE', {})
+
+    bot.remove_listener(on_invite_create)
+    assert not state._should_parse('INVITE_CREATE', {})
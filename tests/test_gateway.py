@@ -0,0 +1,95 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import zlib
+
+import pytest
+
+import discord
+from discord import utils
+from discord.gateway import DiscordWebSocket, _ZlibDecompressor, _ZstdDecompressor
+
+
+PAYLOAD = utils._to_json({'op': 0, 't': 'MESSAGE_CREATE', 's': 1, 'd': {'content': 'héllo' * 1000}}).encode('utf-8')
+
+
+def test_zlib_decompressor():
+    compressor = zlib.compressobj()
+    decompressor = _ZlibDecompressor()
+
+    data = compressor.compress(PAYLOAD) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    assert decompressor.decompress(data) == PAYLOAD
+
+    # A payload split across several messages is only returned once complete
+    data = compressor.compress(PAYLOAD) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    assert decompressor.decompress(data[:10]) is None
+    assert decompressor.decompress(data[10:20]) is None
+    result = decompressor.decompress(data[20:])
+    assert result == PAYLOAD
+    assert not decompressor.buffer
+
+    assert utils._from_json(result)['d']['content'].startswith('héllo')
+
+
+def test_zstd_decompressor():
+    zstandard = pytest.importorskip('zstandard')
+    compressor = zstandard.ZstdCompressor().compressobj()
+    decompressor = _ZstdDecompressor()
+
+    for _ in range(2):
+        data = compressor.compress(PAYLOAD) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        assert decompressor.decompress(data) == PAYLOAD
+
+
+class FakeWebSocket(DiscordWebSocket):
+    def __init__(self, **filters) -> None:
+        super().__init__(None, loop=None)  # type: ignore
+        self._socket_event_filter = {key.encode(): value for key, value in filters.items()}
+
+
+def test_socket_event_filter():
+    received = []
+    ws = FakeWebSocket(MESSAGE_CREATE=received.append)
+
+    assert ws._forward_raw_event(PAYLOAD)
+    assert received == [PAYLOAD]
+    assert ws.sequence == 1
+
+    # Events that are not filtered, or whose header can't be read, are decoded as usual
+    other = utils._to_json({'op': 0, 't': 'TYPING_START', 's': 2, 'd': {}}).encode('utf-8')
+    assert not ws._forward_raw_event(other)
+    reordered = utils._to_json({'d': {'t': 'MESSAGE_CREATE'}, 'op': 0, 't': 'MESSAGE_CREATE', 's': 3})
+    assert not ws._forward_raw_event(reordered)
+    assert ws.sequence == 1
+
+
+def test_socket_event_filter_validation():
+    with pytest.raises(ValueError):
+        discord.Client(intents=discord.Intents.default(), socket_event_filter={'READY': print})
+
+    with pytest.raises(TypeError):
+        discord.Client(intents=discord.Intents.default(), socket_event_filter={'MESSAGE_CREATE': 1})
@@ -0,0 +1,55 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import pytest
+
+from gateway_benchmark import SessionGenerator, encode, replay
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('compress', [True, False])
+async def test_gateway_benchmark_replay(compress: bool):
+    generator = SessionGenerator(
+        guilds=3,
+        members=5,
+        chunk_guilds=1,
+        chunk_size=10,
+        messages=20,
+        reactions=10,
+        presences=10,
+        typing=5,
+    )
+    payloads = encode(generator.generate(), compress=compress)
+    result = await replay(payloads, compress=compress, listen=['typing'])
+
+    assert result.events == len(payloads) == 1 + 3 + 1 + 20 + 10 + 10 + 5
+    parsers = result.parsers()
+    assert parsers['GUILD_CREATE']['count'] == 3
+    assert parsers['MESSAGE_CREATE']['count'] == 20
+    assert parsers['TYPING_START']['count'] == 5
+    assert result.events_per_second > 0
+    assert 'events/sec' in result.format()
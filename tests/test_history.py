@@ -0,0 +1,98 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from discord.abc import Messageable
+
+
+class FakeHTTP:
+    def __init__(self, ids: List[int], concurrency: Any) -> None:
+        self.ids = sorted(ids)
+        self.requests = 0
+        self.concurrency = concurrency
+
+    async def logs_from(
+        self, channel_id: int, limit: int, before: Optional[int] = None, after: Optional[int] = None, around: Any = None
+    ) -> List[Dict[str, Any]]:
+        self.requests += 1
+        await self.concurrency.run()
+        if after is not None:
+            found = [i for i in self.ids if i > after][:limit]
+        else:
+            found = [i for i in self.ids if before is None or i < before][-limit:]
+        return [{'id': str(i)} for i in reversed(found)]
+
+
+class FakeChannel(Messageable):
+    def __init__(self, http: FakeHTTP) -> None:
+        self.id = 1
+        self._state = SimpleNamespace(http=http, create_message=lambda channel, data: int(data['id']))  # type: ignore
+
+    async def _get_channel(self) -> Any:
+        return self
+
+
+@pytest.mark.asyncio
+async def test_history_prefetch(concurrency):
+    channel = FakeChannel(FakeHTTP(list(range(2, 1000)), concurrency))
+    expected = [m async for m in channel.history(limit=None)]
+    assert expected == list(range(999, 1, -1))
+    assert [m async for m in channel.history(limit=None, prefetch=3)] == expected
+    assert len([m async for m in channel.history(limit=250, prefetch=2)]) == 250
+
+
+@pytest.mark.asyncio
+async def test_history_parallel(concurrency):
+    ids = list(range(10, 100_000, 37))
+    http = FakeHTTP(ids, concurrency)
+    channel = FakeChannel(http)
+
+    messages = [m async for m in channel.history_parallel(before=SimpleNamespace(id=100_000), workers=4)]  # type: ignore
+    assert messages == ids
+    assert concurrency.max_active == 4
+
+    unordered = [m async for m in channel.history_parallel(before=SimpleNamespace(id=100_000), workers=3, ordered=False)]  # type: ignore
+    assert sorted(unordered) == ids
+
+    # The bounds are exclusive
+    window = [
+        m
+        async for m in channel.history_parallel(after=SimpleNamespace(id=47), before=SimpleNamespace(id=47 + 37 * 5), workers=3)  # type: ignore
+    ]
+    assert window == [47 + 37 * i for i in range(1, 5)]
+
+    # The starter message of a forum post has the ID of the thread
+    channel = FakeChannel(FakeHTTP([1, 5, 9], concurrency))
+    assert [m async for m in channel.history_parallel(before=SimpleNamespace(id=10), workers=2)] == [1, 5, 9]  # type: ignore
+
+    with pytest.raises(ValueError):
+        async for _ in channel.history_parallel(workers=0):
+            pass
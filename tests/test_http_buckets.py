@@ -0,0 +1,77 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from discord.http import HTTPClient, Ratelimit
+
+
+@pytest.mark.asyncio
+async def test_inactive_buckets_are_evicted_incrementally():
+    http = HTTPClient(asyncio.get_running_loop())
+    for i in range(20):
+        http.get_ratelimit(f'bucket:{i}')
+
+    assert http.bucket_stats() == (20, 0, 0)
+    assert len(http._bucket_expiry) == 20
+
+    # Make every bucket idle for long enough, except for one that is still in use
+    idle = Ratelimit.INACTIVE_AFTER + 1
+    for ratelimit in http._buckets.values():
+        ratelimit._last_request -= idle
+    http._bucket_expiry = [(deadline - idle, key) for deadline, key in http._bucket_expiry]
+    http._buckets['bucket:0'].outgoing = 1
+
+    # Each lookup only evicts a bounded number of buckets
+    http.get_ratelimit('bucket:5')
+    assert 0 < http.evicted_buckets < 20
+
+    for _ in range(5):
+        http.get_ratelimit('other')
+
+    stats = http.bucket_stats()
+    assert stats.evicted_buckets == 19
+    # The looked up bucket was recreated after being evicted
+    assert set(http._buckets) == {'bucket:0', 'bucket:5', 'other'}
+    # The busy bucket is rescheduled instead of evicted
+    assert http._bucket_expiry_keys == {'bucket:0', 'bucket:5', 'other'}
+    assert len(http._bucket_expiry) == 3
+
+
+@pytest.mark.asyncio
+async def test_recently_used_bucket_is_rescheduled():
+    http = HTTPClient(asyncio.get_running_loop())
+    ratelimit = http.get_ratelimit('bucket')
+    deadline, _ = http._bucket_expiry[0]
+
+    # Used again after it was scheduled, so its entry is stale by the time it's looked at
+    ratelimit._last_request += 100
+    http._evict_inactive_ratelimits(deadline)
+    assert http._buckets == {'bucket': ratelimit}
+    assert http._bucket_expiry == [(ratelimit._last_request + Ratelimit.INACTIVE_AFTER, 'bucket')]
@@ -0,0 +1,159 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, List
+
+import pytest
+
+from discord.enums import RequestPriority
+from discord.http import HTTPClient, Route
+from discord.state import ConnectionState
+
+
+class FakeHTTPClient(HTTPClient):
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(asyncio.get_running_loop(), **kwargs)
+        self.requests: List[Route] = []
+
+    async def _request(self, route: Route, **kwargs: Any) -> Any:
+        self.requests.append(route)
+        await asyncio.sleep(0.01)
+        if route.method != 'GET':
+            return None
+        return {'id': route.url.rsplit('/', 1)[-1], 'roles': []}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_are_coalesced():
+    http = FakeHTTPClient()
+    route = lambda: Route('GET', '/users/{user_id}', user_id=123456789012345678)
+
+    results = await asyncio.gather(*(http.request(route()) for _ in range(5)))
+    assert len(http.requests) == 1
+    assert all(result == {'id': '123456789012345678', 'roles': []} for result in results)
+    # Each caller can mutate its response without affecting the others
+    assert len({id(result) for result in results}) == 5
+    assert not http._inflight_requests
+
+    # Different parameters are different requests
+    await asyncio.gather(
+        http.request(route(), params={'limit': 1}),
+        http.request(route(), params={'limit': 2}),
+    )
+    assert len(http.requests) == 3
+
+    # Without a TTL nothing is cached
+    await http.request(route())
+    assert len(http.requests) == 4
+
+    # Neither are requests with different priorities or caller specific options
+    await asyncio.gather(
+        http.request(route()),
+        http.request(route(), priority=RequestPriority.high),
+        http.request(route(), reason='audit'),
+    )
+    assert len(http.requests) == 7
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    http = FakeHTTPClient()
+    route = Route('GET', '/channels/{channel_id}', channel_id=123456789012345678)
+
+    first = asyncio.ensure_future(http.request(route))
+    second = asyncio.ensure_future(http.request(route))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert (await second)['id'] == '123456789012345678'
+    assert len(http.requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_ttl_and_invalidation():
+    http = FakeHTTPClient(response_cache_ttls={'GET /guilds/{guild_id}/members/{member_id}': 60.0})
+    route = lambda: Route('GET', '/guilds/{guild_id}/members/{member_id}', guild_id=111111111111111111, member_id=222222222222222222)
+
+    data = await http.request(route())
+    data['roles'].append('mutated')
+    assert await http.request(route()) == {'id': '222222222222222222', 'roles': []}
+    assert len(http.requests) == 1
+
+    # Routes without a TTL are not cached
+    await http.request(Route('GET', '/users/{user_id}', user_id=222222222222222222))
+    await http.request(Route('GET', '/users/{user_id}', user_id=222222222222222222))
+    assert len(http.requests) == 3
+
+    # Modifying the member drops its cached response
+    await http.request(
+        Route('PATCH', '/guilds/{guild_id}/members/{member_id}', guild_id=111111111111111111, member_id=222222222222222222),
+        json={'nick': 'x'},
+    )
+    await http.request(route())
+    assert len(http.requests) == 5
+
+    # So does a gateway event about it
+    state = ConnectionState(dispatch=None, handlers={}, hooks={}, http=http)  # type: ignore
+    state._invalidate_cached_responses('GUILD_MEMBER_UPDATE', {'guild_id': '111111111111111111', 'user': {'id': '3'}})
+    await http.request(route())
+    assert len(http.requests) == 5
+
+    state._invalidate_cached_responses('GUILD_MEMBER_UPDATE', {'user': {'id': '222222222222222222'}})
+    assert not http._response_cache
+    assert not http._response_cache_index
+    await http.request(route())
+    assert len(http.requests) == 6
+
+    # Expired responses are fetched again
+    http.response_cache_ttls['GET /guilds/{guild_id}/members/{member_id}'] = 0.0
+    http.invalidate_cached_responses([111111111111111111])
+    await http.request(route())
+    await http.request(route())
+    assert len(http.requests) == 8
+
+
+@pytest.mark.asyncio
+async def test_response_cache_max_size():
+    http = FakeHTTPClient(response_cache_ttls={'GET /users/{user_id}': 60.0}, response_cache_max_size=3)
+    route = lambda user_id: Route('GET', '/users/{user_id}', user_id=user_id)
+
+    user_ids = [222222222222222220 + i for i in range(5)]
+    for user_id in user_ids:
+        await http.request(route(user_id))
+    # The responses closest to expiring are dropped first
+    assert sorted(http._response_cache) == [route(user_id).url for user_id in user_ids[2:]]
+    assert sorted(http._response_cache_index) == user_ids[2:]
+
+    # Stale expiry entries of replaced responses don't pile up
+    for _ in range(10):
+        http.invalidate_cached_responses([user_ids[-1]])
+        await http.request(route(user_ids[-1]))
+    assert len(http._response_cache) == 3
+    assert len(http._response_cache_expiry) < 6
+
+    with pytest.raises(ValueError):
+        FakeHTTPClient(response_cache_max_size=0)
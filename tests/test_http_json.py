@@ -0,0 +1,87 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, List
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from discord import utils
+from discord.http import HTTPClient, Route
+
+
+class RecordingCodec:
+    def __init__(self) -> None:
+        self.decoded: List[Any] = []
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    def decode(self, data: bytes) -> Any:
+        self.decoded.append(data)
+        return json.loads(data)
+
+
+def test_to_json_bytes():
+    payload = {'content': 'héllo', 'nonce': 1}
+    assert isinstance(utils._to_json_bytes(payload), bytes)
+    assert utils._from_json(utils._to_json_bytes(payload)) == payload
+
+
+@pytest.mark.asyncio
+async def test_json_codec(monkeypatch):
+    async def fake_discord(request: web.Request) -> web.Response:
+        if request.path.endswith('/text'):
+            return web.Response(body='not json é'.encode(), headers={'Content-Type': 'text/plain'})
+        body = await request.read() if request.can_read_body else b'{"id": "1"}'
+        return web.Response(body=body, headers={'Content-Type': 'application/json'})
+
+    app = web.Application()
+    app.router.add_route('*', '/{path:.*}', fake_discord)
+    codec = RecordingCodec()
+    async with TestServer(app) as server:
+        monkeypatch.setattr(Route, 'BASE', str(server.make_url('/api/v10')))
+        http = HTTPClient(asyncio.get_running_loop(), json_codec=codec)
+        await http.static_login('token')
+        try:
+            data = await http.request(Route('POST', '/channels/{channel_id}/messages', channel_id=1), json={'content': 'hi'})
+            text = await http.request(Route('GET', '/text'))
+        finally:
+            await http.close()
+
+    assert data == {'content': 'hi'}
+    assert text == 'not json é'
+    # The codec receives the raw bodies
+    assert codec.decoded[-1] == b'{"content": "hi"}'
+
+
+def test_invalid_json_codec():
+    with pytest.raises(TypeError):
+        HTTPClient(None, json_codec=object())  # type: ignore
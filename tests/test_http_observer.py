@@ -0,0 +1,140 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, List, Tuple
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import discord
+from discord.http import HTTPClient, Route
+
+
+class RecordingObserver(discord.RateLimitObserver):
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, Any]] = []
+
+    def on_request_start(self, route: str, bucket: str) -> None:
+        self.events.append(('start', route))
+
+    def on_request_end(self, route: str, bucket: str, status: Any, duration: float) -> None:
+        assert duration >= 0
+        self.events.append(('end', status))
+
+    def on_bucket_discovered(self, route: str, bucket_hash: str, previous_hash: Any) -> None:
+        self.events.append(('bucket', bucket_hash, previous_hash))
+
+    def on_preemptive_sleep(self, bucket: str, delay: float) -> None:
+        self.events.append(('sleep', bucket))
+
+    def on_rate_limited(self, route: str, bucket: str, retry_after: float, **kwargs: Any) -> None:
+        self.events.append(('429', kwargs))
+
+    def on_retry(self, route: str, bucket: str, attempt: int, delay: float, reason: str) -> None:
+        self.events.append(('retry', attempt, reason))
+        raise RuntimeError('observer errors are ignored')
+
+
+@pytest.mark.asyncio
+async def test_observer_and_snapshot(monkeypatch):
+    calls = 0
+
+    async def fake_discord(request: web.Request) -> web.Response:
+        nonlocal calls
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Ratelimit-Bucket': 'abc',
+            'X-Ratelimit-Limit': '5',
+            'X-Ratelimit-Reset-After': '0.05',
+        }
+        if request.path.endswith('/users/@me'):
+            body = {'id': '1', 'username': 'bot', 'discriminator': '0000', 'avatar': None}
+            return web.Response(body=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+
+        calls += 1
+        if calls == 1:
+            headers.update({'Via': '1.1 google', 'X-Ratelimit-Remaining': '0', 'X-RateLimit-Scope': 'user'})
+            body = {'message': 'You are being rate limited.', 'retry_after': 0.01, 'global': False}
+            return web.Response(status=429, body=json.dumps(body).encode(), headers=headers)
+
+        headers['X-Ratelimit-Remaining'] = '0'
+        return web.Response(body=b'{"id": "1"}', headers=headers)
+
+    app = web.Application()
+    app.router.add_route('*', '/{path:.*}', fake_discord)
+    observer = RecordingObserver()
+    async with TestServer(app) as server:
+        monkeypatch.setattr(Route, 'BASE', str(server.make_url('/api/v10')))
+        http = HTTPClient(asyncio.get_running_loop(), ratelimit_observer=observer)
+        await http.static_login('token')
+        try:
+            assert await http.request(Route('GET', '/channels/{channel_id}', channel_id=1)) == {'id': '1'}
+            snapshot = http.get_ratelimit_snapshot()
+        finally:
+            await http.close()
+
+    route_events = observer.events[2:]
+    assert route_events[0] == ('start', 'GET /channels/{channel_id}')
+    assert route_events[1] == ('end', 429)
+    assert route_events[2] == ('bucket', 'abc', None)
+    # The new bucket had no requests remaining, so this isn't a sub-ratelimit
+    assert route_events[3] == ('429', {'is_global': False, 'sub_ratelimit': False, 'scope': 'user'})
+    assert route_events[4] == ('retry', 1, 'rate_limited')
+    assert route_events[5:] == [('start', 'GET /channels/{channel_id}'), ('end', 200), ('sleep', 'abc1')]
+
+    # The exhausted bucket was slept on before the request returned, so it has been reset
+    bucket = snapshot['abc1']
+    assert bucket == (5, 5, 0, 0, None)
+
+
+@pytest.mark.asyncio
+async def test_observer_sees_failed_requests(monkeypatch):
+    async def slow_discord(request: web.Request) -> web.Response:
+        if request.path.endswith('/users/@me'):
+            body = {'id': '1', 'username': 'bot', 'discriminator': '0000', 'avatar': None}
+            return web.Response(body=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+        await asyncio.sleep(1)
+        return web.Response(body=b'{}')
+
+    app = web.Application()
+    app.router.add_route('*', '/{path:.*}', slow_discord)
+    observer = RecordingObserver()
+    async with TestServer(app) as server:
+        monkeypatch.setattr(Route, 'BASE', str(server.make_url('/api/v10')))
+        http = HTTPClient(asyncio.get_running_loop(), ratelimit_observer=observer)
+        await http.static_login('token')
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(http.request(Route('GET', '/channels/{channel_id}', channel_id=1)), timeout=0.1)
+        finally:
+            await http.close()
+
+    # The cancelled request still ends
+    assert observer.events[2:] == [('start', 'GET /channels/{channel_id}'), ('end', None)]
@@ -0,0 +1,137 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+import discord
+from discord.enums import RequestPriority
+from discord.http import HTTPClient, Ratelimit, _PendingRequests
+from discord.ratelimits import _request_priority
+
+
+@pytest.mark.asyncio
+async def test_pending_requests_weighted_order():
+    loop = asyncio.get_running_loop()
+    queue = _PendingRequests()
+    futures = {}
+    for priority in (RequestPriority.low, RequestPriority.high):
+        for i in range(20):
+            future = loop.create_future()
+            futures[future] = priority
+            queue.append(future, priority)
+
+    assert len(queue) == 40
+    order = [futures[queue.popleft()] for _ in range(17)]
+    # High priority requests overtake but low priority ones aren't starved
+    assert order[0] is RequestPriority.high
+    assert order.count(RequestPriority.low) == 1
+
+    # Cancelled requests are skipped
+    queue = _PendingRequests()
+    cancelled = loop.create_future()
+    cancelled.cancel()
+    queue.append(cancelled, RequestPriority.high)
+    assert not queue
+    with pytest.raises(IndexError):
+        queue.popleft()
+
+
+@pytest.mark.asyncio
+async def test_ratelimit_wakes_higher_priority_first():
+    ratelimit = Ratelimit(None)
+    ratelimit.remaining = 0
+    order: List[RequestPriority] = []
+
+    async def acquire(priority: RequestPriority) -> None:
+        await ratelimit.acquire(priority)
+        order.append(priority)
+
+    tasks = [asyncio.ensure_future(acquire(RequestPriority.low)) for _ in range(5)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.ensure_future(acquire(RequestPriority.high)))
+    await asyncio.sleep(0)
+    assert len(ratelimit._pending_requests) == 6
+
+    ratelimit.remaining = 2
+    ratelimit._wake(2)
+    await asyncio.sleep(0)
+    assert order == [RequestPriority.high, RequestPriority.low]
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_global_ratelimit_releases_by_priority():
+    http = HTTPClient(asyncio.get_running_loop())
+    order: List[RequestPriority] = []
+
+    async def wait(priority: RequestPriority) -> None:
+        await http._wait_global_ratelimit(priority)
+        order.append(priority)
+
+    http._global_over = asyncio.Event()
+    tasks = [asyncio.ensure_future(wait(p)) for p in (RequestPriority.low, RequestPriority.normal, RequestPriority.high)]
+    await asyncio.sleep(0)
+    http._global_over.set()
+    http._release_next_global_waiter()
+    # The waiters are released one at a time
+    await asyncio.sleep(0)
+    assert order == [RequestPriority.high]
+    await asyncio.gather(*tasks)
+    assert order == [RequestPriority.high, RequestPriority.normal, RequestPriority.low]
+
+
+@pytest.mark.asyncio
+async def test_pending_requests_len_drops_cancelled():
+    loop = asyncio.get_running_loop()
+    queue = _PendingRequests()
+    futures = [loop.create_future() for _ in range(3)]
+    for future in futures:
+        queue.append(future, RequestPriority.normal)
+
+    futures[1].cancel()
+    assert len(queue) == 2
+    assert list(queue._lanes[RequestPriority.normal]) == [futures[0], futures[2]]
+
+
+def test_request_priority_context_manager():
+    assert _request_priority.get() is RequestPriority.normal
+    with discord.request_priority(discord.RequestPriority.low):
+        assert _request_priority.get() is RequestPriority.low
+        with discord.request_priority(discord.RequestPriority.high):
+            assert _request_priority.get() is RequestPriority.high
+        assert _request_priority.get() is RequestPriority.low
+    assert _request_priority.get() is RequestPriority.normal
+
+    with pytest.raises(TypeError):
+        with discord.request_priority(2):  # type: ignore
+            pass
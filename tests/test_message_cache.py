@@ -0,0 +1,157 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from discord.state import MessageCache
+
+
+def make_message(id: int, guild_id: int | None = None, channel_id: int = 0):
+    guild = SimpleNamespace(id=guild_id) if guild_id is not None else None
+    return SimpleNamespace(id=id, guild=guild, channel=SimpleNamespace(id=channel_id))
+
+
+def test_message_cache_lookup():
+    cache = MessageCache(10)
+    messages = [make_message(i, guild_id=1) for i in range(5)]
+    for message in messages:
+        cache.append(message)
+
+    assert len(cache) == 5
+    assert cache.get(3) is messages[3]
+    assert cache.get(42) is None
+    assert messages[0] in cache
+    assert list(cache) == messages
+    assert list(reversed(cache)) == messages[::-1]
+
+
+def test_message_cache_eviction_is_fifo():
+    cache = MessageCache(3)
+    for i in range(5):
+        cache.append(make_message(i, guild_id=1))
+
+    assert [m.id for m in cache] == [2, 3, 4]
+    assert cache.get(0) is None
+    # The evicted messages should not linger in the guild index
+    assert [m.id for m in cache.pop_guild(1)] == [2, 3, 4]
+
+
+def test_message_cache_pop():
+    cache = MessageCache(10)
+    for i in range(5):
+        cache.append(make_message(i, guild_id=1))
+
+    assert cache.pop(2).id == 2
+    assert cache.pop(2) is None
+    assert [m.id for m in cache.pop_many([4, 0, 100])] == [0, 4]
+    assert [m.id for m in cache] == [1, 3]
+
+
+def test_message_cache_pop_guild():
+    cache = MessageCache(10)
+    for i in range(6):
+        cache.append(make_message(i, guild_id=i % 2))
+    cache.append(make_message(6))
+
+    removed = cache.pop_guild(1)
+    assert [m.id for m in removed] == [1, 3, 5]
+    assert [m.id for m in cache] == [0, 2, 4, 6]
+    assert cache.pop_guild(1) == []
+
+
+def test_message_cache_channel_messages():
+    cache = MessageCache(10)
+    for i in range(6):
+        cache.append(make_message(i, guild_id=1, channel_id=i % 2))
+
+    assert [m.id for m in cache.channel_messages(0)] == [0, 2, 4]
+    assert [m.id for m in cache.channel_messages(1, limit=2)] == [3, 5]
+    assert cache.channel_messages(1, limit=0) == []
+    assert cache.channel_messages(42) == []
+
+    cache.pop(3)
+    assert [m.id for m in cache.channel_messages(1)] == [1, 5]
+    cache.pop_guild(1)
+    assert cache.channel_messages(0) == []
+
+
+def test_message_cache_guild_budget():
+    cache = MessageCache(10, max_messages_per_guild=2)
+    cache.append(make_message(0, guild_id=1))
+    cache.append(make_message(1, guild_id=2))
+    for i in range(2, 10):
+        cache.append(make_message(i, guild_id=1))
+
+    # The busy guild only evicts its own messages
+    assert [m.id for m in cache] == [1, 8, 9]
+    assert cache.guild_message_count(1) == 2
+    assert cache.guild_message_count(2) == 1
+
+
+def test_message_cache_channel_budget():
+    cache = MessageCache(10, max_messages_per_channel=3)
+    for i in range(8):
+        cache.append(make_message(i, guild_id=1, channel_id=10 if i < 6 else 20))
+
+    assert [m.id for m in cache.channel_messages(10)] == [3, 4, 5]
+    assert [m.id for m in cache.channel_messages(20)] == [6, 7]
+    assert cache.channel_message_count(10) == 3
+    assert cache.guild_message_count(1) == 5
+
+
+def test_message_cache_global_eviction_targets_largest_guild():
+    cache = MessageCache(4)
+    cache.append(make_message(0, guild_id=2))
+    for i in range(1, 4):
+        cache.append(make_message(i, guild_id=1))
+
+    # The quiet guild keeps its message, the busy one loses its oldest
+    cache.append(make_message(4, guild_id=3))
+    assert [m.id for m in cache] == [0, 2, 3, 4]
+
+    # Messages without a guild are a partition of their own
+    cache.append(make_message(5))
+    cache.append(make_message(6))
+    cache.append(make_message(7))
+    assert [m.id for m in cache] == [0, 3, 4, 7]
+
+
+def test_message_cache_tracks_largest_partition():
+    cache = MessageCache(1000)
+    for i in range(60):
+        cache.append(make_message(i, guild_id=i % 3 or None, channel_id=i % 5))
+    cache.pop_many(range(0, 60, 4))
+    cache.pop_guild(1)
+    cache.append(make_message(30, guild_id=2))
+
+    partitions = [*cache._guilds.values(), cache._private]
+    assert cache._largest == max(map(len, partitions))
+    assert {size: set(keys) for size, keys in cache._sizes.items()} == {
+        len(ids): {guild_id for guild_id, other in [*cache._guilds.items(), (None, cache._private)] if len(other) == len(ids)}
+        for ids in partitions
+        if ids
+    }
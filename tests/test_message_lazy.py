@@ -0,0 +1,117 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import copy
+import sys
+
+import discord
+from discord.state import ConnectionState
+
+
+def make_state(**options) -> ConnectionState:
+    return ConnectionState(
+        dispatch=lambda *args: None,
+        handlers={},
+        hooks={},
+        http=None,  # type: ignore
+        intents=discord.Intents.default(),
+        **options,
+    )
+
+
+def make_payload():
+    return {
+        'id': '1',
+        'channel_id': '2',
+        'author': {'id': '3', 'username': 'user', 'discriminator': '0001', 'avatar': None},
+        'content': 'hello',
+        'timestamp': '2023-01-01T00:00:00+00:00',
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [],
+        'embeds': [{'title': 'first'}],
+        'reactions': [{'count': 2, 'me': False, 'emoji': {'id': None, 'name': '\N{THUMBS UP SIGN}'}}],
+        'components': [],
+        'pinned': False,
+        'type': 0,
+    }
+
+
+def make_message(state: ConnectionState) -> discord.Message:
+    channel = discord.PartialMessageable(state=state, id=2)
+    return state.create_message(channel=channel, data=make_payload())  # type: ignore
+
+
+def test_message_eager_parsing():
+    message = make_message(make_state())
+    assert type(message) is discord.Message
+    assert not hasattr(message, '_embeds')
+    assert message.embeds[0].title == 'first'
+
+    older = copy.copy(message)
+    assert older.reactions is message.reactions
+
+
+def test_message_lazy_parsing():
+    message = make_message(make_state(lazy_parsing=True))
+    assert isinstance(message, discord.Message)
+    # The raw payload is kept in the slot of Message, no extra slots are added
+    assert not isinstance(discord.Message.embeds.__get__(message), list)  # type: ignore
+    assert sys.getsizeof(message) == sys.getsizeof(make_message(make_state()))
+
+    assert message.embeds[0].title == 'first'
+    assert message.embeds is message.embeds
+    assert message.reactions[0].count == 2
+    assert message.attachments == []
+    assert message.stickers == []
+    assert message.components == []
+
+
+def test_message_lazy_parsing_update():
+    message = make_message(make_state(lazy_parsing=True))
+    older = copy.copy(message)
+    message._update({'embeds': [{'title': 'second'}]})  # type: ignore
+    assert not isinstance(discord.Message.embeds.__get__(message), list)  # type: ignore
+
+    assert message.embeds[0].title == 'second'
+    assert older.embeds[0].title == 'first'
+
+    message.embeds = []
+    assert message.embeds == []
+
+
+def test_message_lazy_parsing_copy():
+    message = make_message(make_state(lazy_parsing=True))
+    older = copy.copy(message)
+
+    assert older.reactions is message.reactions
+    assert older.reactions[0].message is message
+    assert older.content == message.content
+    assert older.author == message.author
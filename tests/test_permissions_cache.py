@@ -0,0 +1,157 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import discord
+from discord.permissions import Permissions
+
+
+def _role(id: int, perms: Permissions, position: int):
+    return {
+        'id': id,
+        'name': str(id),
+        'permissions': str(perms.value),
+        'position': position,
+        'color': 0,
+        'hoist': False,
+        'managed': False,
+        'mentionable': False,
+    }
+
+
+def _overwrite(id: int, type: int, allow: Permissions = Permissions.none(), deny: Permissions = Permissions.none()):
+    return {'id': str(id), 'type': type, 'allow': str(allow.value), 'deny': str(deny.value)}
+
+
+def _setup():
+    client = discord.Client(intents=discord.Intents.all())
+    state = client._connection
+    data = {
+        'id': 1,
+        'name': 'guild',
+        'owner_id': 99,
+        'roles': [
+            _role(1, Permissions(view_channel=True, send_messages=True), 0),
+            _role(2, Permissions(manage_messages=True), 1),
+            _role(3, Permissions(administrator=True), 2),
+        ],
+        'channels': [
+            {
+                'id': 10,
+                'type': 0,
+                'name': 'channel',
+                'position': 0,
+                'permission_overwrites': [
+                    _overwrite(1, 0, deny=Permissions(send_messages=True)),
+                    _overwrite(2, 0, allow=Permissions(send_messages=True)),
+                    _overwrite(7, 1, allow=Permissions(add_reactions=True)),
+                ],
+            }
+        ],
+    }
+    guild = discord.Guild(data=data, state=state)  # type: ignore
+    state._add_guild(guild)
+    return state, guild
+
+
+def _member(guild: discord.Guild, id: int, roles: list[int]) -> discord.Member:
+    data = {
+        'user': {'id': id, 'username': 'user', 'discriminator': '0', 'avatar': None},
+        'roles': [str(r) for r in roles],
+        'flags': 0,
+    }
+    return discord.Member(data=data, guild=guild, state=guild._state)  # type: ignore
+
+
+def test_permissions_for_is_cached_per_role_set():
+    state, guild = _setup()
+    channel = guild.get_channel(10)
+    members = [_member(guild, 5, []), _member(guild, 6, [2]), _member(guild, 7, []), _member(guild, 8, [3])]
+
+    resolved = {member: channel.permissions_for(member) for member in members}
+    assert [resolved[m].send_messages for m in members] == [False, True, False, True]
+    assert [resolved[m].manage_messages for m in members] == [False, True, False, True]
+    assert resolved[members[2]].add_reactions
+    assert not resolved[members[0]].add_reactions
+    assert resolved[members[3]].administrator
+
+    # Members 5 and 7 share a role set
+    assert len(guild._permission_cache[channel.id].resolved) == 3
+
+
+def test_permissions_cache_invalidation():
+    state, guild = _setup()
+    channel = guild.get_channel(10)
+    member = _member(guild, 6, [2])
+    assert channel.permissions_for(member).manage_messages
+
+    state.parse_guild_role_update({'guild_id': 1, 'role': _role(2, Permissions.none(), 1)})  # type: ignore
+    assert not channel.permissions_for(member).manage_messages
+
+    other = _member(guild, 5, [])
+    assert not channel.permissions_for(other).send_messages
+    state.parse_channel_update({'id': 10, 'type': 0, 'guild_id': 1, 'name': 'channel', 'position': 0, 'permission_overwrites': []})  # type: ignore
+    assert channel.permissions_for(other).send_messages
+
+    # Role changes on the member itself pick a different cache entry
+    member._roles = discord.utils.SnowflakeList([3])
+    assert channel.permissions_for(member).administrator
+
+
+def test_permissions_cache_is_dropped_with_the_channel():
+    state, guild = _setup()
+    channel = guild.get_channel(10)
+    channel.permissions_for(_member(guild, 6, [2]))
+    assert channel.id in guild._permission_cache
+
+    state.parse_channel_delete({'id': 10, 'type': 0, 'guild_id': 1, 'name': 'channel', 'position': 0})  # type: ignore
+    assert guild._permission_cache == {}
+
+
+def test_permissions_for_many():
+    state, guild = _setup()
+    channel = guild.get_channel(10)
+    members = [_member(guild, i, [2] if i % 2 else []) for i in range(20, 30)] + [_member(guild, 7, [])]
+
+    resolved = channel.permissions_for_many(members)
+    assert list(resolved) == members
+    assert resolved == {member: channel.permissions_for(member) for member in members}
+    # Member overwrites are still applied on top of the shared role set
+    assert resolved[members[-1]].add_reactions
+    assert not resolved[members[0]].add_reactions
+    # Text channels still strip the voice permissions
+    assert not any(permissions.connect for permissions in resolved.values())
+    assert len(guild._permission_cache[channel.id].resolved) == 2
+
+
+def test_permissions_cache_is_bounded(monkeypatch):
+    state, guild = _setup()
+    channel = guild.get_channel(10)
+    monkeypatch.setattr(discord.abc._PermissionCache, 'MAX_RESOLVED', 2)
+
+    for roles in ([], [1], [2], [1, 2]):
+        channel.permissions_for(_member(guild, 5, roles))
+    assert list(guild._permission_cache[channel.id].resolved) == [(2,), (1, 2)]
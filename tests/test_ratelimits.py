@@ -0,0 +1,129 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+import discord
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'ratelimit.sock')
+
+
+@pytest.mark.asyncio
+async def test_coordinator_shares_bucket_hashes(socket_path):
+    async with discord.RateLimitCoordinator(socket_path):
+        first = discord.UnixSocketRateLimitBackend(socket_path)
+        second = discord.UnixSocketRateLimitBackend(socket_path)
+
+        second.UNKNOWN_HASH_TTL = 0.1
+        assert await second.get_bucket_hash('GET /users/@me') is None
+        await first.set_bucket_hash('GET /users/@me', 'abcd')
+        # Wait for the coordinator to have processed the update
+        assert await first.get_bucket_hash('GET /users/@me') == 'abcd'
+        # The route is remembered as having no hash for a while
+        assert await second.get_bucket_hash('GET /users/@me') is None
+        await asyncio.sleep(0.15)
+        assert await second.get_bucket_hash('GET /users/@me') == 'abcd'
+
+        await first.close()
+        await second.close()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_shares_remaining(socket_path):
+    async with discord.RateLimitCoordinator(socket_path):
+        first = discord.UnixSocketRateLimitBackend(socket_path)
+        second = discord.UnixSocketRateLimitBackend(socket_path)
+
+        await first.acquire('abcd:1')
+        await first.update('abcd:1', limit=2, remaining=1, reset_after=0.2)
+        await first.acquire('abcd:1')
+
+        # The bucket is exhausted now, the other client has to wait for it to reset
+        start = time.monotonic()
+        await second.acquire('abcd:1')
+        assert time.monotonic() - start >= 0.15
+
+        # Other buckets are unaffected
+        start = time.monotonic()
+        await second.acquire('efgh:1')
+        assert time.monotonic() - start < 0.1
+
+        await first.close()
+        await second.close()
+
+
+def test_coordinator_expires_buckets(socket_path):
+    coordinator = discord.RateLimitCoordinator(socket_path)
+    for i in range(100):
+        coordinator._update(f'{i}:', 5, 4, 1.0 if i % 2 else 10.0, 0.0)
+    coordinator._update('0:', 5, 3, 20.0, 0.0)
+
+    # Buckets are dropped after their reset, even if their key isn't used again
+    coordinator._expire_buckets(5.0)
+    assert sorted(coordinator._buckets) == sorted(f'{i}:' for i in range(0, 100, 2))
+    coordinator._expire_buckets(15.0)
+    assert list(coordinator._buckets) == ['0:']
+    coordinator._expire_buckets(20.0)
+    assert coordinator._buckets == {}
+    assert coordinator._bucket_expiry == []
+
+
+@pytest.mark.asyncio
+async def test_coordinator_global_limit(socket_path):
+    async with discord.RateLimitCoordinator(socket_path, global_limit=2):
+        backend = discord.UnixSocketRateLimitBackend(socket_path)
+
+        start = time.monotonic()
+        await asyncio.gather(*(backend.acquire(f'{i}:') for i in range(3)))
+        assert time.monotonic() - start >= 0.9
+
+        await backend.set_global(0.2)
+        start = time.monotonic()
+        await backend.acquire('abcd:')
+        assert time.monotonic() - start >= 0.15
+
+        await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_backend_without_coordinator(socket_path):
+    backend = discord.UnixSocketRateLimitBackend(socket_path)
+    # Without a coordinator requests are only limited by the client itself
+    await backend.acquire('abcd:')
+    assert await backend.get_bucket_hash('GET /users/@me') is None
+    await backend.close()
+
+
+def test_coordinator_validation(socket_path):
+    with pytest.raises(ValueError):
+        discord.RateLimitCoordinator(socket_path, global_limit=0)
@@ -0,0 +1,109 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from discord import rest_proxy
+from discord.http import Route
+
+
+def test_route_from_path():
+    route = rest_proxy._route_from_path('DELETE', '/channels/1/messages/2/reactions/%F0%9F%91%8D/@me')
+    assert route.key == 'DELETE /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me'
+    assert route.url == Route.BASE + '/channels/1/messages/2/reactions/%F0%9F%91%8D/@me'
+    assert route.major_parameters == '1'
+
+    route = rest_proxy._route_from_path('POST', '/webhooks/5/token/messages/@original')
+    assert route.key == 'POST /webhooks/{webhook_id}/{webhook_token}/messages/@original'
+    assert route.major_parameters == '5+token'
+
+    route = rest_proxy._route_from_path('GET', '/guilds/3/members/4')
+    assert route.key == 'GET /guilds/{guild_id}/members/{member_id}'
+    assert route.major_parameters == '3'
+
+
+def json_response(data: Any, *, status: int = 200) -> web.Response:
+    return web.Response(body=json.dumps(data).encode(), status=status, headers={'Content-Type': 'application/json'})
+
+
+@pytest.mark.asyncio
+async def test_rest_proxy_forwards_requests(monkeypatch):
+    received: List[Dict[str, Any]] = []
+
+    async def fake_discord(request: web.Request) -> web.Response:
+        body = await request.read()
+        received.append(
+            {
+                'method': request.method,
+                'path': request.path,
+                'query': dict(request.query),
+                'authorization': request.headers.get('Authorization'),
+                'body': body,
+            }
+        )
+        if request.path.endswith('/missing'):
+            return json_response({'message': 'Unknown Channel', 'code': 10003}, status=404)
+        if request.method == 'DELETE':
+            return web.Response(status=204)
+        return json_response({'id': '1'})
+
+    discord_app = web.Application()
+    discord_app.router.add_route('*', '/{path:.*}', fake_discord)
+    async with TestServer(discord_app) as discord_server:
+        monkeypatch.setattr(Route, 'BASE', str(discord_server.make_url('/api/v10')))
+
+        app = rest_proxy.create_app('token', authorization='secret')
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post(
+                '/api/v10/channels/1/messages?foo=bar', json={'content': 'hi'}, headers={'Authorization': 'secret'}
+            )
+            assert response.status == 200
+            assert await response.json() == {'id': '1'}
+
+            response = await client.delete('/api/v10/channels/1/messages/2', headers={'Authorization': 'secret'})
+            assert response.status == 204
+
+            response = await client.get('/api/v10/channels/missing', headers={'Authorization': 'secret'})
+            assert response.status == 404
+            assert (await response.json())['code'] == 10003
+
+            response = await client.get('/api/v10/users/@me')
+            assert response.status == 401
+
+    # The first request is the login done by the proxy
+    assert received[0]['path'] == '/api/v10/users/@me'
+    assert received[1]['path'] == '/api/v10/channels/1/messages'
+    assert received[1]['query'] == {'foo': 'bar'}
+    assert received[1]['authorization'] == 'Bot token'
+    assert received[1]['body'] == b'{"content":"hi"}'
+    assert received[2]['method'] == 'DELETE'
+    assert len(received) == 4
@@ -0,0 +1,136 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+import yarl
+
+import discord
+
+
+class FakeWebSocket:
+    def __init__(self, session_id: Optional[str]) -> None:
+        self.open = True
+        self.session_id = session_id
+        self.sequence = 42
+        self.gateway = yarl.URL('wss://resume.discord.gg')
+        self.shard_id = None
+        self.close_codes: List[int] = []
+
+    async def close(self, code: int = 4000) -> None:
+        self.open = False
+        self.close_codes.append(code)
+
+
+@pytest.mark.asyncio
+async def test_file_session_store(tmp_path):
+    path = str(tmp_path / 'sessions.json')
+    store = discord.FileSessionStore(path)
+    assert await store.load(None) is None
+
+    session = discord.GatewaySession('abc', 10, 'wss://resume.discord.gg')
+    await store.save(None, session)
+    await store.save(3, session._replace(sequence=None))
+
+    store = discord.FileSessionStore(path)
+    assert await store.load(None) == session
+    assert await store.load(3) == session._replace(sequence=None)
+    assert await store.load(4) is None
+
+
+@pytest.mark.asyncio
+async def test_file_session_store_ignores_broken_file(tmp_path):
+    path = tmp_path / 'sessions.json'
+    path.write_bytes(b'{not json')
+    store = discord.FileSessionStore(str(path))
+    assert await store.load(0) is None
+
+
+@pytest.mark.asyncio
+async def test_close_saves_session(tmp_path):
+    store = discord.FileSessionStore(str(tmp_path / 'sessions.json'))
+    client = discord.Client(intents=discord.Intents.none(), session_store=store)
+    client.ws = ws = FakeWebSocket('abc')  # type: ignore
+    await client.close()
+
+    # The session is kept alive on Discord's side so that it can be resumed
+    assert ws.close_codes == [4000]
+    assert await store.load(None) == discord.GatewaySession('abc', 42, 'wss://resume.discord.gg')
+
+    restarted = discord.Client(intents=discord.Intents.none(), session_store=store)
+    assert await restarted._load_session(None) == discord.GatewaySession('abc', 42, 'wss://resume.discord.gg')
+    assert restarted._connection._restored_sessions == {None}
+
+    # The session is consumed, a crash before the next save must not resume it again
+    assert await store.load(None) is None
+    assert await discord.FileSessionStore(store.path).load(None) is None
+
+
+@pytest.mark.asyncio
+async def test_close_without_session():
+    client = discord.Client(intents=discord.Intents.none(), session_store=discord.SessionStore())
+    client.ws = ws = FakeWebSocket(None)  # type: ignore
+    await client.close()
+    assert ws.close_codes == [1000]
+
+
+def test_resuming_saved_session_dispatches_ready():
+    client = discord.Client(intents=discord.Intents.none())
+    events: List[Any] = []
+    client.dispatch = lambda event, *args: events.append(event)  # type: ignore
+    state = client._connection
+    state.dispatch = client.dispatch
+    state.handlers = {'ready': lambda: events.append('handler')}
+
+    state._restored_sessions.add(None)
+    state.parse_resumed({'__shard_id__': None})  # type: ignore
+    assert events == ['resumed', 'handler', 'ready']
+
+    # Later RESUMEs are ordinary reconnects
+    events.clear()
+    state.parse_resumed({'__shard_id__': None})  # type: ignore
+    assert events == ['resumed']
+
+
+@pytest.mark.asyncio
+async def test_file_session_store_concurrent_saves(tmp_path):
+    path = str(tmp_path / 'sessions.json')
+    stores = [discord.FileSessionStore(path) for _ in range(8)]
+    session = discord.GatewaySession('abc', 10, 'wss://resume.discord.gg')
+
+    # Every store stands in for a cluster worker, none of the updates may get lost
+    await asyncio.gather(*(store.save(shard_id, session) for shard_id, store in enumerate(stores)))
+    store = discord.FileSessionStore(path)
+    assert [await store.load(shard_id) for shard_id in range(8)] == [session] * 8
+
+    await asyncio.gather(*(store.delete(shard_id) for shard_id, store in enumerate(stores) if shard_id % 2))
+    store = discord.FileSessionStore(path)
+    assert [await store.load(shard_id) is not None for shard_id in range(8)] == [True, False] * 4
+    # No temporary files are left behind
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['sessions.json', 'sessions.json.lock']
@@ -0,0 +1,106 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple
+
+import pytest
+
+import discord
+
+
+class FakeHTTP:
+    def __init__(self, remaining: int, max_concurrency: int) -> None:
+        self.limit = {'total': 1000, 'remaining': remaining, 'reset_after': 60_000, 'max_concurrency': max_concurrency}
+
+    async def get_bot_gateway_info(self) -> Any:
+        return 8, 'wss://gateway.discord.gg', self.limit
+
+
+class LaunchRecorder(discord.AutoShardedClient):
+    def __init__(self, concurrency: Any, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, intents=discord.Intents.none(), **kwargs)
+        self.launched: List[Tuple[int, bool]] = []
+        self.sessions: List[int] = []
+        self.concurrency = concurrency
+
+    async def launch_shard(
+        self, gateway: Any, shard_id: int, *, initial: bool = False, session: Optional[discord.GatewaySession] = None
+    ) -> None:
+        if session is not None:
+            self.sessions.append(shard_id)
+        await self.concurrency.run()
+        self.launched.append((shard_id, initial))
+
+
+@pytest.mark.asyncio
+async def test_launch_shards_by_identify_bucket(concurrency):
+    client = LaunchRecorder(concurrency)
+    client.http = FakeHTTP(remaining=100, max_concurrency=4)  # type: ignore
+    await client.launch_shards()
+
+    assert client.shard_count == 8
+    assert concurrency.max_active == 4
+    assert sorted(client.launched) == [(i, i < 4) for i in range(8)]
+    # Shards of the same bucket are launched in order
+    assert [shard_id for shard_id, _ in client.launched if shard_id % 4 == 1] == [1, 5]
+
+
+@pytest.mark.asyncio
+async def test_launch_shards_session_start_limit(concurrency):
+    client = LaunchRecorder(concurrency, shard_count=8, shard_ids=[0, 1, 2])
+    client.http = FakeHTTP(remaining=2, max_concurrency=1)  # type: ignore
+    with pytest.raises(discord.SessionStartLimitReached) as exc:
+        await client.launch_shards()
+
+    assert exc.value.required == 3
+    assert exc.value.reset_after == 60
+    assert client.launched == []
+
+    client.http.limit['remaining'] = 3  # type: ignore
+    await client.launch_shards()
+    assert client.launched == [(0, True), (1, False), (2, False)]
+    assert concurrency.max_active == 1
+
+
+class MemorySessionStore(discord.SessionStore):
+    def __init__(self, shard_ids: List[int]) -> None:
+        self.stored = {shard_id: discord.GatewaySession(f'session {shard_id}', 10, 'wss://resume') for shard_id in shard_ids}
+
+    async def load(self, shard_id: Optional[int]) -> Optional[discord.GatewaySession]:
+        return self.stored.get(shard_id)  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_launch_shards_resumes_saved_sessions(concurrency):
+    client = LaunchRecorder(concurrency, shard_count=8, shard_ids=[0, 1, 2], session_store=MemorySessionStore([0, 1]))
+    client.http = FakeHTTP(remaining=1, max_concurrency=1)  # type: ignore
+    await client.launch_shards()
+
+    # Only shard 2 IDENTIFYs, and it doesn't have to wait for the resumed shards
+    assert client.sessions == [0, 1]
+    assert client.launched == [(0, True), (1, True), (2, True)]
+    assert client._connection._restored_sessions == {0, 1}
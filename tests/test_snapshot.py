@@ -0,0 +1,304 @@
+"""
+The MIT License (MIT)
+
+Copyright (c) 2015-present Rapptz
+
+Permission is hereby granted, free of charge, to any person obtaining a
+copy of this software and associated documentation files (the "Software"),
+to deal in the Software without restriction, including without limitation
+the rights to use, copy, modify, merge, publish, distribute, sublicense,
+and/or sell copies of the Software, and to permit persons to whom the
+Software is furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+DEALINGS IN THE SOFTWARE.
+"""
+
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+
+import discord
+from discord import snapshot
+
+
+def member_payload(user_id: int) -> Dict[str, Any]:
+    return {
+        'user': {'id': str(user_id), 'username': f'user {user_id}', 'discriminator': '0', 'avatar': None},
+        'roles': [],
+        'joined_at': '2023-01-01T00:00:00+00:00',
+        'deaf': False,
+        'mute': False,
+        'flags': 0,
+    }
+
+
+def guild_payload(guild_id: int, *, channels: List[int], members: List[int]) -> Dict[str, Any]:
+    return {
+        'id': str(guild_id),
+        'name': f'guild {guild_id}',
+        'member_count': 3,
+        'owner_id': '1',
+        'verification_level': 2,
+        'roles': [
+            {
+                'id': str(guild_id),
+                'name': '@everyone',
+                'permissions': '1024',
+                'position': 0,
+                'color': 0,
+                'hoist': False,
+                'managed': False,
+                'mentionable': False,
+            }
+        ],
+        'emojis': [
+            {'id': '55', 'name': 'emoji', 'animated': False, 'roles': [], 'require_colons': True, 'managed': False}
+        ],
+        'channels': [
+            {'id': str(channel_id), 'type': 0, 'name': f'channel {channel_id}', 'position': 0, 'permission_overwrites': []}
+            for channel_id in channels
+        ],
+        'threads': [
+            {
+                'id': '20',
+                'type': 11,
+                'name': 'thread',
+                'parent_id': str(channels[0]),
+                'owner_id': '1',
+                'guild_id': str(guild_id),
+                'thread_metadata': {
+                    'archived': False,
+                    'auto_archive_duration': 60,
+                    'archive_timestamp': '2023-01-01T00:00:00+00:00',
+                    'locked': False,
+                },
+                'message_count': 0,
+                'member_count': 0,
+                'rate_limit_per_user': 0,
+            }
+        ],
+        'members': [member_payload(user_id) for user_id in members],
+    }
+
+
+def make_client(path: str, **options: Any) -> discord.Client:
+    return discord.Client(intents=discord.Intents.all(), cache_snapshot=path, **options)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path) -> str:
+    client = make_client(str(tmp_path / 'cache'))
+    client._connection._add_guild_from_data(guild_payload(123, channels=[10, 11], members=[1, 2, 3]))  # type: ignore
+    assert asyncio.run(snapshot.dump(client._connection, client._cache_snapshot)) == 1  # type: ignore
+    return client._cache_snapshot  # type: ignore
+
+
+def load(client: discord.Client, path: str) -> int:
+    return asyncio.run(client._connection._load_cache_snapshot(path))
+
+
+def test_snapshot_round_trip(snapshot_path):
+    client = make_client(snapshot_path, cache_stores={'members': discord.CompactMemberStore})
+    state = client._connection
+    assert load(client, snapshot_path) == 1
+
+    guild = client.get_guild(123)
+    assert guild is not None
+    assert guild._state is state
+    assert guild.verification_level is discord.VerificationLevel.medium
+    assert isinstance(guild._members, discord.CompactMemberStore)
+    assert sorted(member.id for member in guild.members) == [1, 2, 3]
+    assert guild.chunked
+    assert [channel.id for channel in guild.channels] == [10, 11]
+    assert all(channel._state is state for channel in guild.channels)
+    assert [thread.id for thread in guild.threads] == [20]
+    assert guild.default_role.permissions.read_messages
+    assert client.get_emoji(55) is not None
+
+
+def test_snapshot_is_plain_data(snapshot_path):
+    with open(snapshot_path, 'rb') as fp:
+        data = json.load(fp)
+    assert data['format'] == snapshot.FORMAT_VERSION
+    assert [guild['id'] for guild in data['guilds']] == [123]
+    assert sorted(member['user']['id'] for member in data['guilds'][0]['members']) == [1, 2, 3]
+
+
+def test_snapshot_of_other_format_is_ignored(snapshot_path, monkeypatch):
+    monkeypatch.setattr(snapshot, 'FORMAT_VERSION', snapshot.FORMAT_VERSION + 1)
+    client = make_client(snapshot_path)
+    assert load(client, snapshot_path) == 0
+    assert len(client.guilds) == 0
+
+
+def test_broken_snapshot_is_ignored(tmp_path):
+    path = tmp_path / 'cache'
+    client = make_client(str(path))
+    for content in (b'not a snapshot at all', b'', b'[]', b'{"magic": "something else"}'):
+        path.write_bytes(content)
+        assert load(client, str(path)) == 0
+
+    # A guild that can't be built is skipped
+    path.write_bytes(b'{"magic": "%s", "format": %d, "guilds": [{}]}' % (snapshot.MAGIC.encode(), snapshot.FORMAT_VERSION))
+    assert load(client, str(path)) == 0
+
+
+def test_ready_keeps_restored_guilds(snapshot_path):
+    client = make_client(snapshot_path)
+    state = client._connection
+    load(client, snapshot_path)
+    guild = client.get_guild(123)
+    assert client.get_user(2) is not None
+
+    state._add_ready_guilds([{'id': '123', 'unavailable': True}, {'id': '456', 'unavailable': True}])  # type: ignore
+    assert client.get_guild(123) is guild
+    assert guild.unavailable  # type: ignore
+    assert client.get_guild(456) is not None
+
+    # Channel 11 and the thread were deleted and member 4 joined while the client was offline
+    data = guild_payload(123, channels=[10], members=[1, 4])
+    data['threads'] = []
+    assert state._get_create_guild(data) is guild  # type: ignore
+    assert not guild.unavailable  # type: ignore
+    assert [channel.id for channel in guild.channels] == [10]  # type: ignore
+    assert list(guild.threads) == []  # type: ignore
+    # With presences, a small guild's payload has every member, the others left
+    assert sorted(member.id for member in guild.members) == [1, 4]  # type: ignore
+    assert state._restored_guilds == set()
+    assert state._stale_members == {}
+
+
+@pytest.mark.asyncio
+async def test_restored_members_are_refreshed_by_chunking(snapshot_path):
+    intents = discord.Intents.all()
+    intents.presences = False
+    client = discord.Client(intents=intents, cache_snapshot=snapshot_path)
+    state = client._connection
+    state.loop = asyncio.get_running_loop()
+    await state._load_cache_snapshot(snapshot_path)
+    state._add_ready_guilds([{'id': '123', 'unavailable': True}])  # type: ignore
+
+    guild = state._get_create_guild(guild_payload(123, channels=[10], members=[4]))  # type: ignore
+    assert sorted(member.id for member in guild.members) == [1, 2, 3, 4]
+    assert not guild.chunked
+    assert state._guild_needs_chunking(guild)
+
+    request = discord.state.ChunkRequest(123, state.loop, state._get_guild)
+    state._chunk_requests[123] = request
+    renamed = member_payload(1)
+    renamed['nick'] = 'new nick'
+    chunk = {'guild_id': '123', 'nonce': request.nonce, 'chunk_index': 0, 'chunk_count': 1}
+    state.parse_guild_members_chunk({**chunk, 'members': [renamed, member_payload(4)]})  # type: ignore
+
+    # Members 2 and 3 left the guild while the client was offline
+    assert sorted(member.id for member in guild.members) == [1, 4]
+    assert guild.get_member(1).nick == 'new nick'  # type: ignore
+    assert state._stale_members == {}
+
+
+def test_resumed_forgets_restored_guilds(snapshot_path):
+    client = make_client(snapshot_path)
+    state = client._connection
+    load(client, snapshot_path)
+    assert state._restored_guilds == {123}
+
+    state.parse_resumed({'__shard_id__': None})  # type: ignore
+    assert state._restored_guilds == set()
+
+
+def test_ready_drops_guilds_left_while_offline(snapshot_path):
+    client = make_client(snapshot_path)
+    state = client._connection
+    load(client, snapshot_path)
+    state._add_ready_guilds([{'id': '456', 'unavailable': True}])  # type: ignore
+    assert client.get_guild(123) is None
+    assert client.get_emoji(55) is None
+
+
+@pytest.mark.asyncio
+async def test_close_writes_snapshot_once_ready(tmp_path):
+    path = tmp_path / 'cache'
+    client = make_client(str(path))
+    client._connection._add_guild_from_data(guild_payload(123, channels=[10], members=[1]))  # type: ignore
+    await client.close()
+    assert not path.exists()
+
+    client = make_client(str(path))
+    client._connection._add_guild_from_data(guild_payload(123, channels=[10], members=[1]))  # type: ignore
+    client._ready = asyncio.Event()
+    client._ready.set()
+    await client.close()
+    assert path.exists()
+
+
+def test_snapshot_keeps_attributes(tmp_path):
+    path = str(tmp_path / 'cache')
+    data = guild_payload(123, channels=[10], members=[1])
+    role_data = {'id': '7', 'name': 'bot', 'permissions': '8', 'position': 1, 'color': 5, 'hoist': True, 'managed': True}
+    data['roles'].append({**role_data, 'tags': {'bot_id': '1', 'premium_subscriber': None}})
+    data['members'][0].update(nick='nick', roles=['7'], communication_disabled_until='2030-01-01T00:00:00+00:00')
+    data['channels'] += [
+        {
+            'id': '12',
+            'type': 2,
+            'name': 'voice',
+            'position': 1,
+            'bitrate': 64000,
+            'user_limit': 5,
+            'rtc_region': 'us-east',
+            'permission_overwrites': [{'id': '7', 'type': 0, 'allow': '1024', 'deny': '0'}],
+        },
+        {
+            'id': '13',
+            'type': 15,
+            'name': 'forum',
+            'position': 2,
+            'parent_id': '14',
+            'available_tags': [{'id': '30', 'name': 'tag', 'moderated': True, 'emoji_id': None, 'emoji_name': 'x'}],
+            'default_reaction_emoji': {'emoji_id': None, 'emoji_name': 'y'},
+            'default_sort_order': 1,
+            'permission_overwrites': [],
+        },
+        {'id': '14', 'type': 4, 'name': 'category', 'position': 3, 'permission_overwrites': []},
+    ]
+    client = make_client(path)
+    client._connection._add_guild_from_data(data)  # type: ignore
+    asyncio.run(snapshot.dump(client._connection, path))
+    original = client.get_guild(123)
+
+    client = make_client(path)
+    assert load(client, path) == 1
+    guild = client.get_guild(123)
+    assert guild is not None and original is not None
+
+    role, restored_role = original.get_role(7), guild.get_role(7)
+    assert restored_role is not None and role is not None
+    assert (restored_role.name, restored_role.colour, restored_role.permissions) == (role.name, role.colour, role.permissions)
+    assert restored_role.is_bot_managed() and restored_role.is_premium_subscriber()
+
+    member = guild.get_member(1)
+    assert (member.nick, member.roles) == ('nick', [guild.default_role, restored_role])  # type: ignore
+    assert member.timed_out_until == original.get_member(1).timed_out_until  # type: ignore
+
+    voice = guild.get_channel(12)
+    assert (voice.bitrate, voice.user_limit, voice.rtc_region) == (64000, 5, 'us-east')  # type: ignore
+    assert voice.overwrites_for(restored_role).view_channel  # type: ignore
+    forum = guild.get_channel(13)
+    assert [(tag.name, tag.moderated, str(tag.emoji)) for tag in forum.available_tags] == [('tag', True, 'x')]  # type: ignore
+    assert str(forum.default_reaction_emoji) == 'y'  # type: ignore
+    assert forum.default_sort_order is discord.ForumOrderType.creation_date  # type: ignore
+    assert forum.category == guild.get_channel(14)  # type: ignore
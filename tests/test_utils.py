@@ -6,6 +6,7 @@ Tests for discord.utils
 
 """
 
+import asyncio
 import datetime
 import random
 import collections
@@ -334,3 +335,37 @@ def test_is_inside_class():
 )
 def test_format_dt(dt: datetime.datetime, style: typing.Optional[utils.TimestampStyle], formatted: str):
     assert utils.format_dt(dt, style=style) == formatted
+
+
+@pytest.mark.asyncio
+async def test_prefetch():
+    fetched = []
+
+    async def pages():
+        for i in range(5):
+            await asyncio.sleep(0)
+            fetched.append(i)
+            yield i
+
+    iterator = utils._prefetch(pages(), 2)
+    assert await iterator.__anext__() == 0
+    for _ in range(10):
+        await asyncio.sleep(0)
+    # The buffer is bounded: one page was consumed, two are buffered and one is waiting to be
+    assert fetched == [0, 1, 2, 3]
+    assert [item async for item in iterator] == [1, 2, 3, 4]
+
+    assert [item async for item in utils._prefetch(pages(), 0)] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_prefetch_error():
+    async def pages():
+        yield 1
+        raise ValueError('page failed')
+
+    received = []
+    with pytest.raises(ValueError):
+        async for item in utils._prefetch(pages(), 3):
+            received.append(item)
+    assert received == [1]